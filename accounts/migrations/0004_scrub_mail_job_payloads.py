@@ -0,0 +1,23 @@
+# Путь: backend/accounts/migrations/0004_scrub_mail_job_payloads.py
+# Назначение: стирает аргументы уже выполненных/упавших задач accounts.send_mail — в них лежало готовое письмо
+#             с живой ссылкой активации или сброса пароля (видно в админке задач). Задачи в очереди не трогаем:
+#             им аргументы ещё нужны. Новые письма ставятся задачей accounts.send_user_mail без токенов.
+
+from django.db import migrations
+
+
+def scrub(apps, schema_editor):
+    Job = apps.get_model("jobs", "Job")
+    Job.objects.filter(name="accounts.send_mail").exclude(status__in=("queued", "running")).update(payload={})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_alter_user_bio_alter_user_photo_alter_user_role"),
+        ("jobs", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(scrub, migrations.RunPython.noop),
+    ]
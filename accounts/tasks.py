@@ -0,0 +1,77 @@
+# Путь: backend/accounts/tasks.py
+# Назначение: Фоновые задачи accounts — отправка писем (активация, восстановление пароля) воркером,
+#             чтобы ответ API не зависел от скорости SMTP.
+# ✅ В Job.payload — только id пользователя, вид письма и базовый адрес ссылки (без токена): токен, ссылка
+#    и HTML собираются здесь, в момент отправки. Аргументы задач видны в админке и хранятся после выполнения —
+#    живая ссылка активации/сброса пароля там давала бы войти в чужой аккаунт.
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import EmailMultiAlternatives
+from django.template import TemplateDoesNotExist
+from django.template.loader import render_to_string
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from jobs.api import register
+
+# вид письма → тема, шаблоны, имя ссылки в контексте и её путь от базового адреса
+MAIL_KINDS = {
+    "activation": {
+        "subject": "Активация аккаунта {project_name}",
+        "html_template": "emails/activation_email.html",
+        "text_template": "emails/activation_email.txt",
+        "link_name": "activation_link",
+        "link_path": "/api/auth/activate/{uid}/{token}/",
+    },
+    "password_reset": {
+        "subject": "Восстановление пароля {project_name}",
+        "html_template": "emails/reset_password_email.html",
+        "text_template": "emails/reset_password_email.txt",
+        "link_name": "reset_link",
+        "link_path": "/{uid}/{token}/",
+    },
+}
+
+
+@register("accounts.send_user_mail")
+def send_user_mail(user_id, kind, link_base, from_email=None):
+    spec = MAIL_KINDS[kind]
+    user = get_user_model().objects.filter(pk=user_id).first()
+    if user is None or not user.email:
+        return {"skipped": "no user"}
+    if kind == "activation" and user.is_active:
+        return {"skipped": "already active"}
+
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    token = default_token_generator.make_token(user)
+    ctx = {
+        "user": user,
+        spec["link_name"]: link_base.rstrip("/") + spec["link_path"].format(uid=uid, token=token),
+        "project_name": getattr(settings, "PROJECT_NAME", "IzotovLife"),
+    }
+    html = render_to_string(spec["html_template"], ctx)
+    try:
+        body = render_to_string(spec["text_template"], ctx)
+    except TemplateDoesNotExist:
+        body = "Пожалуйста, откройте письмо в HTML-формате."
+
+    msg = EmailMultiAlternatives(
+        subject=spec["subject"].format(project_name=ctx["project_name"]),
+        body=body,
+        from_email=from_email or getattr(settings, "DEFAULT_FROM_EMAIL", "noreply@localhost"),
+        to=[user.email],
+    )
+    msg.attach_alternative(html, "text/html")
+    msg.send(fail_silently=False)
+    return {"user_id": user.pk, "kind": kind}
+
+
+@register("accounts.send_mail")
+def send_mail(subject, to, body, html, from_email):
+    """Прежний формат (готовое письмо в аргументах) — только чтобы доработали уже стоящие в очереди задачи."""
+    msg = EmailMultiAlternatives(subject=subject, body=body, from_email=from_email, to=to)
+    msg.attach_alternative(html, "text/html")
+    msg.send(fail_silently=False)
+    return {"to": to}
@@ -6,6 +6,8 @@
 # Что добавлено:
 #   ✅ Динамическая сборка ссылок (на основе домена запроса и settings) вместо жёстких http://localhost:...
 #   ✅ Отправка писем через общий helper с HTML и текстовой версией.
+#   ✅ Письма со ссылками уходят фоновой задачей accounts.send_user_mail: в очередь — только id пользователя,
+#      токен и ссылка собираются в задаче (не лежат в Job.payload / админке).
 #   ✅ Активация: опция вернуть красивую HTML-страницу с авто-редиректом (параметр ?html=1).
 #   ✅ Повторная отправка письма активации (ResendActivationView) — не раскрывает, существует ли пользователь.
 #   ✅ Password reset: опциональный "тихий" режим (?silent=1), чтобы не палить наличие аккаунта.
@@ -24,16 +26,17 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.utils.encoding import force_str, force_bytes
-from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+from django.utils.encoding import force_str
+from django.utils.http import urlsafe_base64_decode
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.sites.shortcuts import get_current_site
 from django.shortcuts import redirect
 from django.http import HttpResponse
 
-from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 
+from jobs.api import PRIORITY_HIGH, enqueue
+
 from .serializers import (
     MyTokenObtainPairSerializer,
     AuthorDetailSerializer,
@@ -57,24 +60,22 @@ def _origin_from_request(request) -> str:
     return f"{scheme}://{domain}"
 
 
-def _send_html_mail(*, subject: str, to: list[str], html_template: str, context: dict,
-                    text_template: str | None = None, from_email: str | None = None) -> None:
+def _send_user_mail(user, kind: str, link_base: str) -> None:
     """
-    Унифицированная отправка HTML+text писем.
-    Если text_template не задан — сгенерируем простой текст из HTML (упрощённо).
+    Письмо со ссылкой (активация / восстановление пароля) — фоновой задачей accounts.send_user_mail
+    (при сбое SMTP — повтор с паузой, см. jobs/worker.py). В задачу уходят только id пользователя и базовый
+    адрес ссылки: токен и само письмо собираются в задаче, в Job.payload (и в админке) их нет.
     """
-    html_content = render_to_string(html_template, context)
-    text_content = render_to_string(text_template, context) if text_template else "Пожалуйста, откройте письмо в HTML-формате."
-    sender = from_email or getattr(settings, "DEFAULT_FROM_EMAIL", "noreply@localhost")
-
-    msg = EmailMultiAlternatives(
-        subject=subject,
-        body=text_content,
-        from_email=sender,
-        to=to,
+    enqueue(
+        "accounts.send_user_mail",
+        {
+            "user_id": user.pk,
+            "kind": kind,
+            "link_base": link_base,
+            "from_email": getattr(settings, "DEFAULT_FROM_EMAIL", "noreply@izotovlife.ru"),
+        },
+        priority=PRIORITY_HIGH,
     )
-    msg.attach_alternative(html_content, "text/html")
-    msg.send(fail_silently=False)
 
 
 # ===== СУЩЕСТВУЮЩИЕ ВЬЮХИ (НЕ ТРОГАЮ, ТОЛЬКО ДОПОЛНЯЮ ГДЕ НУЖНО) =====
@@ -158,32 +159,8 @@ class RegisterView(APIView):
         # Если оставить аргумент, DRF передаст его в .create и получим TypeError: unexpected keyword argument 'is_active'.
         user = serializer.save()
 
-        # Генерация ссылки активации
-        uid = urlsafe_base64_encode(force_bytes(user.pk))
-        token = default_token_generator.make_token(user)
-
-        # Базовая (старая) ссылка — оставляю как первый расчёт (НЕ УДАЛЯЮ)
-        activation_link = f"http://localhost:8000/api/auth/activate/{uid}/{token}/"
-
-        # ДИНАМИЧЕСКАЯ ссылка по домену запроса (перезаписываю переменную activation_link — это ДОПОЛНЕНИЕ, а не удаление логики)
-        origin = _origin_from_request(request)
-        activation_link = f"{origin}/api/auth/activate/{uid}/{token}/"
-
-        ctx = {
-            "user": user,
-            "activation_link": activation_link,
-            "project_name": getattr(settings, "PROJECT_NAME", "IzotovLife"),
-        }
-
-        # Письмо: HTML + текст (шаблоны положите в backend/templates/emails/)
-        _send_html_mail(
-            subject=f"Активация аккаунта {ctx['project_name']}",
-            to=[user.email],
-            html_template="emails/activation_email.html",
-            text_template="emails/activation_email.txt",
-            context=ctx,
-            from_email=getattr(settings, "DEFAULT_FROM_EMAIL", "noreply@izotovlife.ru"),
-        )
+        # Ссылка активации — по домену запроса; токен в неё подставляет фоновая задача (accounts/tasks.py)
+        _send_user_mail(user, "activation", _origin_from_request(request))
 
         return Response({"detail": "Пользователь создан. Проверьте почту для активации."},
                         status=status.HTTP_201_CREATED)
@@ -248,25 +225,7 @@ class ResendActivationView(APIView):
 
         user = User.objects.filter(email__iexact=email).first()
         if user and not user.is_active:
-            uid = urlsafe_base64_encode(force_bytes(user.pk))
-            token = default_token_generator.make_token(user)
-
-            origin = _origin_from_request(request)
-            activation_link = f"{origin}/api/auth/activate/{uid}/{token}/"
-
-            ctx = {
-                "user": user,
-                "activation_link": activation_link,
-                "project_name": getattr(settings, "PROJECT_NAME", "IzotovLife"),
-            }
-            _send_html_mail(
-                subject=f"Активация аккаунта {ctx['project_name']}",
-                to=[user.email],
-                html_template="emails/activation_email.html",
-                text_template="emails/activation_email.txt",
-                context=ctx,
-                from_email=getattr(settings, "DEFAULT_FROM_EMAIL", "noreply@izotovlife.ru"),
-            )
+            _send_user_mail(user, "activation", _origin_from_request(request))
 
         # В любом случае (даже если не нашли пользователя) отвечаем одинаково
         return Response({"detail": "Если аккаунт существует и не активирован, письмо отправлено."}, status=200)
@@ -293,27 +252,10 @@ class PasswordResetRequestView(APIView):
             # Сохраняю ваше поведение по-умолчанию (404), НИЧЕГО НЕ УДАЛЯЮ
             return Response({"detail": "Пользователь с таким email не найден."}, status=404)
 
-        uid = urlsafe_base64_encode(force_bytes(user.pk))
-        token = default_token_generator.make_token(user)
-
-        # Ссылка на фронт для ввода нового пароля:
+        # Ссылка на фронт для ввода нового пароля (<база>/<uid>/<token>/, токен — в задаче):
         # По settings можно задать FRONTEND_RESET_URL = "http://localhost:3001/reset-password"
         reset_base = getattr(settings, "FRONTEND_RESET_URL", "http://localhost:3001/reset-password")
-        reset_link = f"{reset_base}/{uid}/{token}/"
-
-        ctx = {
-            "user": user,
-            "reset_link": reset_link,
-            "project_name": getattr(settings, "PROJECT_NAME", "IzotovLife"),
-        }
-        _send_html_mail(
-            subject=f"Восстановление пароля {ctx['project_name']}",
-            to=[user.email],
-            html_template="emails/reset_password_email.html",
-            text_template="emails/reset_password_email.txt",
-            context=ctx,
-            from_email=getattr(settings, "DEFAULT_FROM_EMAIL", "noreply@izotovlife.ru"),
-        )
+        _send_user_mail(user, "password_reset", reset_base)
 
         return Response({"detail": "Письмо для восстановления отправлено."}, status=200)
 
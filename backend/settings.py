@@ -75,12 +75,13 @@ INSTALLED_APPS = [
     "pages",
     "ckeditor",
     "image_guard",  # твой сторож картинок; если его нет — убери из списка
+    "jobs",  # фоновые задачи в БД (manage.py run_workers)
 ]
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "django.middleware.gzip.GZipMiddleware",  # ← ДОБАВЛЕНО: сжатие ответов (включая sitemap)
+    "news.middleware.GZipMiddleware",  # сжатие ответов (включая sitemap); ответы с Range (медиа) не сжимает
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     # "django.middleware.csrf.CsrfViewMiddleware",
@@ -281,12 +282,111 @@ LOGGING = {
     "loggers": {"news.api_extra_views": {"handlers": ["console"], "level": "INFO", "propagate": False}},
 }
 
-THUMB_CACHE_DIR = os.path.join(BASE_DIR, "media", "thumb_cache")
+# Служебный кэш миниатюр (оригиналы внешних картинок, news/image_proxy.py) — вне MEDIA_ROOT: /media/ его не отдаёт.
+# Прежний media/thumb_cache больше не используется, его можно удалить.
+THUMB_CACHE_DIR = os.getenv("THUMB_CACHE_DIR", os.path.join(BASE_DIR, ".thumb_cache"))
 os.makedirs(THUMB_CACHE_DIR, exist_ok=True)
 THUMB_DEFAULT_FORMATS = ("webp", "jpg")
 THUMB_DEFAULT_QUALITY = 82
 THUMB_MAX_ORIGINAL_BYTES = 8 * 1024 * 1024
 THUMB_REQUEST_TIMEOUT = (6.0, 12.0)
+THUMB_LOCK_TIMEOUT = 20.0  # сек: ожидание чужой генерации той же миниатюры (single-flight)
+THUMB_CACHE_MAX_BYTES = 2 * 1024 ** 3  # бюджет кэша миниатюр для thumbcache_gc (запускать по cron)
+THUMB_CACHE_EVICTION = "lru"  # lru | lfu
+# Индекс обращений к кэшу миниатюр и счётчики попаданий (news/utils/thumb_cache.py) — вне MEDIA_ROOT
+THUMB_INDEX_PATH = os.getenv("THUMB_INDEX_PATH", os.path.join(THUMB_CACHE_DIR, "thumbs-index.sqlite3"))
+THUMB_ORIGINALS_MAX_BYTES = int(os.getenv("THUMB_ORIGINALS_MAX_BYTES", 1024 ** 3))  # бюджет кэша оригиналов (thumbcache_gc)
+# Общий кэш миниатюр для нескольких веб-узлов (news/utils/thumb_store.py): "" — только диск узла;
+# "thumbs" — хранилище STORAGES["thumbs"] (общий диск THUMB_SHARED_DIR или S3 через django-storages)
+THUMB_STORAGE = os.getenv("THUMB_STORAGE", "")
+THUMB_STORAGE_PREFIX = "thumbs/"
+THUMB_STORAGE_LOCAL_CACHE = os.getenv("THUMB_STORAGE_LOCAL_CACHE", "True").lower() in ("true", "1", "yes")
+THUMB_STORAGE_MAX_BYTES = int(os.getenv("THUMB_STORAGE_MAX_BYTES", 20 * 1024 ** 3))  # бюджет общего кэша (thumbcache_gc)
+THUMB_STORAGE_TOUCH_INTERVAL = 3600  # сек: как часто обновлять время обращения к миниатюре в индексе
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "thumbs": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {"location": os.getenv("THUMB_SHARED_DIR", os.path.join(BASE_DIR, "media", "shared_thumbs"))},
+    },
+    # S3-совместимое хранилище (pip install django-storages boto3):
+    # "thumbs": {"BACKEND": "storages.backends.s3.S3Storage",
+    #            "OPTIONS": {"bucket_name": "izotovlife-thumbs", "endpoint_url": "https://s3.example.net"}},
+}
+THUMB_FAST_DECODE = True  # JPEG draft()/reduce() перед финальным ресайзом
+# Профили кодировщика: ondemand — в запросе (быстрее), pregen — фоновая предгенерация (меньше байт)
+THUMB_ENCODER_PROFILES = {
+    "ondemand": {"webp_method": 4, "avif_speed": 8, "jpeg_optimize": False, "jpeg_progressive": False},
+    "pregen": {"webp_method": 6, "avif_speed": 4, "jpeg_optimize": True, "jpeg_progressive": True},
+}
+THUMB_HTTP_POOL_SIZE = 32  # соединений на хост в общей сессии загрузки оригиналов
+# Отдача файлов кэша фронт-прокси (news/utils/sendfile.py): "" — через Django | nginx | xsendfile
+MEDIA_SENDFILE = os.getenv("MEDIA_SENDFILE", "")
+MEDIA_ACCEL_PREFIX = "/_protected_media/"  # internal-location nginx с alias на MEDIA_ROOT
+# /media/ через Django с поддержкой Range (news/views_media_serve.py): при DEBUG всегда, в проде — если True
+# (когда перед Django нет nginx, раздающего MEDIA_ROOT)
+MEDIA_SERVE_DJANGO = os.getenv("MEDIA_SERVE_DJANGO", "False").lower() in ("true", "1", "yes")
+MEDIA_RANGE_CHUNK = 64 * 1024  # байт за одно чтение из хранилища
+THUMB_DNS_TTL = 300  # сек: кэш DNS для SSRF-проверки (news/utils/safe_dns.py)
+THUMB_DNS_NEGATIVE_TTL = 30
+THUMB_DNS_PIN = True  # загрузка подключается к проверенному IP (SNI/Host — по имени)
+# Именованные размеры миниатюр (/api/media/thumbnail/?preset=card). Фронтенд берёт готовые ссылки card/hero
+# из поля thumbnails сериализаторов (THUMB_SERIALIZER_PRESETS), поэтому предгенерация попадает ровно в них
+THUMB_PRESETS = {
+    "card": {"w": 480, "h": 270, "q": 82, "fmt": "webp", "fit": "cover", "sharpen": 1},    # NewsCard
+    "detail": {"w": 640, "h": 360, "q": 82, "fmt": "webp", "fit": "cover", "sharpen": 1},  # «похожие» в статье
+    "hero": {"w": 980, "h": 520, "q": 85, "fmt": "webp", "fit": "cover", "sharpen": 1},    # обложка статьи
+}
+# Какие пресеты рендерить в фоне сразу после import_rss (задача news.pregen_thumbnails)
+THUMB_PREGEN_PRESETS = ("card", "hero")
+THUMB_PREGEN_ON_IMPORT = os.getenv("THUMB_PREGEN_ON_IMPORT", "True").lower() in ("true", "1", "yes")
+# Ограничение ссылок на ресайзер: open — любые параметры; presets — без подписи только ?preset=;
+# signed — только подписанные ссылки (поле thumbnails в сериализаторах, news/utils/thumb_urls.py)
+THUMB_URL_POLICY = os.getenv("THUMB_URL_POLICY", "open")
+THUMB_URL_SECRET = os.getenv("THUMB_URL_SECRET", "")  # пусто — подписываем SECRET_KEY
+THUMB_SERIALIZER_PRESETS = ("card", "hero")
+# Размеры/доминирующий цвет/LQIP картинки новости считаются в фоне после сохранения (задача news.image_meta)
+IMAGE_META_ON_SAVE = os.getenv("IMAGE_META_ON_SAVE", "True").lower() in ("true", "1", "yes")
+# Склейка одинаковых картинок под разными URL по dHash (news/utils/image_dedup.py): общие варианты миниатюр,
+# метаданные и проверка image_guard. Расстояние Хэмминга 0..3 (0 — только точное совпадение хэша).
+IMAGE_DEDUP_ENABLED = True
+IMAGE_DEDUP_MAX_DISTANCE = 3
+# Оптимизация загруженных картинок в фоне (news/utils/upload_optimize.py, задача news.optimize_upload)
+UPLOAD_OPTIMIZE = os.getenv("UPLOAD_OPTIMIZE", "True").lower() in ("true", "1", "yes")
+UPLOAD_MAX_SIDE = 2560  # px по большей стороне мастера
+UPLOAD_JPEG_QUALITY = 85
+UPLOAD_WEBP_QUALITY = 82
+UPLOAD_RENDITIONS = ("webp", "jpeg")  # варианты рядом с мастером: <имя>.r.webp / <имя>.r.jpg
+# Лимиты файлов формы «Предложить новость»: проверяются по ходу приёма (news/utils/upload_stream.py), превышение — 413
+SUGGEST_IMAGE_MAX_BYTES = int(os.getenv("SUGGEST_IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+SUGGEST_VIDEO_MAX_BYTES = int(os.getenv("SUGGEST_VIDEO_MAX_BYTES", str(150 * 1024 * 1024)))
+# Негативный кэш битых картинок (news/utils/image_failures.py): TTL по причине отказа, сек
+IMAGE_NEGATIVE_TTL = {"not_found": 24 * 3600, "forbidden": 6 * 3600, "not_image": 12 * 3600, "timeout": 300}
+IMAGE_HOST_FAIL_THRESHOLD = 20  # временных отказов (таймаут/5xx/соединение) за окно — хост считаем лежащим
+IMAGE_HOST_FAIL_WINDOW = 600
+THUMB_NEGATIVE_MAX_AGE = 600  # Cache-Control плейсхолдера вместо битой картинки
+# Рендер миниатюр в пуле процессов (news/utils/thumb_pool.py); 0 — рендерить в потоке запроса
+THUMB_POOL_WORKERS = int(os.getenv("THUMB_POOL_WORKERS", "2"))
+THUMB_POOL_MAX_PENDING = int(os.getenv("THUMB_POOL_MAX_PENDING", "8"))  # в работе + в очереди
+THUMB_POOL_TIMEOUT = 15.0  # сек ожидания результата из пула
+# Что отдавать, когда пул перегружен: original | placeholder | 503 (с Retry-After)
+THUMB_OVERLOAD_MODE = os.getenv("THUMB_OVERLOAD_MODE", "original")
+THUMB_OVERLOAD_RETRY_AFTER = 5  # сек, заголовок Retry-After для 503
+
+# image_guard: проверка картинок в фоне (image_guard/verify_queue.py, задачи jobs)
+IMAGE_GUARD_ASYNC = os.getenv("IMAGE_GUARD_ASYNC", "True").lower() in ("true", "1", "yes")
+IMAGE_GUARD_OK_TTL = 24 * 3600
+IMAGE_GUARD_BAD_TTL = 6 * 3600
+
+# Фоновые задачи (jobs/): воркеры — python manage.py run_workers
+# JOBS_RUN_INLINE=True — выполнять задачи сразу в процессе, без воркера (удобно в dev)
+JOBS_RUN_INLINE = os.getenv("JOBS_RUN_INLINE", "False").lower() in ("true", "1", "yes")
+JOBS_MAX_ATTEMPTS = 5
+JOBS_BACKOFF_BASE = 10       # сек; пауза перед повтором растёт вдвое с каждой попыткой
+JOBS_BACKOFF_MAX = 3600
+JOBS_LOCK_TIMEOUT = 15 * 60  # задача в running дольше — воркер считается упавшим
+JOBS_KEEP_DONE_DAYS = 7
 
 # =========================
 # 🔻 ДОБАВЛЕНО: allauth/dj-rest-auth для соц-входа Яндекс/ВК (без удаления старого)
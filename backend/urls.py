@@ -14,18 +14,19 @@
 #   • ✅ Stub метрик: /api/news/metrics/hit/ (200 OK)
 #   • ✅ Совместимый детальный путь: /api/article/<slug>/
 #   • ⚠️ Порядок: compat-ручки (check/toggle/metrics) идут ВЫШЕ include("news.urls")
+#   • ✅ /media/ с поддержкой Range/206 (news.views_media_serve) — при DEBUG или MEDIA_SERVE_DJANGO
 
+import re
 from importlib.util import find_spec
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.views.generic import TemplateView, RedirectView
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.cache import cache_page
 
 from django.conf import settings
-from django.conf.urls.static import static
 from django.templatetags.static import static as static_url
 
 # Sitemap views
@@ -39,6 +40,7 @@ from news.sitemaps import (
     ImportedNewsSitemap,
 )
 from news.views import CategoryListView
+from news.views_media_serve import serve_media
 from news.api_related import (
     related_news,
     related_news_legacy_simple,
@@ -165,6 +167,6 @@ if find_spec("news.urls_perf"):
 if find_spec("image_guard.urls"):
     urlpatterns += [path("api/media/", include(("image_guard.urls", "image_guard"), namespace="image_guard"))]
 
-# Раздача медиа в DEV
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Раздача медиа в DEV (и в проде без nginx перед Django): с Range, чтобы перемотка видео не качала файл заново
+if settings.DEBUG or getattr(settings, "MEDIA_SERVE_DJANGO", False):
+    urlpatterns += [re_path(r"^%s/(?P<path>.*)$" % re.escape(settings.MEDIA_URL.strip("/")), serve_media, name="media")]
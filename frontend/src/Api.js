@@ -817,7 +817,7 @@ export async function suggestNews(payload) {
       (p.video_file && typeof p.video_file === "object" && "size" in p.video_file);
 
     if (hasFile) {
-      // Собираем FormData (дублируем ключи файлов под популярные имена)
+      // Собираем FormData (каждый файл — один раз: бэкенд всё равно принимает только первый из синонимов)
       const fd = new FormData();
       const appendIf = (k, v) => { if (v != null && v !== "") fd.append(k, v); };
 
@@ -829,15 +829,8 @@ export async function suggestNews(payload) {
       appendIf("message", p.message);
       appendIf("website", p.website); // honeypot
 
-      if (p.image_file) {
-        fd.append("image_file", p.image_file);
-        fd.append("image", p.image_file);
-        fd.append("photo", p.image_file);
-      }
-      if (p.video_file) {
-        fd.append("video_file", p.video_file);
-        fd.append("video", p.video_file);
-      }
+      if (p.image_file) fd.append("image_file", p.image_file);
+      if (p.video_file) fd.append("video_file", p.video_file);
 
       // Токен капчи, если пришёл строкой в p.recaptcha
       if (typeof p.recaptcha === "string" && p.recaptcha.trim()) {
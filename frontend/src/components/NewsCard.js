@@ -118,6 +118,9 @@ function useNormalized(item) {
   }, [item]);
 }
 
+// Параметры пресета card (backend/settings.py THUMB_PRESETS) — для фолбэка, когда в ответе нет thumbnails
+const CARD_THUMB = { w: 480, h: 270, q: 82, fmt: "webp", fit: "cover" };
+
 export default function NewsCard({ item, badgeAlign = "right" }) {
   const { titleParts, titleAttr, detailTo, cover, source, date, categoryName, categorySlug } =
     useNormalized(item);
@@ -135,6 +138,9 @@ export default function NewsCard({ item, badgeAlign = "right" }) {
 
   const hasCover = Boolean(cover);
   const isAudioCover = hasCover && isAudioUrl(cover);
+  // Миниатюра карточки: готовая ссылка пресета card из API (рендерится заранее после импорта),
+  // иначе — те же параметры через ресайзер (ключ кэша совпадёт с пресетом)
+  const cardThumbSrc = !isAudioCover ? item?.thumbnails?.card || null : null;
 
   const ref = useRef(null);
 
@@ -159,9 +165,7 @@ export default function NewsCard({ item, badgeAlign = "right" }) {
 
       // Префетч + preconnect — ТОЛЬКО для изображений (не для аудио!)
       if (inInitial && hasCover && !isAudioCover) {
-        const w = 480;
-        const h = Math.round((w * 9) / 16);
-        const url = buildThumbnailUrl(cover, { w, h, q: 82, fmt: "webp", fit: "cover" });
+        const url = cardThumbSrc || buildThumbnailUrl(cover, CARD_THUMB);
         if (url) {
           const u = new URL(url, window.location.origin);
           const linkId = `preconnect-${u.host}`;
@@ -184,7 +188,7 @@ export default function NewsCard({ item, badgeAlign = "right" }) {
     return () => {
       io.disconnect();
     };
-  }, [hasCover, cover, isAudioCover]);
+  }, [hasCover, cover, isAudioCover, cardThumbSrc]);
 
   return (
     <article ref={ref} className={`${s.card} news-card`}>
@@ -194,8 +198,8 @@ export default function NewsCard({ item, badgeAlign = "right" }) {
           className={s.media}
           src={hasCover ? cover : null}
           alt={titleAttr}
-          w={480}
-          h={270}
+          thumb={CARD_THUMB}
+          thumbSrc={cardThumbSrc}
           style={{ aspectRatio: "16/9" }}
         />
         {/* Бейдж источника поверх медиы — только если это КАРТИНКА, а не аудио */}
@@ -5,6 +5,7 @@
 // - Никогда не шлёт в ресайзер data:/blob:/about: и аудио-файлы
 // - При любой ошибке показывает встроенный SVG-плейсхолдер (не 404)
 // - Поддерживает кастомные размеры (thumb={ w,h,q,fmt,fit })
+// - Готовая ссылка на миниатюру (thumbSrc — например, item.thumbnails.card из API) важнее thumb
 // - Аудио-URL рендерятся через <audio controls>
 // Зависимости: использует утилиты из Api.js (buildThumbnailUrl, buildThumbnailOrPlaceholder, isAudioUrl)
 
@@ -23,6 +24,7 @@ import {
  *  - alt: alt текст для <img>
  *  - className: классы для <img> или <audio>
  *  - thumb: опции ресайзера { w, h, q, fmt, fit }
+ *  - thumbSrc: готовый URL миниатюры (поле thumbnails из API — пресет, заранее отрендеренный бэкендом)
  *  - preferOriginal: не использовать ресайзер, показывать оригинал (для логотипов и т.п.)
  *  - loading: "lazy" | "eager"
  *  - sizes: <img sizes>
@@ -33,6 +35,7 @@ export default function SmartMedia({
   alt = "Изображение",
   className = "",
   thumb = { w: 1200, h: 630, q: 85, fmt: "webp", fit: "cover" },
+  thumbSrc,
   preferOriginal = false,
   loading = "lazy",
   sizes,
@@ -55,10 +58,11 @@ export default function SmartMedia({
       // показываем оригинальную картинку как есть, но при ошибке упадём на плейсхолдер
       return src || DEFAULT_NEWS_PLACEHOLDER;
     }
+    if (thumbSrc) return thumbSrc;
     // картинка через ресайзер; если ресайзер не подходит — вернётся плейсхолдер
     const viaResizer = buildThumbnailUrl(src, thumb);
     return viaResizer || buildThumbnailOrPlaceholder(src, thumb);
-  }, [failed, kind, preferOriginal, src, thumb]);
+  }, [failed, kind, preferOriginal, src, thumb, thumbSrc]);
 
   if (kind === "audio") {
     // аудио никогда не отправляем в ресайзер
@@ -95,16 +95,9 @@ export default function SuggestNewsModal({ open, onClose }) {
     // Honeypot (если заполнен — просто отправим; на бэке отсеется)
     if (form.website) fd.append("website", form.website);
 
-    // Файлы: кладём под несколькими ключами для совместимости с разными бэкендами
-    if (form.image_file) {
-      fd.append("image_file", form.image_file);
-      fd.append("image", form.image_file);
-      fd.append("photo", form.image_file);
-    }
-    if (form.video_file) {
-      fd.append("video_file", form.video_file);
-      fd.append("video", form.video_file);
-    }
+    // Файлы: по одному разу (бэкенд принимает только первый из ключей-синонимов, повторы лишь удлиняют загрузку)
+    if (form.image_file) fd.append("image_file", form.image_file);
+    if (form.video_file) fd.append("video_file", form.video_file);
 
     // reCAPTCHA токен (если есть ключ)
     let token = null;
@@ -682,9 +682,12 @@ export default function NewsDetailPage() {
   const categorySlug = item.category?.slug || params?.category || "news";
   const categoryTitle = item.category?.name || item.category?.title || catDict[categorySlug] || humanizeSlug(categorySlug);
 
-  // Готовим урл обложки без заглушек; если битая — скроем через onError
+  // Готовим урл обложки без заглушек; если битая — скроем через onError.
+  // Сначала — готовая ссылка пресета hero из API (её миниатюра рендерится заранее, сразу после импорта)
   const coverAbs = imageRaw ? absoluteMedia(imageRaw) : null;
-  const coverUrl = coverAbs ? buildThumb(coverAbs, { w: 980, h: 520, q: 85, fmt: "webp", fit: "cover" }) : null;
+  const coverUrl = imageRaw
+    ? item.thumbnails?.hero || buildThumb(coverAbs, { w: 980, h: 520, q: 85, fmt: "webp", fit: "cover" })
+    : null;
 
   return (
     <div className={`news-detail ${s.pageWrap}`}>
@@ -1,6 +1,7 @@
 # Путь: backend/image_guard/signals.py
 # Назначение: Слушатели post_save для Article и ImportedNews.
-# Если картинка бита — зачищаем поле у объекта сразу после сохранения.
+# Локальный файл проверяем сразу (это дёшево), удалённый URL — фоновой задачей jobs (verify_queue.py):
+# save() не ждёт сеть, а битая картинка зачищается чуть позже через queryset.update().
 
 from __future__ import annotations
 
@@ -8,9 +9,9 @@ from django.apps import apps
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from . import verify_queue
 from .utils import (
     is_url,
-    check_remote_image,
     check_local_image,
     pick_image_attr,
 )
@@ -20,47 +21,55 @@ from .utils import (
 # Ничего не падает, если какой-то модели нет — просто пропустим.
 WATCH = [
     ("news", "Article"),
-    ("rssfeed", "ImportedNews"),
+    ("news", "ImportedNews"),
 ]
 
 
 def _clean_broken_image_on_instance(instance) -> bool:
     """
-    Возвращает True, если картинка была очищена.
+    Возвращает True, если картинка была очищена сразу (локальный файл).
+    Удалённые URL уходят в очередь — результат применится после проверки.
     """
-    # Предохранитель от рекурсии при повторном save()
-    if getattr(instance, "_image_guard_checked", False):
-        return False
-    setattr(instance, "_image_guard_checked", True)
-
     field_name = pick_image_attr(instance)
     if not field_name:
         return False
 
     value = getattr(instance, field_name)
+    # Предохранитель: то же значение у этого объекта уже проверяли (повторный save())
+    checked = (field_name, str(getattr(value, "name", value)))
+    if getattr(instance, "_image_guard_checked", None) == checked:
+        return False
+    setattr(instance, "_image_guard_checked", checked)
+
+    label = instance._meta.label
     # ImageFieldFile
     if hasattr(value, "url"):
-        url = value.url
-        path = getattr(value, "path", None)
+        path = None
+        try:
+            path = value.path
+        except NotImplementedError:
+            pass  # удалённое хранилище — проверяем по URL
         if path:
             res = check_local_image(path)
-        else:
-            res = check_remote_image(url)
+            if not res.ok:
+                # Очищаем картинку — НЕ удаляем новость
+                try:
+                    cleared = verify_queue.clear_value(label, field_name, value.name, pk=instance.pk)
+                    if cleared:
+                        setattr(instance, field_name, None)
+                    return cleared
+                except Exception:
+                    # Даже если что-то пошло не так — не валим процесс
+                    return False
+            return False
+        url, stored = value.url, value.name
     else:
-        url = str(value)
-        if not url:
+        url = stored = str(value)
+        if not url or not is_url(url):
             return False
-        res = check_remote_image(url) if is_url(url) else None
 
-    if res and not res.ok:
-        # Очищаем картинку — НЕ удаляем новость
-        try:
-            setattr(instance, field_name, None)
-            instance.save(update_fields=[field_name])
-            return True
-        except Exception:
-            # Даже если что-то пошло не так — не валим процесс
-            return False
+    # Задача пишется в той же транзакции: откат сохранения — нет и задачи
+    verify_queue.enqueue(label, instance.pk, field_name, stored, url)
     return False
 
 
@@ -73,5 +82,5 @@ for app_label, model_name in WATCH:
 
     @receiver(post_save, sender=Model, weak=False)
     def image_guard_post_save(sender, instance, created, **kwargs):
-        # Проверяем на каждом save — нам важнее надёжность, чем лишний один HTTP HEAD/GET
+        # Проверяем на каждом save; сеть — в фоне, повторы одного URL гасит кеш результатов
         _clean_broken_image_on_instance(instance)
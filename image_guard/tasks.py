@@ -0,0 +1,11 @@
+# Путь: backend/image_guard/tasks.py
+# Назначение: Фоновая задача проверки картинки (ставится из post_save, см. verify_queue.py).
+
+from jobs.api import register
+
+from .verify_queue import check_and_clear
+
+
+@register("image_guard.verify_url")
+def verify_url(label, field_name, stored, url):
+    return check_and_clear(label, field_name, stored, url)
@@ -12,6 +12,8 @@ from urllib.parse import urlparse
 import requests
 from PIL import Image, ImageFile
 
+from django.db.models.fields.files import FieldFile
+
 
 # Чтобы Pillow мог распознать неполные потоки, не требуя докачки всего файла
 ImageFile.LOAD_TRUNCATED_IMAGES = True
@@ -69,58 +71,90 @@ def is_url(value: str) -> bool:
         return False
 
 
+HEADER_RANGE_BYTES = 16 * 1024  # первый Range-запрос; заголовков JPEG/PNG/WebP/GIF почти всегда хватает
+
+
+def _try_size(data: bytes) -> tuple[int | None, int | None]:
+    """Image.open читает только заголовок — размер известен без декодирования пикселей."""
+    try:
+        with Image.open(BytesIO(data)) as im:
+            return im.size
+    except Exception:
+        return (None, None)
+
+
 def check_remote_image(
     url: str,
     min_width: int = 80,
     min_height: int = 80,
-    max_bytes: int = 512 * 1024,  # считываем до 512КБ
+    max_bytes: int = 512 * 1024,  # верхняя граница; обычно читаем только первые HEADER_RANGE_BYTES
 ) -> ImageCheckResult:
     """
     Проверяет доступность и валидность удалённой картинки по URL без полной докачки.
+    Читаем только заголовок файла: запрос с Range: bytes=0-N, при нехватке байт — следующий
+    диапазон (вдвое больше), пока Pillow не узнает формат и размеры или не упрёмся в max_bytes.
+    Если сервер игнорирует Range (200 вместо 206) — читаем поток и обрываем, как только размеры известны.
+    Если 200 пришёл уже на докачке (после 206) — буфер начинаем заново: это тело с нулевого байта.
     Условия валидности:
       - HTTP < 400
       - Content-Type image/* (SVG пропускаем по заголовку)
       - Первые считанные байты распознаются как изображение Pillow
       - Размеры >= min_width/min_height (если удалось распознать)
     """
+    buf = BytesIO()
+    bytes_read = 0
+    status, ctype = None, ""
+    w = h = None
+    start, step = 0, HEADER_RANGE_BYTES
     try:
-        with requests.get(
-            url, stream=True, timeout=DEFAULT_TIMEOUT, headers=DEFAULT_HEADERS, allow_redirects=True
-        ) as r:
-            status = r.status_code
-            ctype = r.headers.get("Content-Type", "")
-            if status >= 400:
-                return ImageCheckResult(False, f"HTTP {status}", status_code=status, content_type=ctype, url=url)
-
-            # SVG: часто приходит как корректная картинка, Pillow её не открывает — пропускаем по типу
-            if "image/svg" in ctype:
-                return ImageCheckResult(True, "SVG content-type", status_code=status, content_type=ctype, url=url)
-
-            if not ctype.startswith("image/"):
-                # Иногда прокси отдают HTML-заглушку 200 OK — это не картинка
-                # Пробуем всё равно дочитать немного и понюхать Pillow
-                pass
-
-            buf = BytesIO()
-            bytes_read = 0
-            chunk_size = 16384
-            for chunk in r.iter_content(chunk_size=chunk_size):
-                if not chunk:
-                    break
-                buf.write(chunk)
-                bytes_read += len(chunk)
-                if bytes_read >= max_bytes:
-                    break
-
-            data = buf.getvalue()
-            w, h = _sniff_pillow(data)
-            if w is None or h is None:
-                return ImageCheckResult(False, "Не похоже на изображение", status_code=status, content_type=ctype, bytes_read=bytes_read, url=url)
-
-            if (w < min_width) or (h < min_height):
-                return ImageCheckResult(False, f"Слишком маленькое изображение {w}x{h}", status_code=status, content_type=ctype, width=w, height=h, bytes_read=bytes_read, url=url)
-
-            return ImageCheckResult(True, "OK", status_code=status, content_type=ctype, width=w, height=h, bytes_read=bytes_read, url=url)
+        while start < max_bytes and w is None:
+            end = min(max_bytes, start + step) - 1
+            headers = dict(DEFAULT_HEADERS, Range=f"bytes={start}-{end}")
+            with requests.get(
+                url, stream=True, timeout=DEFAULT_TIMEOUT, headers=headers, allow_redirects=True
+            ) as r:
+                if r.status_code == 416 and start > 0:
+                    break  # файл короче запрошенного диапазона — всё уже прочитано
+                if status is None:
+                    status = r.status_code
+                    ctype = r.headers.get("Content-Type", "")
+                    if status >= 400:
+                        return ImageCheckResult(False, f"HTTP {status}", status_code=status, content_type=ctype, url=url)
+
+                    # SVG: часто приходит как корректная картинка, Pillow её не открывает — пропускаем по типу
+                    if "image/svg" in ctype:
+                        return ImageCheckResult(True, "SVG content-type", status_code=status, content_type=ctype, url=url)
+
+                    # Не image/* (HTML-заглушка от прокси и т.п.) — всё равно «нюхаем» Pillow
+
+                ranged = r.status_code == 206
+                if not ranged and start > 0:
+                    if r.status_code >= 400:
+                        break  # докачка не удалась — судим по тому, что уже прочитано
+                    # сервер перестал отдавать диапазоны и прислал файл целиком (200) — тело с нулевого байта
+                    buf = BytesIO()
+                got = 0
+                for chunk in r.iter_content(chunk_size=8192):
+                    if not chunk:
+                        break
+                    buf.write(chunk)
+                    got += len(chunk)
+                    bytes_read += len(chunk)
+                    w, h = _try_size(buf.getvalue())
+                    if w is not None or buf.tell() >= max_bytes:
+                        break
+
+            if not ranged or got < end - start + 1:
+                break  # сервер отдал всё тело целиком или файл закончился
+            start, step = end + 1, step * 2
+
+        if w is None or h is None:
+            return ImageCheckResult(False, "Не похоже на изображение", status_code=status, content_type=ctype, bytes_read=bytes_read, url=url)
+
+        if (w < min_width) or (h < min_height):
+            return ImageCheckResult(False, f"Слишком маленькое изображение {w}x{h}", status_code=status, content_type=ctype, width=w, height=h, bytes_read=bytes_read, url=url)
+
+        return ImageCheckResult(True, "OK", status_code=status, content_type=ctype, width=w, height=h, bytes_read=bytes_read, url=url)
     except requests.RequestException as e:
         return ImageCheckResult(False, f"Network error: {e}", url=url)
     except Exception as e:
@@ -152,13 +186,15 @@ def pick_image_attr(instance) -> str | None:
     Находит подходящее поле с картинкой у объекта новости.
     Пытается по популярным именам, ничего не удаляет.
     """
-    candidates = ["image", "image_url", "cover", "thumbnail", "top_image", "photo"]
+    candidates = ["image", "image_url", "cover", "cover_image", "thumbnail", "top_image", "photo"]
     for name in candidates:
         if hasattr(instance, name):
             val = getattr(instance, name)
-            # ImageFieldFile -> берём .url
-            if hasattr(val, "url"):
-                return name
+            # ImageFieldFile -> берём .url (пустой файл пропускаем: .url у него бросает ValueError)
+            if isinstance(val, FieldFile):
+                if val:
+                    return name
+                continue
             # Строка URL
             if isinstance(val, str) and val.strip():
                 return name
@@ -0,0 +1,112 @@
+# Путь: backend/image_guard/verify_queue.py
+# Назначение: Фоновая проверка картинок (вместо синхронного HTTP в post_save).
+# Как работает:
+#   • post_save ставит задачу image_guard.verify_url в очередь jobs — save() не ждёт сеть.
+#   • Результат проверки кешируется по URL (Django cache) с TTL: хорошие — IMAGE_GUARD_OK_TTL,
+#     битые — IMAGE_GUARD_BAD_TTL. Известный результат применяется сразу, без похода в сеть.
+#   • Один URL у нескольких новостей проверяется один раз: пока задача для значения ждёт в очереди,
+#     новая не создаётся (unique_key), а зачистка идёт по значению поля — задевает все такие новости.
+#   • URL, привязанный к канонической картинке (news/utils/image_dedup.py), уже скачан и распознан —
+#     в сеть за ним не ходим: результат общий для всех URL-дубликатов.
+#   • Битая картинка зачищается через queryset.update() — без повторного save() и сигналов,
+#     и только если в поле всё ещё лежит проверенное значение.
+# Настройки (settings.py, всё необязательно):
+#   IMAGE_GUARD_ASYNC = True            — False: проверять сразу в post_save (как раньше, но с кешем)
+#   IMAGE_GUARD_OK_TTL / IMAGE_GUARD_BAD_TTL — сколько помнить результат, секунд
+
+from __future__ import annotations
+
+import hashlib
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+
+from jobs.api import PRIORITY_LOW, enqueue as enqueue_job
+
+from .utils import ImageCheckResult, check_remote_image
+
+log = logging.getLogger(__name__)
+
+CACHE_PREFIX = "image_guard:url:"
+DEFAULT_OK_TTL = 24 * 3600
+DEFAULT_BAD_TTL = 6 * 3600
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _sha1(value: str) -> str:
+    return hashlib.sha1(value.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def cached_result(url: str) -> ImageCheckResult | None:
+    data = cache.get(CACHE_PREFIX + _sha1(url))
+    if not data:
+        return None
+    return ImageCheckResult(ok=data["ok"], reason=data.get("reason", ""), url=url)
+
+
+def _canonical_result(url: str) -> ImageCheckResult | None:
+    """Положительный результат без HTTP, если URL уже склеен с канонической картинкой."""
+    if not apps.is_installed("news"):
+        return None
+    from news.utils.image_dedup import canonical_for_url
+
+    canonical = canonical_for_url(url)
+    if canonical is None:
+        return None
+    return ImageCheckResult(ok=True, reason="canonical", url=url, width=canonical.width, height=canonical.height)
+
+
+def verify_url(url: str) -> ImageCheckResult:
+    """Проверка URL с учётом кеша результатов."""
+    res = cached_result(url)
+    if res is not None:
+        return res
+    res = _canonical_result(url) or check_remote_image(url)
+    ttl = _setting("IMAGE_GUARD_OK_TTL", DEFAULT_OK_TTL) if res.ok else _setting("IMAGE_GUARD_BAD_TTL", DEFAULT_BAD_TTL)
+    cache.set(CACHE_PREFIX + _sha1(url), {"ok": res.ok, "reason": res.reason}, ttl)
+    return res
+
+
+def clear_value(label: str, field_name: str, stored, pk=None) -> int:
+    """Зачищает поле картинки у записей, где в нём лежит stored (только у pk, если задан). Возвращает число строк."""
+    Model = apps.get_model(label)
+    field = Model._meta.get_field(field_name)
+    empty = None if field.null else ""
+    qs = Model._default_manager.filter(**{field_name: stored})
+    if pk is not None:
+        qs = qs.filter(pk=pk)
+    return qs.update(**{field_name: empty})
+
+
+def check_and_clear(label: str, field_name: str, stored, url: str) -> dict:
+    """Тело фоновой задачи: проверить URL и зачистить битое значение."""
+    res = verify_url(url)
+    cleared = 0 if res.ok else clear_value(label, field_name, stored)
+    if cleared:
+        log.info("image_guard: очищена картинка у %s записей %s (%s): %s", cleared, label, url, res.reason)
+    return {"ok": res.ok, "reason": res.reason, "cleared": cleared}
+
+
+def enqueue(label: str, pk, field_name: str, stored, url: str) -> None:
+    """
+    Ставит URL на проверку. Если результат уже в кеше — применяет его сразу.
+    При IMAGE_GUARD_ASYNC=False проверяет синхронно.
+    """
+    res = cached_result(url)
+    if res is None and not _setting("IMAGE_GUARD_ASYNC", True):
+        res = verify_url(url)
+    if res is not None:
+        if not res.ok:
+            clear_value(label, field_name, stored, pk=pk)
+        return
+    enqueue_job(
+        "image_guard.verify_url",
+        {"label": label, "field_name": field_name, "stored": stored, "url": url},
+        priority=PRIORITY_LOW,
+        unique_key=f"image_guard:{label}.{field_name}:{_sha1(str(stored))}",
+    )
@@ -0,0 +1,23 @@
+# Путь: backend/jobs/admin.py
+# Назначение: Просмотр очереди фоновых задач в админке + повторный запуск проваленных.
+
+from django.contrib import admin, messages
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "status", "priority", "attempts", "max_attempts", "run_at", "finished_at")
+    list_filter = ("status", "name")
+    search_fields = ("name", "unique_key", "last_error")
+    readonly_fields = ("locked_by", "locked_at", "last_error", "result", "created_at", "finished_at")
+    actions = ["requeue"]
+
+    @admin.action(description="Поставить в очередь заново")
+    def requeue(self, request, queryset):
+        n = queryset.exclude(status=Job.Status.RUNNING).update(
+            status=Job.Status.QUEUED, attempts=0, run_at=timezone.now(), locked_by="", locked_at=None
+        )
+        self.message_user(request, f"Возвращено в очередь: {n}", level=messages.SUCCESS)
@@ -0,0 +1,86 @@
+# Путь: backend/jobs/api.py
+# Назначение: Публичный API фоновых задач.
+#   @register("rssfeed.import_source")       — объявить обработчик (в <app>/tasks.py, собирается автоматически)
+#   enqueue("rssfeed.import_source", {"source_id": 1}, priority=PRIORITY_HIGH)  — поставить задачу
+# Аргументы — только JSON-совместимые (id, строки, числа), не модели и не файлы.
+# Задача создаётся в текущей транзакции: откат — и задачи нет, воркер увидит её только после коммита.
+# Настройки (settings.py):
+#   JOBS_RUN_INLINE = False   — True: выполнять сразу после коммита в этом же процессе (dev без воркера)
+#   JOBS_MAX_ATTEMPTS = 5     — попыток по умолчанию
+
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Job
+
+log = logging.getLogger(__name__)
+
+PRIORITY_LOW = -10
+PRIORITY_DEFAULT = 0
+PRIORITY_HIGH = 10
+
+_registry: dict[str, Callable] = {}
+
+
+def register(name: str):
+    """Декоратор: регистрирует функцию как обработчик задачи name. Вызывается как func(**payload)."""
+
+    def deco(func):
+        if name in _registry and _registry[name] is not func:
+            raise ValueError(f"Задача {name!r} уже зарегистрирована ({_registry[name].__module__})")
+        _registry[name] = func
+        return func
+
+    return deco
+
+
+def get_handler(name: str) -> Callable | None:
+    return _registry.get(name)
+
+
+def registered() -> list[str]:
+    return sorted(_registry)
+
+
+def enqueue(
+    name: str,
+    payload: dict | None = None,
+    *,
+    priority: int = PRIORITY_DEFAULT,
+    delay: float = 0,
+    max_attempts: int | None = None,
+    unique_key: str = "",
+) -> Job:
+    """
+    Ставит задачу в очередь и возвращает Job.
+    unique_key — если такая задача уже ждёт в очереди, новая не создаётся (возвращается существующая).
+    """
+    if name not in _registry:
+        raise LookupError(f"Неизвестная задача {name!r}; зарегистрируйте её через @register в tasks.py")
+
+    if unique_key:
+        existing = Job.objects.filter(unique_key=unique_key, status=Job.Status.QUEUED).first()
+        if existing is not None:
+            return existing
+
+    job = Job.objects.create(
+        name=name,
+        payload=payload or {},
+        priority=priority,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or getattr(settings, "JOBS_MAX_ATTEMPTS", 5),
+        unique_key=unique_key,
+    )
+
+    if getattr(settings, "JOBS_RUN_INLINE", False) and not delay:
+        from .worker import run_inline
+
+        transaction.on_commit(lambda: run_inline(job.pk))
+    return job
@@ -0,0 +1,15 @@
+# Путь: backend/jobs/apps.py
+# Назначение: Конфиг приложения фоновых задач. При старте собирает обработчики из <app>/tasks.py.
+
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "jobs"
+    verbose_name = "Фоновые задачи"
+
+    def ready(self):
+        # Обработчики регистрируются декоратором @register при импорте модулей tasks.py
+        autodiscover_modules("tasks")
@@ -0,0 +1,89 @@
+# Путь: backend/jobs/management/commands/run_workers.py
+# Назначение: Запуск воркеров фоновых задач (таблица jobs.Job).
+# Использование:
+#   python manage.py run_workers                  # 1 поток, работает до Ctrl+C / SIGTERM
+#   python manage.py run_workers --concurrency 4  # 4 потока (на PostgreSQL; на SQLite оставляйте 1)
+#   python manage.py run_workers --once           # выполнить всё готовое и выйти (cron, CI)
+# Каждый поток берёт по одной задаче (SKIP LOCKED / оптимистичный захват, см. jobs/worker.py).
+
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from jobs import worker
+
+HOUSEKEEPING_EVERY_S = 60
+
+
+class Command(BaseCommand):
+    help = "Выполняет фоновые задачи из очереди jobs.Job."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=1, help="Число потоков-воркеров.")
+        parser.add_argument("--once", action="store_true", help="Выполнить готовые задачи и завершиться.")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Пауза опроса пустой очереди, сек.")
+
+    def handle(self, *args, **options):
+        self.verbosity = int(options["verbosity"])
+        self.stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                signal.signal(sig, lambda *_: self.stop.set())
+            except ValueError:  # не главный поток (например, call_command из теста)
+                pass
+
+        base_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.done = self.failed = 0
+        self.lock = threading.Lock()
+
+        worker.requeue_stale()
+        concurrency = max(1, options["concurrency"])
+        self.stdout.write(f"▶ Воркеры: {concurrency} ({'до опустошения очереди' if options['once'] else 'постоянно'})")
+
+        threads = [
+            threading.Thread(
+                target=self._loop, args=(f"{base_id}:{i}", options["once"], options["sleep"]), daemon=True
+            )
+            for i in range(concurrency)
+        ]
+        for t in threads:
+            t.start()
+
+        last_housekeeping = time.monotonic()
+        while any(t.is_alive() for t in threads):
+            time.sleep(0.2)
+            if not options["once"] and time.monotonic() - last_housekeeping > HOUSEKEEPING_EVERY_S:
+                last_housekeeping = time.monotonic()
+                worker.requeue_stale()
+                worker.purge_finished()
+                close_old_connections()
+        for t in threads:
+            t.join()
+
+        self.stdout.write(self.style.SUCCESS(f"✓ Выполнено: {self.done}, с ошибкой: {self.failed}"))
+
+    def _loop(self, worker_id, once, sleep_s):
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                job = worker.claim(worker_id)
+                if job is None:
+                    if once:
+                        return
+                    self.stop.wait(sleep_s)
+                    continue
+                ok = worker.execute(job)
+                with self.lock:
+                    if ok:
+                        self.done += 1
+                    else:
+                        self.failed += 1
+                if self.verbosity > 1:
+                    self.stdout.write(f"  {'✓' if ok else '✖'} #{job.pk} {job.name}")
+        finally:
+            connection.close()
@@ -0,0 +1,42 @@
+# Путь: backend/jobs/models.py
+# Назначение: Очередь фоновых задач в БД (без Redis/Celery).
+# Одна строка — один вызов зарегистрированного обработчика (jobs/api.py) с JSON-аргументами.
+# Воркеры (manage.py run_workers) забирают строки по priority/run_at, при ошибке — повтор с экспоненциальной паузой.
+
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = "queued", "В очереди"
+        RUNNING = "running", "Выполняется"
+        DONE = "done", "Готово"
+        FAILED = "failed", "Ошибка"
+
+    name = models.CharField("Задача", max_length=100, db_index=True)
+    payload = models.JSONField("Аргументы", default=dict, blank=True)
+    priority = models.SmallIntegerField("Приоритет", default=0, help_text="Больше — раньше")
+    status = models.CharField("Статус", max_length=10, choices=Status.choices, default=Status.QUEUED)
+    run_at = models.DateTimeField("Запустить не раньше", default=timezone.now)
+    attempts = models.PositiveSmallIntegerField("Попыток", default=0)
+    max_attempts = models.PositiveSmallIntegerField("Максимум попыток", default=5)
+    unique_key = models.CharField("Ключ дедупликации", max_length=200, blank=True, default="", db_index=True)
+    locked_by = models.CharField("Воркер", max_length=64, blank=True, default="")
+    locked_at = models.DateTimeField("Взята в работу", null=True, blank=True)
+    last_error = models.TextField("Последняя ошибка", blank=True, default="")
+    result = models.JSONField("Результат", null=True, blank=True)
+    created_at = models.DateTimeField("Создана", auto_now_add=True)
+    finished_at = models.DateTimeField("Завершена", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        ordering = ["-created_at"]
+        indexes = [
+            # выборка воркером: WHERE status='queued' AND run_at <= now ORDER BY priority DESC, run_at
+            models.Index(fields=["status", "-priority", "run_at"], name="jobs_job_claim_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.name} [{self.status}]"
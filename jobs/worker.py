@@ -0,0 +1,132 @@
+# Путь: backend/jobs/worker.py
+# Назначение: Выборка и выполнение задач из таблицы Job (используется manage.py run_workers).
+# Захват задачи:
+#   • PostgreSQL/MySQL 8: SELECT … FOR UPDATE SKIP LOCKED — воркеры не ждут друг друга и не берут одно и то же.
+#   • SQLite и прочие: оптимистично — UPDATE … WHERE pk=… AND status='queued'; кто обновил строку, тот и взял.
+# Ошибка обработчика → повтор через JOBS_BACKOFF_BASE * 2^(попытка-1) секунд (не больше JOBS_BACKOFF_MAX),
+# после max_attempts — статус failed. Задачи, «зависшие» в running дольше JOBS_LOCK_TIMEOUT
+# (упавший воркер), возвращаются в очередь.
+
+from __future__ import annotations
+
+import json
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .api import get_handler
+from .models import Job
+
+log = logging.getLogger(__name__)
+
+CLAIM_CANDIDATES = 10
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def backoff_seconds(attempts: int) -> float:
+    base = _setting("JOBS_BACKOFF_BASE", 10)
+    cap = _setting("JOBS_BACKOFF_MAX", 3600)
+    delay = min(cap, base * 2 ** max(attempts - 1, 0))
+    return delay * random.uniform(0.8, 1.2)  # разброс, чтобы повторы не шли пачкой
+
+
+def _ready_qs(now):
+    return Job.objects.filter(status=Job.Status.QUEUED, run_at__lte=now).order_by("-priority", "run_at", "pk")
+
+
+def _mark_running(pk, worker_id, now) -> int:
+    return Job.objects.filter(pk=pk, status=Job.Status.QUEUED).update(
+        status=Job.Status.RUNNING, locked_by=worker_id, locked_at=now, attempts=F("attempts") + 1
+    )
+
+
+def claim(worker_id: str) -> Job | None:
+    """Забирает одну готовую задачу или возвращает None."""
+    now = timezone.now()
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            pk = _ready_qs(now).select_for_update(skip_locked=True).values_list("pk", flat=True).first()
+            if pk is None:
+                return None
+            _mark_running(pk, worker_id, now)
+        return Job.objects.get(pk=pk)
+
+    for pk in list(_ready_qs(now).values_list("pk", flat=True)[:CLAIM_CANDIDATES]):
+        if _mark_running(pk, worker_id, now):
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def _jsonable(value):
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return repr(value)
+
+
+def execute(job: Job) -> bool:
+    """Выполняет уже захваченную задачу и записывает итог. True — успех."""
+    handler = get_handler(job.name)
+    try:
+        if handler is None:
+            raise LookupError(f"Обработчик {job.name!r} не зарегистрирован")
+        result = handler(**(job.payload or {}))
+    except Exception as e:
+        now = timezone.now()
+        err = "".join(traceback.format_exception(type(e), e, e.__traceback__))[-4000:]
+        if job.attempts >= job.max_attempts or handler is None:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.Status.FAILED, last_error=err, finished_at=now, locked_by="", locked_at=None
+            )
+            log.error("jobs: #%s %s провалилась окончательно: %s", job.pk, job.name, e)
+        else:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.Status.QUEUED,
+                last_error=err,
+                run_at=now + timedelta(seconds=backoff_seconds(job.attempts)),
+                locked_by="",
+                locked_at=None,
+            )
+            log.warning("jobs: #%s %s ошибка (попытка %s/%s): %s", job.pk, job.name, job.attempts, job.max_attempts, e)
+        return False
+
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.Status.DONE, result=_jsonable(result), finished_at=timezone.now(), locked_by="", locked_at=None
+    )
+    return True
+
+
+def run_inline(pk) -> bool:
+    """JOBS_RUN_INLINE: выполнить задачу сразу в текущем процессе."""
+    now = timezone.now()
+    if not _mark_running(pk, "inline", now):
+        return False
+    return execute(Job.objects.get(pk=pk))
+
+
+def requeue_stale() -> int:
+    """Возвращает в очередь задачи упавших воркеров. Возвращает число возвращённых."""
+    cutoff = timezone.now() - timedelta(seconds=_setting("JOBS_LOCK_TIMEOUT", 15 * 60))
+    stale = Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=cutoff)
+    stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.Status.FAILED, last_error="Воркер не завершил задачу", finished_at=timezone.now(),
+        locked_by="", locked_at=None,
+    )
+    return stale.update(status=Job.Status.QUEUED, locked_by="", locked_at=None)
+
+
+def purge_finished() -> int:
+    """Удаляет выполненные задачи старше JOBS_KEEP_DONE_DAYS (проваленные остаются для разбора)."""
+    cutoff = timezone.now() - timedelta(days=_setting("JOBS_KEEP_DONE_DAYS", 7))
+    deleted, _ = Job.objects.filter(status=Job.Status.DONE, finished_at__lt=cutoff).delete()
+    return deleted
@@ -5,6 +5,7 @@
 #   - Превью логотипа источника и картинки новости.
 #   - Фильтр по источнику с логотипами.
 #   - ✅ Подключен раздел "Логи резолвера" через admin_logs.py.
+#   - ✅ Отчёт по дубликатам картинок (канонические картинки) через admin_images.py.
 
 from django.contrib import admin
 from django.utils.html import format_html
@@ -14,6 +15,7 @@ from django.db.models import Count
 from .models import Category, Article, ImportedNews, NewsSource
 # ✅ добавляем регистрацию логов
 from .admin_logs import *
+from .admin_images import *
 
 
 @admin.register(Category)
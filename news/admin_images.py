@@ -0,0 +1,130 @@
+# backend/news/admin_images.py
+# Назначение: Отчёт по дубликатам картинок (CanonicalImage / ImageUrl, см. news/utils/image_dedup.py).
+# Фишки:
+#   - Сортировка по числу URL: сверху крупнейшие кластеры (агентские фото, которые перепечатали все).
+#   - Фильтр «только дубликаты» (картинка встречается больше чем под одним URL).
+#   - Превью картинки по LQIP и список всех её URL (только чтение).
+#   - Результаты проверок картинок (ImageProbe, manage.py probe_images): фильтр по доступности и статусу.
+#   - Оптимизированные загрузки (OptimizedUpload): сколько сэкономлено на каждом файле и всего.
+
+from django.contrib import admin
+from django.db.models import Count, F, Sum
+from django.utils.html import format_html
+
+from .models_images import CanonicalImage, ImageProbe, ImageUrl, OptimizedUpload
+
+
+class DuplicatesFilter(admin.SimpleListFilter):
+    title = "Дубликаты"
+    parameter_name = "dups"
+
+    def lookups(self, request, model_admin):
+        return (("yes", "Только под несколькими URL"), ("no", "Только под одним URL"))
+
+    def queryset(self, request, queryset):
+        if self.value() == "yes":
+            return queryset.filter(url_count__gt=1)
+        if self.value() == "no":
+            return queryset.filter(url_count__lte=1)
+        return queryset
+
+
+class ImageUrlInline(admin.TabularInline):
+    model = ImageUrl
+    fields = ("url", "created_at")
+    readonly_fields = ("url", "created_at")
+    extra = 0
+    can_delete = False
+    show_change_link = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CanonicalImage)
+class CanonicalImageAdmin(admin.ModelAdmin):
+    list_display = ("id", "preview", "dhash", "size", "url_count", "first_url", "created_at")
+    list_filter = (DuplicatesFilter, "created_at")
+    search_fields = ("dhash", "urls__url")
+    readonly_fields = [f.name for f in CanonicalImage._meta.fields] + ["preview"]
+    inlines = (ImageUrlInline,)
+    list_per_page = 50
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        return qs.annotate(url_count=Count("urls")).order_by("-url_count", "-id")
+
+    def has_add_permission(self, request):
+        return False
+
+    def url_count(self, obj):
+        return obj.url_count
+    url_count.short_description = "URL"
+    url_count.admin_order_field = "url_count"
+
+    def size(self, obj):
+        return f"{obj.width}×{obj.height}"
+    size.short_description = "Размер"
+
+    def first_url(self, obj):
+        link = obj.urls.order_by("id").first()
+        return (link.url[:80] + "...") if link and len(link.url) > 80 else (link.url if link else "")
+    first_url.short_description = "Первый URL"
+
+    def preview(self, obj):
+        if not obj.lqip:
+            return format_html('<span style="display:inline-block;width:48px;height:27px;background:{}"></span>',
+                               obj.color or "#eee")
+        return format_html('<img src="{}" style="width:48px;height:auto;image-rendering:auto">', obj.lqip)
+    preview.short_description = "Превью"
+
+
+@admin.register(ImageProbe)
+class ImageProbeAdmin(admin.ModelAdmin):
+    list_display = ("checked_at", "ok", "status", "http_status", "size", "short_url")
+    list_filter = ("ok", "status", "checked_at")
+    search_fields = ("url",)
+    ordering = ("-checked_at",)
+    readonly_fields = [f.name for f in ImageProbe._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def size(self, obj):
+        return f"{obj.width}×{obj.height}" if obj.width else ""
+    size.short_description = "Размер"
+
+    def short_url(self, obj):
+        return (obj.url[:80] + "...") if len(obj.url) > 80 else obj.url
+    short_url.short_description = "URL"
+
+
+@admin.register(OptimizedUpload)
+class OptimizedUploadAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "name", "before", "after", "saved", "replaced")
+    list_filter = ("replaced", "created_at")
+    search_fields = ("name",)
+    ordering = ("-created_at",)
+    readonly_fields = [f.name for f in OptimizedUpload._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        totals = OptimizedUpload.objects.aggregate(before=Sum("original_bytes"), saved=Sum(F("original_bytes") - F("optimized_bytes")))
+        if totals["before"]:
+            self.message_user(request, f"Сэкономлено всего: {totals['saved'] / 1024 / 1024:.1f} МБ "
+                                       f"({totals['saved'] * 100 / totals['before']:.0f}% от загруженного)")
+        return super().changelist_view(request, extra_context)
+
+    def before(self, obj):
+        return f"{obj.original_width}×{obj.original_height}, {obj.original_bytes // 1024} КБ"
+    before.short_description = "Было"
+
+    def after(self, obj):
+        return f"{obj.width}×{obj.height}, {obj.optimized_bytes // 1024} КБ"
+    after.short_description = "Стало"
+
+    def saved(self, obj):
+        return f"{obj.saved_bytes * 100 // obj.original_bytes if obj.original_bytes else 0}%"
+    saved.short_description = "Экономия"
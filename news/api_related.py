@@ -9,6 +9,7 @@
 #   ✅ Больше «говорящих» полей картинок (image/cover/lead_image/thumbnail/main_image/image_url/cover_image)
 #   ✅ Мягкий обработчик пустого slug: GET /api/news/related/ → 200 с {"items": []} (гасит 404-спам старого фронта)
 #   ✅ НИЧЕГО существующего не удалено — только добавлено и усилено.
+#   ✅ _kw_query: OR из title__icontains через news/utils/trigram.py — в PostgreSQL идёт по триграммному индексу
 #
 # Примечание: чтобы гасить запросы без slug, в urls.py должен быть маршрут:
 #   path("api/news/related/", related_news_empty, name="related_news_empty"),
@@ -20,6 +21,8 @@ from django.utils.dateparse import parse_datetime
 from datetime import datetime
 from typing import Optional
 
+from news.utils import trigram
+
 
 def _get_model(app_label, model_name):
     try:
@@ -133,10 +136,7 @@ def _kw_query(title: str) -> Q:
         words.append(lw)
         if len(words) >= 6:
             break
-    q = Q()
-    for w in words:
-        q |= Q(title__icontains=w)
-    return q
+    return trigram.contains_any(["title"], words)  # в PostgreSQL — по триграммному индексу
 
 
 def _serialize(obj):
@@ -1,15 +1,33 @@
 # backend/news/image_proxy.py
 # Описание: Вспомогательные функции для безопасного скачивания внешних изображений и кэширования оригиналов.
+#           Кэш оригиналов (THUMB_CACHE_DIR/orig, вне MEDIA_ROOT) — единый источник для всех вариантов миниатюр
+#           (views_media). Файлы разложены по ab/cd/<sha1>.<ext> и записаны в свой индекс обращений ORIG_INDEX —
+#           размер держит thumbcache_gc (бюджет THUMB_ORIGINALS_MAX_BYTES).
 
+import atexit
 import hashlib
 import mimetypes
 import os
+import threading
 from urllib.parse import urlparse
 
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from news.utils.image_dedup import register_original
+from news.utils.safe_dns import PinnedAdapter
+from news.utils.thumb_cache import AccessIndex, atomic_write, bump, shard_path, single_flight
 
 ALLOWED_SCHEMES = {"http", "https"}
+ORIGINAL_EXTS = ("jpg", "jpeg", "png", "webp", "avif", "gif")
+
+_session = None
+_session_lock = threading.Lock()
+
+ORIG_DIR = os.path.join(settings.THUMB_CACHE_DIR, "orig")
+ORIG_INDEX = AccessIndex(ORIG_DIR)
+atexit.register(ORIG_INDEX.flush)
 
 def sha1(s: str) -> str:
     return hashlib.sha1(s.encode("utf-8"), usedforsecurity=False).hexdigest()
@@ -38,45 +56,93 @@ def ensure_dir(p: str):
     os.makedirs(p, exist_ok=True)
 
 def cached_original_path_for(url: str) -> str:
-    key = sha1(url)
-    folder = os.path.join(settings.THUMB_CACHE_DIR, "orig")
-    ensure_dir(folder)
     # расширение определим после скачивания по Content-Type
-    return os.path.join(folder, key)
+    return shard_path(ORIG_DIR, sha1(url), "")
 
-def download_original(url: str) -> str:
+def get_session() -> requests.Session:
     """
-    Скачивает внешнюю картинку (если ещё не скачана) в кэш и возвращает путь к файлу.
+    Общая сессия с пулом соединений: повторные запросы к тем же хостам не открывают TCP/TLS заново.
+    С THUMB_DNS_PIN соединения (и редиректы) идут только на проверенные публичные IP (utils/safe_dns.py).
     """
-    parsed = urlparse(url)
-    if parsed.scheme not in ALLOWED_SCHEMES:
-        raise ValueError("URL scheme not allowed")
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                sess = requests.Session()
+                pool = getattr(settings, "THUMB_HTTP_POOL_SIZE", 32)
+                adapter_cls = PinnedAdapter if getattr(settings, "THUMB_DNS_PIN", True) else HTTPAdapter
+                adapter = adapter_cls(pool_connections=pool, pool_maxsize=pool)
+                sess.mount("http://", adapter)
+                sess.mount("https://", adapter)
+                _session = sess
+    return _session
 
+def find_cached_original(url: str) -> str | None:
     base_path = cached_original_path_for(url)
     # проверим, не лежит ли уже файл с любым известным расширением
-    for ext in ("jpg", "jpeg", "png", "webp", "avif", "gif"):
+    for ext in ORIGINAL_EXTS:
         probe = f"{base_path}.{ext}"
         if os.path.exists(probe) and os.path.getsize(probe) > 0:
             return probe
+    return None
+
+def download_original(url: str, headers: dict | None = None, fetch_url: str | None = None) -> str:
+    """
+    Скачивает внешнюю картинку (если ещё не скачана) в кэш и возвращает путь к файлу.
+    Один оригинал на URL — из него делаются все варианты миниатюр (размер/формат/качество).
+    fetch_url — откуда реально качать (например, тот же адрес с другой схемой), кэш — по url.
+    Одновременные промахи по одному URL качают файл один раз (single-flight), запись атомарная.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ALLOWED_SCHEMES:
+        raise ValueError("URL scheme not allowed")
+
+    key = sha1(url)
+    found = find_cached_original(url)
+    if found:
+        bump("orig_hit")
+        ORIG_INDEX.touch(key)
+        return found
+
+    lock_dir = os.path.join(ORIG_DIR, ".locks")
+    with single_flight(key, lock_dir, timeout=getattr(settings, "THUMB_LOCK_TIMEOUT", 20.0)):
+        found = find_cached_original(url)
+        if found:
+            bump("orig_hit")
+            return found
+        bump("orig_miss")
+
+        # качаем
+        with get_session().get(
+            fetch_url or url,
+            timeout=getattr(settings, "THUMB_REQUEST_TIMEOUT", (5, 10)),
+            stream=True,
+            headers=headers,
+            allow_redirects=True,
+        ) as r:
+            r.raise_for_status()
+            ctype = (r.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+            if not ctype.startswith("image/"):
+                # HTML-заглушка / SVG без image/* — кэшировать нечего
+                raise ValueError(f"content-type not image: {ctype or 'unknown'}")
+
+            max_bytes = getattr(settings, "THUMB_MAX_ORIGINAL_BYTES", 8 * 1024 * 1024)
+            total = 0
+            chunks = []
+            for chunk in r.iter_content(64 * 1024):
+                if chunk:
+                    total += len(chunk)
+                    if total > max_bytes:
+                        raise ValueError("Original image too large")
+                    chunks.append(chunk)
 
-    # качаем
-    r = requests.get(url, timeout=getattr(settings, "THUMB_REQUEST_TIMEOUT", (5, 10)), stream=True)
-    r.raise_for_status()
-
-    max_bytes = getattr(settings, "THUMB_MAX_ORIGINAL_BYTES", 8 * 1024 * 1024)
-    total = 0
-    chunks = []
-    for chunk in r.iter_content(8192):
-        if chunk:
-            total += len(chunk)
-            if total > max_bytes:
-                r.close()
-                raise ValueError("Original image too large")
-            chunks.append(chunk)
-
-    content = b"".join(chunks)
-    ext = safe_ext_from_ct(r.headers.get("Content-Type"), "jpg")
-    final_path = f"{base_path}.{ext}"
-    with open(final_path, "wb") as f:
-        f.write(content)
-    return final_path
+        content = b"".join(chunks)
+        ext = safe_ext_from_ct(ctype, "jpg")
+        if ext not in ORIGINAL_EXTS:
+            ext = "jpg"
+        final_path = f"{cached_original_path_for(url)}.{ext}"
+        atomic_write(final_path, content)
+        ORIG_INDEX.add(key, final_path, len(content))
+        # одинаковая картинка под другим URL → общая каноническая запись (news/utils/image_dedup.py)
+        register_original(url, final_path)
+        return final_path
@@ -0,0 +1,114 @@
+# Путь: backend/news/management/commands/bench_thumbnails.py
+# Назначение: Бенчмарк CPU-времени на одну миниатюру: прежний конвейер (полное декодирование,
+#             WebP method=6) против быстрого (JPEG draft / reduce, профиль ondemand).
+# Источники: файлы из --src (картинки или папки) либо синтетические кадры (JPEG 12 Мп, JPEG 4 Мп, PNG 3 Мп).
+# Примеры:
+#   python manage.py bench_thumbnails
+#   python manage.py bench_thumbnails --src media/news_images --sizes 420x236,1200x630 --repeat 5
+#   python manage.py bench_thumbnails --fmt jpg --json
+
+import io
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+from news.utils.thumb_render import render_image
+
+DEFAULT_SIZES = "420x236,800x450,1200x630"
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp", ".gif")
+
+
+def _synthetic(w, h, fmt):
+    noise = Image.effect_noise((w, h), 48)
+    grad = Image.linear_gradient("L").resize((w, h))
+    im = Image.merge("RGB", (noise, grad, grad.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    buf = io.BytesIO()
+    im.save(buf, fmt, quality=90) if fmt == "JPEG" else im.save(buf, fmt)
+    return buf.getvalue()
+
+
+def _collect(paths):
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            for name in sorted(os.listdir(p)):
+                if name.lower().endswith(IMAGE_EXTS):
+                    files.append(os.path.join(p, name))
+        elif os.path.isfile(p):
+            files.append(p)
+    return files
+
+
+class Command(BaseCommand):
+    help = "CPU-время на миниатюру: прежний конвейер против быстрого (draft/reduce + профиль ondemand)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--src", nargs="*", default=[], help="Файлы или папки с картинками.")
+        parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Размеры WxH через запятую.")
+        parser.add_argument("--fmt", default="webp", choices=["webp", "jpg", "png", "avif"])
+        parser.add_argument("--fit", default="cover", choices=["cover", "contain"])
+        parser.add_argument("--repeat", type=int, default=3, help="Повторов на каждую пару источник/размер.")
+        parser.add_argument("--json", action="store_true", help="Отчёт одной строкой JSON.")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [tuple(int(x) for x in s.lower().split("x")) for s in options["sizes"].split(",") if s.strip()]
+        except ValueError:
+            raise CommandError("--sizes: ожидается список вида 420x236,1200x630")
+
+        if options["src"]:
+            sources = [(os.path.basename(p), open(p, "rb").read()) for p in _collect(options["src"])]
+            if not sources:
+                raise CommandError("В --src не найдено картинок")
+        else:
+            sources = [
+                ("synthetic-12mp.jpg", _synthetic(4000, 3000, "JPEG")),
+                ("synthetic-4mp.jpg", _synthetic(2400, 1600, "JPEG")),
+                ("synthetic-3mp.png", _synthetic(2000, 1500, "PNG")),
+            ]
+
+        pipelines = {
+            "legacy": {"fast": False, "profile": "pregen"},  # как было: полное декодирование, WebP method=6
+            "fast": {"fast": True, "profile": "ondemand"},
+        }
+        rows = []
+        for name, data in sources:
+            for w, h in sizes:
+                row = {"source": name, "size": f"{w}x{h}"}
+                for label, kw in pipelines.items():
+                    cpu = 0.0
+                    out = 0
+                    for _ in range(max(1, options["repeat"])):
+                        started = time.process_time()
+                        out = len(render_image(Image.open(io.BytesIO(data)), w, h, 82, options["fmt"],
+                                               options["fit"], 1, **kw))
+                        cpu += time.process_time() - started
+                    row[f"{label}_ms"] = round(cpu * 1000 / max(1, options["repeat"]), 1)
+                    row[f"{label}_bytes"] = out
+                row["speedup"] = round(row["legacy_ms"] / row["fast_ms"], 2) if row["fast_ms"] else None
+                rows.append(row)
+
+        total_legacy = sum(r["legacy_ms"] for r in rows)
+        total_fast = sum(r["fast_ms"] for r in rows)
+        summary = {
+            "legacy_ms_avg": round(total_legacy / len(rows), 1),
+            "fast_ms_avg": round(total_fast / len(rows), 1),
+            "speedup": round(total_legacy / total_fast, 2) if total_fast else None,
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"rows": rows, "summary": summary}, ensure_ascii=False))
+            return
+
+        self.stdout.write(f"{'источник':<22} {'размер':>10} {'было, мс':>10} {'стало, мс':>10} {'×':>6} {'байт было/стало':>18}")
+        for r in rows:
+            self.stdout.write(
+                f"{r['source'][:22]:<22} {r['size']:>10} {r['legacy_ms']:>10} {r['fast_ms']:>10} "
+                f"{r['speedup'] or '—':>6} {r['legacy_bytes']:>9}/{r['fast_bytes']:<8}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"В среднем: {summary['legacy_ms_avg']} → {summary['fast_ms_avg']} мс CPU на миниатюру (×{summary['speedup']})"
+        ))
@@ -0,0 +1,74 @@
+# Путь: backend/news/management/commands/check_trgm_indexes.py
+# Назначение: EXPLAIN-проверка, что «тяжёлые» запросы по подстроке идут по триграммным индексам
+#             (миграция 0035_trigram_indexes), а не полным проходом таблицы.
+# Что проверяется (запросы строятся теми же функциями news/utils/trigram.py, что и во вьюхах):
+#   • «похожие»: OR из title__icontains (views.related_news, RelatedNewsViewUniversal, api_related._kw_query)
+#   • мягкий поиск по слагу: slug % / icontains (views_related.resolve_base_by_slug)
+#   • совпадение домена: link__icontains (views_related.build_candidates)
+# На маленькой таблице планировщик честно выбирает Seq Scan, поэтому по умолчанию он запрещён
+# (SET LOCAL enable_seqscan = off): проверяем, что индекс МОЖЕТ обслужить запрос. --natural — без этого.
+# Код выхода ≠ 0, если хоть один запрос идёт мимо индекса (удобно в CI / после миграций на проде).
+# Примеры:
+#   python manage.py check_trgm_indexes
+#   python manage.py check_trgm_indexes --words "пожар склад" --domain ria.ru --verbose
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from news.models import Article, ImportedNews
+from news.utils import trigram
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN: используют ли icontains/% по title, slug, link триграммные GIN-индексы (PostgreSQL)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--words", default="", help="Слова для title__icontains (по умолчанию — из свежей новости).")
+        parser.add_argument("--slug", default="", help="Слаг для мягкого поиска (по умолчанию — из свежей новости).")
+        parser.add_argument("--domain", default="ria.ru", help="Домен для link__icontains.")
+        parser.add_argument("--natural", action="store_true", help="Не запрещать Seq Scan (план как на проде).")
+        parser.add_argument("--verbose", action="store_true", help="Печатать планы всех запросов.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stdout.write(self.style.WARNING(f"БД {connection.vendor}: триграммных индексов нет, проверять нечего."))
+            return
+        if not trigram.available(ImportedNews):
+            raise CommandError("Расширение pg_trgm не установлено — выполните manage.py migrate news.")
+
+        sample = ImportedNews.objects.order_by("-id").values("title", "slug").first() or {}
+        words = (options["words"] or sample.get("title") or "новости москвы сегодня").split()
+        words = [w for w in words if len(w) > 3][:6] or ["новости"]
+        slug = options["slug"] or (sample.get("slug") or "novosti")[:20]
+
+        cases = [
+            ("Article: «похожие» по title", "news_article_title_trgm",
+             Article.objects.filter(trigram.contains_any(["title"], words))),
+            ("ImportedNews: «похожие» по title", "news_imported_title_trgm",
+             ImportedNews.objects.filter(trigram.contains_any(["title"], words))),
+            ("Article: мягкий поиск по slug", "news_article_slug_trgm",
+             trigram.closest(Article.objects.all(), "slug", slug)),
+            ("ImportedNews: мягкий поиск по slug", "news_imported_slug_trgm",
+             trigram.closest(ImportedNews.objects.all(), "slug", slug)),
+            ("ImportedNews: домен в link", "news_imported_link_trgm",
+             ImportedNews.objects.filter(trigram.contains_any(["link"], [options["domain"]]))),
+        ]
+
+        failed = []
+        for title, index, qs in cases:
+            with transaction.atomic():
+                if not options["natural"]:
+                    with connection.cursor() as cursor:
+                        cursor.execute("SET LOCAL enable_seqscan = off")
+                plan = qs.explain()
+            ok = index in plan
+            mark = self.style.SUCCESS("✅") if ok else self.style.ERROR("❌")
+            self.stdout.write(f"{mark} {title}: {'индекс ' + index if ok else 'индекс ' + index + ' НЕ используется'}")
+            if options["verbose"] or not ok:
+                self.stdout.write("    " + plan.replace("\n", "\n    "))
+            if not ok:
+                failed.append(index)
+
+        if failed:
+            raise CommandError(f"Запросы идут мимо индексов: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS("🎯 Все запросы по подстроке обслуживаются триграммными индексами."))
@@ -5,20 +5,25 @@
 #   - Проверяет поля image / thumbnail / preview (если существуют).
 #   - Если URL «битый», очищает поле (ставит пустую строку) и сохраняет.
 #   - Ничего не удаляет. Логи пишет в консоль.
+#   - ✅ Результаты проверок берёт из таблицы ImageProbe (их пишет manage.py probe_images): заново по сети
+#     проверяются только URL без записи или с записью старше --stale-after (тем же движком, news/utils/image_probe.py).
+#     С --no-probe сеть не трогается вовсе — URL без результата пропускаются.
 #
 # Примеры:
 #   python manage.py clean_broken_images
 #   python manage.py clean_broken_images --days 120
 #   python manage.py clean_broken_images --all
+#   python manage.py probe_images && python manage.py clean_broken_images --all --no-probe
 #
 # После запуска фронтенд начнёт показывать такие новости в блоке текстовых.
 
 from datetime import timedelta
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 from django.db import transaction
 
-from news.utils.image_check import is_image_url_alive
+from news.management.commands.pregen_thumbnails import _parse_since
+from news.utils.image_probe import DEFAULT_PER_HOST, probe_many, stored
 
 # Подгоните импорт моделей под ваш проект (ниже — самые распространённые имена)
 from news.models import Article, ImportedNews  # noqa: F401
@@ -48,17 +53,24 @@ class Command(BaseCommand):
         parser.add_argument("--days", type=int, default=30, help="Глубина в днях (по умолчанию 30)")
         parser.add_argument("--all", action="store_true", help="Обрабатывать все записи, игнорируя --days")
         parser.add_argument("--dry-run", action="store_true", help="Только показать, что будет изменено")
+        parser.add_argument("--stale-after", default="7d", help="Перепроверять результаты ImageProbe старше: 30m / 24h / 7d (по умолчанию 7d)")
+        parser.add_argument("--no-probe", action="store_true", help="Не ходить в сеть: только готовые результаты ImageProbe")
+        parser.add_argument("--workers", type=int, default=32, help="Сколько URL проверять одновременно")
+        parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help="Не больше N одновременных запросов к одному хосту")
 
     def handle(self, *args, **opts):
         days = opts["days"]
         do_all = opts["all"]
         dry = opts["dry_run"]
+        try:
+            stale_before = _parse_since(opts["stale_after"])
+        except CommandError:
+            raise CommandError("--stale-after: ожидается 30m / 24h / 7d или дата ISO")
 
         since = timezone.now() - timedelta(days=days)
-        self.stdout.write(self.style.NOTICE(f"==> clean_broken_images started (days={days}, all={do_all}, dry={dry})"))
-
-        total_checked = total_cleaned = 0
+        self.stdout.write(self.style.NOTICE(f"==> clean_broken_images started (days={days}, all={do_all}, dry={dry}, no_probe={opts['no_probe']})"))
 
+        querysets = []
         for model in (Article, ImportedNews):
             if do_all:
                 qs = model.objects.all()
@@ -70,7 +82,22 @@ class Command(BaseCommand):
                     qs = model.objects.filter(created_at__gte=since)
                 else:
                     qs = model.objects.all()
-
+            querysets.append((model, qs))
+
+        # 1) все URL — одним списком: проверка (или чтение ImageProbe) идёт до транзакции, без сети внутри неё
+        urls = []
+        for model, qs in querysets:
+            for obj in qs.iterator():
+                urls.extend(u for u in (_get_url(obj, f) for f in _iter_image_fields(obj)) if u)
+        if opts["no_probe"]:
+            probes = stored(urls)
+        else:
+            probes, probed = probe_many(urls, stale_before=stale_before, concurrency=opts["workers"], per_host=opts["per_host"])
+            self.stdout.write(f"Проверено по сети: {probed}, из ImageProbe: {len(set(urls)) - probed}")
+
+        # 2) зачистка по результатам
+        total_checked = total_cleaned = total_unknown = 0
+        for model, qs in querysets:
             self.stdout.write(self.style.WARNING(f"— Модель {model.__name__}: проверяем {qs.count()} записей"))
 
             with transaction.atomic():
@@ -80,9 +107,13 @@ class Command(BaseCommand):
                         url = _get_url(obj, field)
                         if not url:
                             continue
+                        probe = probes.get(url)
+                        if probe is None:
+                            total_unknown += 1
+                            continue
                         total_checked += 1
-                        if not is_image_url_alive(url):
-                            self.stdout.write(f"[{model.__name__} #{obj.pk}] поле '{field}' битое → очищаем")
+                        if not probe.ok:
+                            self.stdout.write(f"[{model.__name__} #{obj.pk}] поле '{field}' битое ({probe.status}) → очищаем")
                             # Пишем пустую строку (для FileField допустимо присвоить "" — это эквивалентно None)
                             setattr(obj, field, "")
                             changed = True
@@ -91,4 +122,5 @@ class Command(BaseCommand):
                         if not dry:
                             obj.save(update_fields=[f for f in _iter_image_fields(obj)])
 
-        self.stdout.write(self.style.SUCCESS(f"Готово: проверено ссылок: {total_checked}, очищено записей: {total_cleaned}"))
+        tail = f", без результата проверки (пропущено): {total_unknown}" if total_unknown else ""
+        self.stdout.write(self.style.SUCCESS(f"Готово: проверено ссылок: {total_checked}, очищено записей: {total_cleaned}{tail}"))
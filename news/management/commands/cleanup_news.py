@@ -1,18 +1,28 @@
 # Путь: backend/news/management/commands/cleanup_news.py
 # Назначение: Management-команда для удаления "битых" новостей
 # (пустые slug, пустое или короткое содержимое).
+# Примеры:
+#   python manage.py cleanup_news --dry-run        # только отчёт
+#   python manage.py cleanup_news --chunk-size 2000
 
 from django.core.management.base import BaseCommand
-from news.utils.cleanup import cleanup_broken_news
+from news.utils.cleanup import cleanup_broken_news, CHUNK_SIZE
 
 
 class Command(BaseCommand):
     help = "Удаляет битые новости (с пустыми slug или без текста)."
 
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Ничего не удалять, только показать отчёт.")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Размер пачки удаления.")
+
     def handle(self, *args, **options):
-        broken = cleanup_broken_news(self.stdout)
+        dry_run = options["dry_run"]
+        broken = cleanup_broken_news(self.stdout, dry_run=dry_run, chunk_size=options["chunk_size"])
         if not broken:
             self.stdout.write(self.style.SUCCESS("✓ Битых новостей не найдено"))
+        elif dry_run:
+            self.stdout.write(self.style.NOTICE(f"DRY-RUN: к удалению {len(broken)} битых новостей"))
         else:
             self.stdout.write(
                 self.style.WARNING(f"✖ Удалено {len(broken)} битых новостей")
@@ -13,6 +13,8 @@
 #       --phrase "xxx"         добавить свою стоп-фразу (регистронезависимо)
 #       --require-image        удалять только если у записи есть картинка
 #       --debug                печатать причины отбора/отсечения
+#       --chunk-size/--workers/--resume — движок news/utils/maintenance.py
+#         (пачки по pk, полные объекты за один запрос на пачку, удаление пачкой)
 #
 # Примеры:
 #   python manage.py cleanup_no_text_news --debug --show 30
@@ -21,9 +23,11 @@
 #   python manage.py cleanup_no_text_news --only ImportedNews --phrase "Без текста"
 
 from django.core.management.base import BaseCommand
-from django.db import transaction, models
+from django.db import models
 from django.utils.html import strip_tags
-import re, html as ihtml
+import re, html as ihtml, threading
+
+from news.utils.maintenance import MaintenanceTask, add_maintenance_arguments, runner_from_options
 
 DEFAULT_STOP = {
     "без текста", "нет текста", "no text", "notext", "n/a",
@@ -134,6 +138,36 @@ def decide(obj, *, min_len: int, stop_set, require_image: bool, debug: bool):
 
     return (False, f"ok text_len={text_len}, img={img}") if debug else (False, "")
 
+class NoTextTask(MaintenanceTask):
+    delete = True
+
+    def __init__(self, label, model, *, min_len, stop_set, require_image, debug, show_n, examples):
+        self.label = label
+        self.model = model
+        self.name = f"cleanup_no_text_news.{model._meta.model_name}"
+        self.min_len = min_len
+        self.stop_set = stop_set
+        self.require_image = require_image
+        self.debug = debug
+        self.show_n = show_n
+        self.examples = examples
+        self._lock = threading.Lock()
+
+    def process(self, obj) -> bool:
+        ok, reason = decide(obj,
+                            min_len=self.min_len,
+                            stop_set=self.stop_set,
+                            require_image=self.require_image,
+                            debug=self.debug)
+        if ok:
+            with self._lock:
+                if len(self.examples) < self.show_n:
+                    title = unhtml(getattr(obj, "title", "") or "")[:80] or "—"
+                    txt = combined_text(obj)[:140] or "—"
+                    self.examples.append((self.label, obj.pk, reason, title, txt))
+        return ok
+
+
 class Command(BaseCommand):
     help = "Удаляет новости без осмысленного текста (например, «Без текста»)."
 
@@ -145,6 +179,7 @@ class Command(BaseCommand):
         parser.add_argument("--phrase", type=str, default=None, help="Добавить пользовательскую стоп-фразу.")
         parser.add_argument("--require-image", action="store_true", help="Удалять только при наличии картинки.")
         parser.add_argument("--debug", action="store_true", help="Печатать причины отбора/исключения.")
+        add_maintenance_arguments(parser)
 
     def handle(self, *args, **o):
         min_len = o["min_len"]
@@ -172,29 +207,13 @@ class Command(BaseCommand):
         ))
 
         for label, Model in targets:
-            qs = Model.objects.all().only("id")  # берём id, остальное достанем при доступе
-            ids = []
-            cnt = 0
-            for obj in qs.iterator(chunk_size=1000):
-                ok, reason = decide(obj,
-                                    min_len=min_len,
-                                    stop_set=stop_set,
-                                    require_image=require_image,
-                                    debug=debug)
-                if ok:
-                    cnt += 1
-                    ids.append(obj.pk)
-                    if len(examples) < show_n:
-                        title = unhtml(getattr(obj, "title", "") or "")[:80] or "—"
-                        txt = combined_text(obj)[:140] or "—"
-                        examples.append((label, obj.pk, reason, title, txt))
-            total += cnt
-            self.stdout.write(f"  • {label}: найдено {cnt}")
-
-            if do_apply and ids:
-                with transaction.atomic():
-                    deleted = Model.objects.filter(pk__in=ids).delete()
-                self.stdout.write(self.style.WARNING(f"    — удалено записей: {deleted[0]}"))
+            task = NoTextTask(label, Model, min_len=min_len, stop_set=stop_set, require_image=require_image,
+                              debug=debug, show_n=show_n, examples=examples)
+            stats = runner_from_options(task, o, self.stdout, dry_run=not do_apply).run()
+            total += stats.changed
+            self.stdout.write(f"  • {label}: найдено {stats.changed}")
+            if do_apply and stats.changed:
+                self.stdout.write(self.style.WARNING(f"    — удалено записей: {stats.changed}"))
 
         self.stdout.write(self.style.SUCCESS(f"Готово. Кандидатов всего: {total}"))
         if examples:
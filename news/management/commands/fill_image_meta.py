@@ -0,0 +1,59 @@
+# Путь: backend/news/management/commands/fill_image_meta.py
+# Назначение: Досчитывает метаданные картинок (ширина/высота/доминирующий цвет/LQIP) для уже сохранённых
+#             новостей и статей. Новые записи ставятся в очередь сами (сигнал post_save → задача news.image_meta).
+# Примеры:
+#   python manage.py fill_image_meta --since 7d
+#   python manage.py fill_image_meta --since 2025-01-01 --enqueue   # поставить задачи воркерам
+#   python manage.py fill_image_meta --since 30d --force            # пересчитать даже посчитанные
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from news.management.commands.pregen_thumbnails import MODELS, _parse_since
+from news.tasks import enqueue_image_meta
+from news.utils.image_meta import needs_update, update_image_meta
+from news.views_media import _source_path
+
+
+class Command(BaseCommand):
+    help = "Считает размеры, доминирующий цвет и LQIP картинок новостей, сохранённых после --since."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", default="7d", help="30m / 24h / 7d или дата ISO (по умолчанию 7d).")
+        parser.add_argument("--models", default="imported,article", help="imported,article")
+        parser.add_argument("--limit", type=int, default=0, help="Не больше N записей на модель.")
+        parser.add_argument("--force", action="store_true", help="Пересчитать и уже посчитанные.")
+        parser.add_argument("--enqueue", action="store_true", help="Поставить задачи в очередь вместо расчёта здесь.")
+
+    def handle(self, *args, **options):
+        since = _parse_since(options["since"])
+        totals = {"items": 0, "done": 0, "failed": 0, "queued": 0}
+        for label in [m.strip() for m in options["models"].split(",") if m.strip()]:
+            model = MODELS.get(label)
+            if model is None:
+                raise CommandError(f"--models: неизвестная модель {label!r}")
+            qs = model.objects.filter(Q(created_at__gte=since) | Q(published_at__gte=since)).order_by("-pk")
+            if options["limit"]:
+                qs = qs[: options["limit"]]
+            for obj in qs.iterator():
+                if not options["force"] and not needs_update(obj):
+                    continue
+                totals["items"] += 1
+                if options["enqueue"]:
+                    enqueue_image_meta(obj)
+                    totals["queued"] += 1
+                    continue
+                try:
+                    update_image_meta(obj, _source_path)
+                    totals["done"] += 1
+                except Exception as e:
+                    totals["failed"] += 1
+                    if options["verbosity"] > 1:
+                        self.stdout.write(self.style.WARNING(f"  {label}#{obj.pk}: {e}"))
+
+        if options["enqueue"]:
+            self.stdout.write(self.style.SUCCESS(f"Записей: {totals['items']}, поставлено задач: {totals['queued']}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Записей: {totals['items']}; посчитано {totals['done']}, ошибок {totals['failed']}"
+            ))
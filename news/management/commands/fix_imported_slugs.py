@@ -1,32 +1,34 @@
 # Путь: backend/news/management/commands/fix_imported_slugs.py
 # Назначение: починить slug у ImportedNews (убрать префикс источника).
-# Команда: python manage.py fix_imported_slugs
+# Команда: python manage.py fix_imported_slugs [--dry-run] [--resume] [--workers N] [--chunk-size N]
+# Движок news/utils/maintenance.py: пачки по pk, bulk_update, чекпойнт.
 
 from django.core.management.base import BaseCommand
 from news.models import ImportedNews
+from news.utils.maintenance import SlugTask, add_maintenance_arguments, runner_from_options
 from django.utils.text import slugify
 from unidecode import unidecode
 
+
+class ImportedSlugTask(SlugTask):
+    name = "fix_imported_slugs"
+    model = ImportedNews
+    only_fields = ("id", "title", "slug")
+
+    def base_slug(self, n):
+        # slug без source-slug
+        return slugify(unidecode(n.title))[:50] or str(n.id)
+
+    def format_change(self, n, old, new):
+        return f"⚡ Fix slug {n.id}: {old} → {new}"
+
+
 class Command(BaseCommand):
     help = "Фиксирует slug у ImportedNews (убирает source- / rt- и т.п., оставляя чистый slug по title)."
 
-    def handle(self, *args, **options):
-        count = 0
-        for n in ImportedNews.objects.all():
-            # slug без source-slug
-            base_slug = slugify(unidecode(n.title))[:50] or str(n.id)
-            new_slug = base_slug
-
-            # проверка уникальности
-            counter = 1
-            while ImportedNews.objects.exclude(id=n.id).filter(slug=new_slug).exists():
-                new_slug = f"{base_slug}-{counter}"
-                counter += 1
-
-            if n.slug != new_slug:
-                self.stdout.write(f"⚡ Fix slug {n.id}: {n.slug} → {new_slug}")
-                n.slug = new_slug
-                n.save(update_fields=["slug"])
-                count += 1
+    def add_arguments(self, parser):
+        add_maintenance_arguments(parser, dry_run=True)
 
+    def handle(self, *args, **options):
+        count = runner_from_options(ImportedSlugTask(self.stdout), options, self.stdout).run().changed
         self.stdout.write(self.style.SUCCESS(f"Готово! Исправлено {count} slug."))
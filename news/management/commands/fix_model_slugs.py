@@ -10,12 +10,59 @@
 #   --name-field title    если поле названия называется не name, а иначе
 #   --slug-field seo_slug если слаг хранится не в 'slug'
 #   --all                 чинить все записи (не только подозрительные)
+# Большие таблицы: движок news/utils/maintenance.py (пачки по pk, bulk_update)
+#   --chunk-size N, --workers N, --resume
 
 from django.core.management.base import BaseCommand, CommandError
 from django.apps import apps
-from django.db import transaction
 from django.db.models import Q
-from news.slug_utils import slugify_ru, make_unique
+from news.slug_utils import slugify_ru
+from news.utils.maintenance import SlugTask, add_maintenance_arguments, runner_from_options
+
+PLAN_PREVIEW = 50
+
+
+class ModelSlugTask(SlugTask):
+    suffix_start = 2  # как make_unique(): base, base-2, base-3 …
+
+    def __init__(self, model, name_field, slug_field, fix_all, stdout=None):
+        self.model = model
+        self.name_field = name_field
+        self.slug_field = slug_field
+        self.fix_all = fix_all
+        self.name = f"fix_model_slugs.{model._meta.label_lower}.{slug_field}"
+        self.only_fields = ("pk", name_field, slug_field)
+        self.shown = 0
+        super().__init__(stdout)
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if not self.fix_all:
+            sf = self.slug_field
+            qs = qs.filter(
+                Q(**{f"{sf}__startswith": "category"}) |
+                Q(**{f"{sf}__iexact": "category"}) |
+                Q(**{f"{sf}__iexact": "bez_category"}) |
+                Q(**{f"{sf}__regex": r".*[А-Яа-яЁё].*"})
+            )
+        return qs
+
+    def base_slug(self, obj):
+        return slugify_ru(getattr(obj, self.name_field, "") or "") or "category"
+
+    def process(self, obj) -> bool:
+        old = getattr(obj, self.slug_field, "") or ""
+        new = getattr(obj, "_planned_slug", None) or old
+        status = "OK" if old == new else "CHANGE"
+        # Показать план (первые PLAN_PREVIEW строк)
+        if self.stdout and self.shown < PLAN_PREVIEW:
+            self.shown += 1
+            self.stdout.write(f"{obj.pk:>6} | {getattr(obj, self.name_field, '')} -> {old} => {new} [{status}]")
+        if status == "OK":
+            return False
+        setattr(obj, self.slug_field, new)
+        return True
+
 
 class Command(BaseCommand):
     help = "Пересчитывает slug у указанной модели (RU→LAT) с обеспечением уникальности."
@@ -27,6 +74,7 @@ class Command(BaseCommand):
         parser.add_argument("--dry-run", action="store_true", help="Показать план (без изменений)")
         parser.add_argument("--apply", action="store_true", help="Применить изменения")
         parser.add_argument("--all", dest="fix_all", action="store_true", help="Чинить все записи (не только подозрительные)")
+        add_maintenance_arguments(parser)
 
     def handle(self, *args, **opts):
         model_label = opts["model"]
@@ -44,7 +92,10 @@ class Command(BaseCommand):
         except ValueError:
             raise CommandError("Формат --model app_label.ModelName (пример: pages.category)")
 
-        model = apps.get_model(app_label, model_name)
+        try:
+            model = apps.get_model(app_label, model_name)
+        except LookupError:
+            model = None
         if model is None:
             raise CommandError(f"Модель {model_label} не найдена")
 
@@ -56,62 +107,20 @@ class Command(BaseCommand):
         if not name_field or name_field not in fields:
             raise CommandError(f"В модели {model_label} нет поля name/title (укажи --name-field)")
 
-        qs = model.objects.all()
-        if not fix_all:
-            qs = qs.filter(
-                Q(**{f"{slug_field}__startswith": "category"}) |
-                Q(**{f"{slug_field}__iexact": "category"}) |
-                Q(**{f"{slug_field}__iexact": "bez_category"}) |
-                Q(**{f"{slug_field}__regex": r".*[А-Яа-яЁё].*"})
-            )
-
-        count = qs.count()
+        task = ModelSlugTask(model, name_field, slug_field, fix_all, stdout=self.stdout)
+        count = task.get_queryset().count()
         label = f"{model._meta.app_label}.{model._meta.model_name}"
         if count == 0:
             self.stdout.write(self.style.SUCCESS(f"В {label} нечего чинить (подозрительных нет)."))
             return
 
         self.stdout.write(self.style.NOTICE(f"Модель: {label} | к правке: {count}"))
-        taken = set(model.objects.values_list(slug_field, flat=True))
-        plan = []
-        mapping = {}
-
-        def exists_other(s, pk):
-            return (s in taken) or (s in mapping.values())
-
-        for obj in qs.order_by("pk"):
-            name_val = getattr(obj, name_field, "") or ""
-            old = getattr(obj, slug_field, "") or ""
-            base = slugify_ru(name_val)
-            new = make_unique(base, lambda s, _pk=obj.pk: exists_other(s, obj.pk))
-            status = "OK" if old == new else "CHANGE"
-            plan.append((obj.pk, name_val, old, new, status))
-            if status == "CHANGE":
-                mapping[obj.pk] = new
-
-        # Показать план (первые 50 строк)
-        for row in plan[:50]:
-            self.stdout.write(f"{row[0]:>6} | {row[1]} -> {row[2]} => {row[3]} [{row[4]}]")
-        if len(plan) > 50:
-            self.stdout.write(f"... ещё {len(plan)-50} строк скрыто ...")
+        stats = runner_from_options(task, opts, self.stdout, dry_run=dry).run()
+        if task.shown < stats.processed:
+            self.stdout.write(f"... ещё {stats.processed - task.shown} строк скрыто ...")
 
         if dry:
-            self.stdout.write(self.style.SUCCESS("DRY-RUN завершён. БД не изменена."))
+            self.stdout.write(self.style.SUCCESS(f"DRY-RUN завершён. БД не изменена. К изменению: {stats.changed}"))
             return
 
-        with transaction.atomic():
-            changed = 0
-            for pk, new_slug in mapping.items():
-                obj = model.objects.get(pk=pk)
-                # финальная проверка уникальности
-                base = new_slug
-                cand = base
-                n = 2
-                while model.objects.exclude(pk=pk).filter(**{slug_field: cand}).exists():
-                    cand = f"{base}-{n}"
-                    n += 1
-                setattr(obj, slug_field, cand)
-                obj.save(update_fields=[slug_field])
-                changed += 1
-
-        self.stdout.write(self.style.SUCCESS(f"Готово. Обновлено slug: {changed}"))
+        self.stdout.write(self.style.SUCCESS(f"Готово. Обновлено slug: {stats.changed}"))
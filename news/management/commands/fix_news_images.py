@@ -1,11 +1,14 @@
 # backend/news/management/commands/fix_news_images.py
 # Назначение: Проверяет картинки у ImportedNews и Article, если битая или пустая —
 # заменяет на дефолтную (/static/default_news.svg).
+# Движок news/utils/maintenance.py: пачки по pk, bulk_update, --resume после обрыва,
+# --workers N — параллельные HTTP-проверки по диапазонам pk, --dry-run.
 # Путь: backend/news/management/commands/fix_news_images.py
 
 import requests
 from django.core.management.base import BaseCommand
 from news.models import ImportedNews, Article
+from news.utils.maintenance import MaintenanceTask, add_maintenance_arguments, runner_from_options
 
 DEFAULT_IMAGE = "/static/default_news.svg"
 
@@ -22,25 +25,42 @@ def is_valid_image(url: str) -> bool:
     return False
 
 
+class ImportedImageTask(MaintenanceTask):
+    name = "fix_news_images.imported"
+    model = ImportedNews
+    only_fields = ("id", "image")
+    update_fields = ("image",)
+
+    def process(self, news) -> bool:
+        if not news.image or not is_valid_image(news.image):
+            news.image = DEFAULT_IMAGE
+            return True
+        return False
+
+
+class ArticleImageTask(MaintenanceTask):
+    name = "fix_news_images.article"
+    model = Article
+    only_fields = ("id", "cover_image")
+    update_fields = ("cover_image",)
+
+    def process(self, article) -> bool:
+        url = article.cover_image.url if article.cover_image else ""
+        if not url or not is_valid_image(url):
+            article.cover_image = DEFAULT_IMAGE
+            return True
+        return False
+
+
 class Command(BaseCommand):
     help = "Заменяет битые картинки у ImportedNews и Article на дефолтную"
 
+    def add_arguments(self, parser):
+        add_maintenance_arguments(parser, dry_run=True)
+
     def handle(self, *args, **options):
         fixed = 0
-
-        # ImportedNews
-        for news in ImportedNews.objects.all():
-            if not news.image or not is_valid_image(news.image):
-                news.image = DEFAULT_IMAGE
-                news.save(update_fields=["image"])
-                fixed += 1
-
-        # Article
-        for article in Article.objects.all():
-            url = article.cover_image.url if article.cover_image else ""
-            if not url or not is_valid_image(url):
-                article.cover_image = DEFAULT_IMAGE
-                article.save(update_fields=["cover_image"])
-                fixed += 1
+        for task in (ImportedImageTask(), ArticleImageTask()):
+            fixed += runner_from_options(task, options, self.stdout).run().changed
 
         self.stdout.write(self.style.SUCCESS(f"Готово! Исправлено {fixed} новостей"))
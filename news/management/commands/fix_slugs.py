@@ -1,57 +1,63 @@
 # Путь: backend/news/management/commands/fix_slugs.py
 # Назначение: пересоздание slug для Article и ImportedNews,
 # удаление "source-" из старых slug, генерация уникальных SEO-friendly slug.
+# Работает на движке news/utils/maintenance.py: пачки по pk, bulk_update, --resume, --workers, --dry-run.
 
 import uuid
 from django.core.management.base import BaseCommand
+from django.db.models import Q
 from django.utils.text import slugify
 from unidecode import unidecode
 from news.models import Article, ImportedNews
+from news.utils.maintenance import SlugTask, add_maintenance_arguments, runner_from_options
+
+
+class ArticleSlugTask(SlugTask):
+    name = "fix_slugs.article"
+    model = Article
+    prefetch_related = ("categories",)
+
+    def get_queryset(self):
+        return super().get_queryset().filter(Q(slug="") | Q(slug__isnull=True))
+
+    def base_slug(self, art):
+        base_slug = slugify(unidecode(art.title))[:50] or str(uuid.uuid4())[:8]
+        cats = list(art.categories.all())
+        cat_slug = cats[0].slug if cats else "news"
+        return f"{cat_slug}-{base_slug}"
+
+    def format_change(self, art, old, new):
+        return f"✔ [article] {art.title[:40]} → {new}"
+
+
+class ImportedSlugTask(SlugTask):
+    name = "fix_slugs.imported"
+    model = ImportedNews
+    select_related = ("source_fk",)
+
+    def get_queryset(self):
+        # 1) slug пустой  2) slug начинается с "source-"
+        return super().get_queryset().filter(Q(slug="") | Q(slug__isnull=True) | Q(slug__startswith="source-"))
+
+    def base_slug(self, imp):
+        base_slug = slugify(unidecode(imp.title))[:50] or str(uuid.uuid4())[:8]
+        src_slug = imp.source_fk.slug if imp.source_fk else "news"  # ✅ заменили fallback
+        return f"{src_slug}-{base_slug}"
+
+    def format_change(self, imp, old, new):
+        return f"✔ {old} → {new}"
 
 
 class Command(BaseCommand):
     help = "Пересоздаёт slug для Article и ImportedNews (убирает 'source-')"
 
+    def add_arguments(self, parser):
+        add_maintenance_arguments(parser, dry_run=True)
+
     def handle(self, *args, **options):
         updated = 0
+        for task in (ArticleSlugTask(self.stdout), ImportedSlugTask(self.stdout)):
+            updated += runner_from_options(task, options, self.stdout).run().changed
 
-        # === Article ===
-        for art in Article.objects.all():
-            if not art.slug:
-                base_slug = slugify(unidecode(art.title))[:50] or str(uuid.uuid4())[:8]
-                cat_slug = art.categories.first().slug if art.categories.exists() else "news"
-                new_slug = f"{cat_slug}-{base_slug}"
-                counter = 1
-                while Article.objects.exclude(id=art.id).filter(slug=new_slug).exists():
-                    new_slug = f"{cat_slug}-{base_slug}-{counter}"
-                    counter += 1
-                art.slug = new_slug
-                art.save(update_fields=["slug"])
-                updated += 1
-
-        # === ImportedNews ===
-        for imp in ImportedNews.objects.all():
-            regenerate = False
-
-            # 1) Если slug пустой
-            if not imp.slug:
-                regenerate = True
-
-            # 2) Если slug начинается с "source-"
-            elif imp.slug.startswith("source-"):
-                regenerate = True
-
-            if regenerate:
-                base_slug = slugify(unidecode(imp.title))[:50] or str(uuid.uuid4())[:8]
-                src_slug = imp.source_fk.slug if imp.source_fk else "news"  # ✅ заменили fallback
-                new_slug = f"{src_slug}-{base_slug}"
-                counter = 1
-                while ImportedNews.objects.exclude(id=imp.id).filter(slug=new_slug).exists():
-                    new_slug = f"{src_slug}-{base_slug}-{counter}"
-                    counter += 1
-                self.stdout.write(f"✔ {imp.slug} → {new_slug}")
-                imp.slug = new_slug
-                imp.save(update_fields=["slug"])
-                updated += 1
-
-        self.stdout.write(self.style.SUCCESS(f"✓ Slugs updated for {updated} records"))
+        suffix = " (dry-run, ничего не записано)" if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(f"✓ Slugs updated for {updated} records{suffix}"))
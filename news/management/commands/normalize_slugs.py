@@ -1,13 +1,14 @@
 # Путь: backend/news/management/commands/normalize_slugs.py
 # Назначение: Очистка и пересоздание slug для Article и ImportedNews.
 # Использование:
-#   python manage.py normalize_slugs
+#   python manage.py normalize_slugs [--dry-run] [--resume] [--workers N] [--chunk-size N]
 #
 # Логика:
 #   • Article → category.slug + "-" + slugified(title)
 #   • ImportedNews → source.slug + "-" + slugified(title) (если есть source)
-#   • Если slug меняется → пересохраняем.
+#   • Если slug меняется → пересохраняем (пачкой, bulk_update).
 #   • Если slug пустой → создаём.
+#   • Если такой slug уже занят другой записью → добавляем -1, -2 … (иначе пачка упадёт на unique).
 #   • Выводим статистику.
 
 from django.core.management.base import BaseCommand
@@ -15,40 +16,43 @@ from django.utils.text import slugify
 from unidecode import unidecode
 
 from news.models import Article, ImportedNews
+from news.utils.maintenance import SlugTask, add_maintenance_arguments, runner_from_options
+
+
+class ArticleSlugTask(SlugTask):
+    name = "normalize_slugs.article"
+    model = Article
+    prefetch_related = ("categories",)
+    label = "ARTICLE"
+
+    def base_slug(self, art):
+        base = slugify(unidecode(art.title or ""))[:100]
+        cats = list(art.categories.all())
+        prefix = cats[0].slug if cats else "news"
+        return f"{prefix}-{base}".strip("-")
+
+
+class ImportedSlugTask(SlugTask):
+    name = "normalize_slugs.imported"
+    model = ImportedNews
+    only_fields = ("id", "title", "slug")
+    label = "IMPORTED"
+
+    def base_slug(self, imp):
+        base = slugify(unidecode(imp.title or ""))[:100]
+        prefix = imp.source.slug if getattr(imp, "source", None) else "source"
+        return f"{prefix}-{base}".strip("-")
 
 
 class Command(BaseCommand):
     help = "Нормализует slug для Article и ImportedNews"
 
+    def add_arguments(self, parser):
+        add_maintenance_arguments(parser, dry_run=True)
+
     def handle(self, *args, **options):
-        fixed_articles = 0
-        fixed_imported = 0
-
-        # --- Обработка Article ---
-        for art in Article.objects.all():
-            base = slugify(unidecode(art.title or ""))[:100]
-            prefix = art.categories.first().slug if art.categories.exists() else "news"
-            new_slug = f"{prefix}-{base}".strip("-")
-
-            if art.slug != new_slug and new_slug:
-                old = art.slug
-                art.slug = new_slug
-                art.save(update_fields=["slug"])
-                fixed_articles += 1
-                self.stdout.write(f"[ARTICLE] {old} → {new_slug}")
-
-        # --- Обработка ImportedNews ---
-        for imp in ImportedNews.objects.all():
-            base = slugify(unidecode(imp.title or ""))[:100]
-            prefix = imp.source.slug if getattr(imp, "source", None) else "source"
-            new_slug = f"{prefix}-{base}".strip("-")
-
-            if imp.slug != new_slug and new_slug:
-                old = imp.slug
-                imp.slug = new_slug
-                imp.save(update_fields=["slug"])
-                fixed_imported += 1
-                self.stdout.write(f"[IMPORTED] {old} → {new_slug}")
+        fixed_articles = runner_from_options(ArticleSlugTask(self.stdout), options, self.stdout).run().changed
+        fixed_imported = runner_from_options(ImportedSlugTask(self.stdout), options, self.stdout).run().changed
 
         self.stdout.write(
             self.style.SUCCESS(
@@ -0,0 +1,86 @@
+# Путь: backend/news/management/commands/pregen_thumbnails.py
+# Назначение: Догоняющая предгенерация миниатюр стандартных размеров (THUMB_PRESETS) для уже сохранённых новостей,
+#             чтобы первый посетитель попадал в кэш. Новые записи import_rss ставит в очередь сам.
+# Примеры:
+#   python manage.py pregen_thumbnails --since 24h
+#   python manage.py pregen_thumbnails --since 2025-01-01 --presets card,hero
+#   python manage.py pregen_thumbnails --since 7d --enqueue       # не рендерить здесь, а поставить задачи воркерам
+
+from datetime import datetime, timedelta
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from news.models import Article, ImportedNews
+from news.tasks import enqueue_pregen
+from news.utils.thumb_urls import thumbnail_sources
+from news.views_media import THUMB_PRESETS, pregenerate
+
+MODELS = {"imported": ImportedNews, "article": Article}
+
+
+def _parse_since(value):
+    m = re.fullmatch(r"(\d+)\s*([mhd])", value.strip().lower())
+    if m:
+        n, unit = int(m.group(1)), m.group(2)
+        return timezone.now() - timedelta(**{{"m": "minutes", "h": "hours", "d": "days"}[unit]: n})
+    try:
+        dt = datetime.fromisoformat(value.strip())
+    except ValueError:
+        raise CommandError("--since: ожидается 30m / 24h / 7d или дата ISO (2025-01-01)")
+    return timezone.make_aware(dt) if timezone.is_naive(dt) else dt
+
+
+class Command(BaseCommand):
+    help = "Рендерит миниатюры стандартных размеров (THUMB_PRESETS) для новостей, сохранённых после --since."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", default="24h", help="30m / 24h / 7d или дата ISO (по умолчанию 24h).")
+        parser.add_argument("--presets", help="Пресеты через запятую (по умолчанию THUMB_PREGEN_PRESETS).")
+        parser.add_argument("--models", default="imported,article", help="imported,article")
+        parser.add_argument("--limit", type=int, default=0, help="Не больше N записей на модель.")
+        parser.add_argument("--enqueue", action="store_true", help="Поставить задачи в очередь вместо рендера здесь.")
+
+    def handle(self, *args, **options):
+        since = _parse_since(options["since"])
+        presets = [p.strip() for p in (options["presets"] or "").split(",") if p.strip()] or list(
+            getattr(settings, "THUMB_PREGEN_PRESETS", THUMB_PRESETS)
+        )
+        unknown = [p for p in presets if p not in THUMB_PRESETS]
+        if unknown:
+            raise CommandError(f"Неизвестные пресеты: {', '.join(unknown)} (есть: {', '.join(THUMB_PRESETS)})")
+
+        totals = {"items": 0, "rendered": 0, "cached": 0, "failed": 0, "queued": 0}
+        for label in [m.strip() for m in options["models"].split(",") if m.strip()]:
+            model = MODELS.get(label)
+            if model is None:
+                raise CommandError(f"--models: неизвестная модель {label!r}")
+            qs = model.objects.filter(Q(created_at__gte=since) | Q(published_at__gte=since)).order_by("-pk")
+            if options["limit"]:
+                qs = qs[: options["limit"]]
+            for obj in qs.iterator():
+                totals["items"] += 1
+                if options["enqueue"]:
+                    totals["queued"] += len(enqueue_pregen(obj, presets))
+                    continue
+                for src in thumbnail_sources(obj):
+                    try:
+                        res = pregenerate(src, presets)
+                    except Exception as e:
+                        totals["failed"] += 1
+                        if options["verbosity"] > 1:
+                            self.stdout.write(self.style.WARNING(f"  {label}#{obj.pk}: {src[:80]} — {e}"))
+                        continue
+                    totals["rendered"] += res["rendered"]
+                    totals["cached"] += res["cached"]
+
+        if options["enqueue"]:
+            self.stdout.write(self.style.SUCCESS(f"Записей: {totals['items']}, поставлено задач: {totals['queued']}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Записей: {totals['items']}; отрендерено {totals['rendered']}, уже в кэше {totals['cached']}, "
+                f"ошибок {totals['failed']} (пресеты: {', '.join(presets)})"
+            ))
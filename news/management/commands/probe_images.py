@@ -2,31 +2,29 @@
 # Назначение: Диагностика “битых” иллюстраций по категориям. НИЧЕГО в БД не меняет.
 #
 # Что нового (ускорение и стабильность):
-#   ✅ Параллельная проверка URL (ThreadPoolExecutor) — десятки раз быстрее
+#   ✅ asyncio-движок (news/utils/image_probe.py): общий лимит --workers + лимит --per-host на хост,
+#      keep-alive соединения, один GET с Range вместо HEAD+GET, размеры картинки по первым байтам
+#   ✅ Результаты хранятся в таблице ImageProbe; повторный прогон проверяет только новые URL и те,
+#      что проверялись раньше --stale-after (по умолчанию 7d; --stale-after 0m — проверить всё заново)
 #   ✅ Короткие таймауты по умолчанию: 3s connect / 5s read (настраивается флагами)
-#   ✅ Кэш результатов по URL (не дергаем одинаковые ссылки)
+#   ✅ Одинаковые ссылки проверяются один раз
 #   ✅ Прогресс-лог каждые N элементов и аккуратное завершение по Ctrl+C
-#   ✅ Флаги CLI: --limit, --workers, --timeout-connect, --timeout-read
+#   ✅ Флаги CLI: --limit, --workers, --per-host, --stale-after, --timeout-connect, --timeout-read
 #
 # Запуск (быстрый прогон):
 #   python manage.py probe_images --workers 16 --limit 2000
 #
-# Полный прогон:
-#   python manage.py probe_images --workers 24
+# Полный прогон (заново — всё, что проверялось больше суток назад):
+#   python manage.py probe_images --workers 48 --per-host 6 --stale-after 24h
 #
 # Примечание: предупреждение про CKEditor можно игнорировать — оно не влияет.
 
 import csv
 import os
-import sys
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
-from urllib.parse import urlparse
 
 from django.apps import apps
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 from django.db.models import (
     ForeignKey,
@@ -37,90 +35,8 @@ from django.db.models import (
     TextField,
 )
 
-import requests
-
-# --------- сетевые вспомогалки ---------
-def _flip_scheme(url: str) -> str | None:
-    if not url or not isinstance(url, str):
-        return None
-    try:
-        u = urlparse(url)
-        if u.scheme == "http":
-            return url.replace("http://", "https://", 1)
-        if u.scheme == "https":
-            return url.replace("https://", "http://", 1)
-    except Exception:
-        pass
-    return None
-
-
-def _headers(url: str) -> dict:
-    try:
-        u = urlparse(url)
-        ref = f"{u.scheme}://{u.netloc}/" if u.scheme and u.netloc else ""
-    except Exception:
-        ref = ""
-    h = {"User-Agent": "IzotovLife-Probe/1.4 (+https://izotovlife.ru)"}
-    if ref:
-        h["Referer"] = ref
-    return h
-
-
-def _looks_image(resp: requests.Response) -> bool:
-    ct = (resp.headers.get("Content-Type") or "").lower().split(";")[0].strip()
-    return ct.startswith("image/")
-
-
-def _probe(url: str, timeout=(3.0, 5.0)) -> tuple[bool, str]:
-    """
-    Вернёт (ok, reason).
-    ok=False и reason с текстом — если что-то не так.
-    """
-    if not url or not isinstance(url, str):
-        return False, "empty-url"
-
-    s = url.strip()
-    if s.startswith("data:"):
-        return False, "data-uri"  # встроенные data: пропускаем
-
-    # 1) HEAD
-    try:
-        r = requests.head(s, timeout=timeout, headers=_headers(s), allow_redirects=True)
-        if 200 <= r.status_code < 300 and _looks_image(r):
-            return True, "ok-head"
-    except Exception:
-        pass
-
-    # 2) GET с ограничением объёма
-    reason = ""
-    try:
-        with requests.get(s, stream=True, timeout=timeout, headers=_headers(s), allow_redirects=True) as r:
-            if 200 <= r.status_code < 300 and _looks_image(r):
-                total = 0
-                for chunk in r.iter_content(8192):
-                    if not chunk:
-                        break
-                    total += len(chunk)
-                    if total > 32768:  # 32 КБ достаточно, чтобы убедиться
-                        break
-                return True, "ok-get"
-            reason = f"http-{r.status_code}"
-    except Exception as e:
-        reason = f"err-{type(e).__name__}"
-
-    # 3) flip http↔https
-    alt = _flip_scheme(s)
-    if alt:
-        try:
-            with requests.get(alt, stream=True, timeout=timeout, headers=_headers(alt), allow_redirects=True) as r:
-                if 200 <= r.status_code < 300 and _looks_image(r):
-                    return True, "ok-alt-scheme"
-                return False, f"alt-http-{r.status_code}"
-        except Exception as e:
-            return False, f"alt-err-{type(e).__name__}"
-
-    return False, reason or "unknown"
-
+from news.management.commands.pregen_thumbnails import _parse_since
+from news.utils.image_probe import DEFAULT_PER_HOST, log_progress, probe_many
 
 # --------- работа с моделями/полями ---------
 LIKELY_IMAGE_NAME_PARTS = ("image", "cover", "preview", "thumb", "photo", "picture", "pic", "banner", "poster", "top")
@@ -294,39 +210,25 @@ def _normalize_possible_slug(text: str) -> str:
     return s
 
 
-# --------- кэш результатов и параллельная обёртка ---------
-_probe_cache: dict[str, tuple[bool, str]] = {}
-_probe_lock = Lock()
-
-def _probe_cached(url: str, timeout_tuple: tuple[float, float]) -> tuple[bool, str]:
-    if not url:
-        return False, "empty-url"
-    # быстрый путь без блокировки
-    cached = _probe_cache.get(url)
-    if cached is not None:
-        return cached
-    # защищаем от гонок
-    with _probe_lock:
-        cached = _probe_cache.get(url)
-        if cached is not None:
-            return cached
-        res = _probe(url, timeout=timeout_tuple)
-        _probe_cache[url] = res
-        return res
-
-
 class Command(BaseCommand):
     help = "Пробегает модели новостей и собирает отчёт по «битым» изображениям (по категориям). Поля определяются автоматически."
 
     def add_arguments(self, parser):
         parser.add_argument("--limit", type=int, default=None, help="Ограничить количество записей на модель (для быстрого прогона).")
-        parser.add_argument("--workers", type=int, default=12, help="Количество потоков для сетевых проверок (по умолчанию 12).")
+        parser.add_argument("--workers", type=int, default=32, help="Сколько URL проверять одновременно (по умолчанию 32).")
+        parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help=f"Не больше N одновременных запросов к одному хосту (по умолчанию {DEFAULT_PER_HOST}).")
+        parser.add_argument("--stale-after", default="7d", help="Перепроверять результаты старше: 30m / 24h / 7d (по умолчанию 7d; 0m — всё).")
         parser.add_argument("--timeout-connect", type=float, default=3.0, help="Таймаут соединения (сек).")
         parser.add_argument("--timeout-read", type=float, default=5.0, help="Таймаут чтения (сек).")
 
     def handle(self, *args, **options):
         limit = options.get("limit")
-        workers = max(1, int(options.get("workers") or 12))
+        workers = max(1, int(options.get("workers") or 32))
+        per_host = max(1, int(options.get("per_host") or DEFAULT_PER_HOST))
+        try:
+            stale_before = _parse_since(options["stale_after"])
+        except CommandError:
+            raise CommandError("--stale-after: ожидается 30m / 24h / 7d или дата ISO")
         to_conn = float(options.get("timeout_connect") or 3.0)
         to_read = float(options.get("timeout_read") or 5.0)
         timeout_tuple = (to_conn, to_read)
@@ -442,32 +344,19 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING("Нет записей для проверки."))
             return
 
-        # --- параллельная проверка уникальных URL ---
-        unique_urls = [t["src"] for t in all_tasks if t["src"]]
-        unique_urls = list(dict.fromkeys(unique_urls))  # preserve order + dedup
-        self.stdout.write(f"\nНачинаю сетевую проверку: {len(all_tasks)} записей, {len(unique_urls)} уникальных URL, workers={workers}, timeout={timeout_tuple}s")
-        start = time.time()
-
-        url_results: dict[str, tuple[bool, str]] = {}
-        processed = 0
+        # --- проверка уникальных URL (свежие результаты берутся из ImageProbe) ---
+        unique_urls = list(dict.fromkeys(t["src"] for t in all_tasks if t["src"]))
+        self.stdout.write(f"\nСетевая проверка: {len(all_tasks)} записей, {len(unique_urls)} уникальных URL, workers={workers}, per_host={per_host}, timeout={timeout_tuple}s")
         step_log = max(25, len(unique_urls) // 40)  # ~40 логов максимум
-
         try:
-            with ThreadPoolExecutor(max_workers=workers) as ex:
-                futures = {ex.submit(_probe_cached, u, timeout_tuple): u for u in unique_urls}
-                for fut in as_completed(futures):
-                    u = futures[fut]
-                    try:
-                        ok, reason = fut.result()
-                    except Exception as e:
-                        ok, reason = False, f"err-{type(e).__name__}"
-                    url_results[u] = (ok, reason)
-                    processed += 1
-                    if processed % step_log == 0 or processed == len(unique_urls):
-                        elapsed = time.time() - start
-                        self.stdout.write(f"  • проверено {processed}/{len(unique_urls)} URL  ({elapsed:.1f}s)")
+            probes, probed = probe_many(
+                unique_urls, stale_before=stale_before, concurrency=workers, per_host=per_host,
+                timeout=timeout_tuple, progress=log_progress(step_log, self.stdout.write),
+            )
         except KeyboardInterrupt:
-            self.stdout.write(self.style.WARNING("\nОстановлено пользователем. Запишу частичные результаты..."))
+            self.stdout.write(self.style.WARNING("\nОстановлено пользователем. Проверенное уже сохранено в ImageProbe — повторный запуск продолжит."))
+            return
+        self.stdout.write(f"  → проверено по сети: {probed}, взято из ImageProbe: {len(unique_urls) - probed}")
 
         # --- сбор строк отчёта ---
         for t in all_tasks:
@@ -475,8 +364,10 @@ class Command(BaseCommand):
             if not src:
                 ok, reason = False, "empty-url"
             else:
-                ok, reason = url_results.get(src, (False, "no-result"))
+                p = probes.get(src)
+                ok, reason = (p.ok, p.status) if p else (False, "no-result")
             bump(t["cat_slug"], ok, {"model": t["model_tag"], "id": t["pk"], "slug": t["obj_slug"], "reason": reason, "src": src})
+            p = probes.get(src) if src else None
             rows.append([
                 t["model_tag"],
                 t["pk"],
@@ -484,6 +375,9 @@ class Command(BaseCommand):
                 t["obj_slug"],
                 "OK" if ok else "BROKEN",
                 reason,
+                p.width if p else "",
+                p.height if p else "",
+                p.checked_at.strftime("%Y-%m-%d %H:%M:%S") if p else "",
                 src,
             ])
 
@@ -491,9 +385,9 @@ class Command(BaseCommand):
         with open(csv_path, "w", newline="", encoding="utf-8") as f:
             w = csv.writer(f, delimiter=";")
             w.writerow(["generated_at", now])
-            w.writerow(["workers", workers, "timeout_connect", to_conn, "timeout_read", to_read, "limit", limit or "∞"])
+            w.writerow(["workers", workers, "per_host", per_host, "stale_after", options["stale_after"], "timeout_connect", to_conn, "timeout_read", to_read, "limit", limit or "∞"])
             w.writerow([])
-            w.writerow(["model", "id", "category_slug", "news_slug", "status", "reason", "src"])
+            w.writerow(["model", "id", "category_slug", "news_slug", "status", "reason", "width", "height", "checked_at", "src"])
             w.writerows(rows)
 
         # --- сводка по категориям ---
@@ -4,11 +4,13 @@
 # Примеры:
 #   python manage.py purge_empty_news               # только посчитать (dry-run)
 #   python manage.py purge_empty_news --delete      # реально удалить
+#   python manage.py purge_empty_news --delete --chunk-size 5000 --resume
+# Удаление идёт пачками по pk (news/utils/maintenance.py), без одной гигантской транзакции.
 # Путь: backend/news/management/commands/purge_empty_news.py
 
 from django.core.management.base import BaseCommand
-from django.db import transaction
 from news.utils.content_filters import filter_nonempty, annotate_has_text
+from news.utils.maintenance import MaintenanceTask, add_maintenance_arguments, runner_from_options
 from news import models
 
 CANDIDATE_MODELS = []
@@ -16,6 +18,23 @@ for name in ("Article", "ImportedNews"):
     if hasattr(models, name):
         CANDIDATE_MODELS.append(getattr(models, name))
 
+
+class EmptyNewsTask(MaintenanceTask):
+    delete = True
+    only_fields = ("pk",)
+
+    def __init__(self, model):
+        self.model = model
+        self.name = f"purge_empty_news.{model._meta.model_name}"
+
+    def get_queryset(self):
+        # Отбор целиком на стороне БД — в Python приходят только pk
+        return annotate_has_text(super().get_queryset()).filter(has_text=False)
+
+    def process(self, obj) -> bool:
+        return True
+
+
 class Command(BaseCommand):
     help = "Удалить новости без содержания (оставлены только заголовки)."
 
@@ -25,6 +44,7 @@ class Command(BaseCommand):
             action="store_true",
             help="Выполнить удаление (без этого ключа — только подсчёт)",
         )
+        add_maintenance_arguments(parser)
 
     def handle(self, *args, **options):
         really_delete = options.get("delete", False)
@@ -32,18 +52,19 @@ class Command(BaseCommand):
         total_deleted = 0
 
         for Model in CANDIDATE_MODELS:
-            qs_all = Model.objects.all()
-            qs_annotated = annotate_has_text(qs_all)
-            empty_qs = qs_annotated.filter(has_text=False)
-            count = empty_qs.count()
-            total += count
-            self.stdout.write(self.style.WARNING(f"{Model.__name__}: найдено пустых — {count}"))
-
-            if really_delete and count:
-                with transaction.atomic():
-                    deleted, _ = empty_qs.delete()
-                    total_deleted += deleted
-                self.stdout.write(self.style.SUCCESS(f"{Model.__name__}: удалено {deleted}"))
+            task = EmptyNewsTask(Model)
+            if not really_delete:
+                count = task.get_queryset().count()
+                total += count
+                self.stdout.write(self.style.WARNING(f"{Model.__name__}: найдено пустых — {count}"))
+                continue
+
+            stats = runner_from_options(task, options, self.stdout, dry_run=False).run()
+            total += stats.changed
+            total_deleted += stats.changed
+            self.stdout.write(self.style.WARNING(f"{Model.__name__}: найдено пустых — {stats.changed}"))
+            if stats.changed:
+                self.stdout.write(self.style.SUCCESS(f"{Model.__name__}: удалено {stats.changed}"))
 
         if not really_delete:
             self.stdout.write(self.style.NOTICE("DRY-RUN: ничего не удалено. Запустите с --delete."))
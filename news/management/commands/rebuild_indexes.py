@@ -1,48 +1,62 @@
 # Путь: backend/news/management/commands/rebuild_indexes.py
 # Назначение: Django-команда для пересоздания полнотекстовых GIN-индексов в PostgreSQL.
-# Поддерживает поля title, content (Article) и summary (ImportedNews).
+# Индексы — по хранимому взвешенному search_vector (title + content у Article, title + summary у ImportedNews),
+# именно по нему ищут SearchView / SmartSearchViewEnhanced (news/utils/search.py, миграция 0033_search_vector).
+# Прежние индексы по to_tsvector(отдельного поля) поиском не использовались — команда их удаляет.
+# На SQLite — переустанавливает FTS5-индексы и их триггеры и переиндексирует всё (news/utils/search_fts.py):
+# Django на SQLite при изменении столбцов пересоздаёт таблицу, и триггеры FTS5 при этом пропадают.
 # Использование: python manage.py rebuild_indexes
 # Безопасно для продакшена — CREATE INDEX CONCURRENTLY не блокирует таблицы.
 
 from django.core.management.base import BaseCommand
 from django.db import connection
 
+from news.utils import search_fts
+
 SQL_INDEXES = [
     # --- Авторские статьи ---
     {
-        "name": "news_article_title_idx",
-        "table": "news_article",
-        "vector": "to_tsvector('russian', coalesce(title, ''))",
-        "description": "по заголовку статей",
-    },
-    {
-        "name": "news_article_content_idx",
+        "name": "news_article_search_gin",
         "table": "news_article",
-        "vector": "to_tsvector('russian', coalesce(content, ''))",
-        "description": "по содержимому статей",
+        "vector": "search_vector",
+        "description": "по заголовку и содержимому статей",
     },
     # --- Импортированные новости ---
     {
-        "name": "news_importednews_title_idx",
+        "name": "news_imported_search_gin",
         "table": "news_importednews",
-        "vector": "to_tsvector('russian', coalesce(title, ''))",
-        "description": "по заголовку импортированных новостей",
-    },
-    {
-        "name": "news_importednews_summary_idx",
-        "table": "news_importednews",
-        "vector": "to_tsvector('russian', coalesce(summary, ''))",
-        "description": "по краткому описанию импортированных новостей",
+        "vector": "search_vector",
+        "description": "по заголовку и описанию импортированных новостей",
     },
 ]
 
+OBSOLETE_INDEXES = [
+    "news_article_title_idx",
+    "news_article_content_idx",
+    "news_importednews_title_idx",
+    "news_importednews_summary_idx",
+]
+
 
 class Command(BaseCommand):
     help = "Пересоздаёт полнотекстовые GIN-индексы для моделей Article и ImportedNews (PostgreSQL)."
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.HTTP_INFO("🔧 Пересоздание полнотекстовых индексов..."))
+        if connection.vendor == "sqlite":
+            if search_fts.install(connection):
+                self.stdout.write(self.style.SUCCESS("🎯 FTS5-индексы SQLite переустановлены и перестроены!"))
+            else:
+                self.stdout.write(self.style.ERROR("SQLite собран без FTS5 — поиск работает через icontains."))
+            return
+        if connection.vendor != "postgresql":
+            self.stdout.write(self.style.WARNING(f"БД {connection.vendor}: полнотекстовых индексов нет, пропускаем."))
+            return
+
         with connection.cursor() as cursor:
+            for name in OBSOLETE_INDEXES:
+                cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
+
             for index in SQL_INDEXES:
                 name = index["name"]
                 table = index["table"]
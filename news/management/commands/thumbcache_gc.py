@@ -0,0 +1,126 @@
+# Путь: backend/news/management/commands/thumbcache_gc.py
+# Назначение: Уборка дискового кэша миниатюр (MEDIA_ROOT/cache/thumbs) до заданного бюджета.
+# Что делает:
+#   - Сверяет индекс обращений с диском (старые «плоские» файлы переносит в подпапки ab/cd/,
+#     неизвестные файлы добавляет, записи без файлов удаляет, брошенные .tmp-файлы чистит).
+#   - Если кэш больше бюджета — вытесняет файлы по политике lru (давно не читанные) или lfu (редко читаемые)
+#     до 90% бюджета.
+#   - Печатает заполненность и долю попаданий.
+#   - С общим хранилищем (THUMB_STORAGE) копии на диске узла вытесняются как обычно (при следующем обращении
+#     миниатюра снова скопируется из хранилища), а само хранилище держится в бюджете THUMB_STORAGE_MAX_BYTES:
+#     удаляются давно не читанные миниатюры (по времени обращения в индексе ThumbCacheEntry) — файл и запись.
+#     Достаточно запускать на одном узле.
+#   - Чистит просроченные записи негативного кэша битых картинок и счётчики отказов хостов (utils/image_failures.py).
+#   - Кэш оригиналов внешних картинок (THUMB_CACHE_DIR/orig, news/image_proxy.py) — так же: сверка индекса
+#     и вытеснение давно не читанных до бюджета THUMB_ORIGINALS_MAX_BYTES. Пропавший оригинал просто скачается заново.
+#
+# Примеры:
+#   python manage.py thumbcache_gc                          # бюджет THUMB_CACHE_MAX_BYTES, политика THUMB_CACHE_EVICTION
+#   python manage.py thumbcache_gc --budget-mb 500 --policy lfu
+#   python manage.py thumbcache_gc --stats                  # только статистика
+#   python manage.py thumbcache_gc --dry-run                # показать, сколько было бы удалено
+#   python manage.py thumbcache_gc --shared-budget-mb 10000 # бюджет общего хранилища
+#   python manage.py thumbcache_gc --orig-budget-mb 500     # бюджет кэша оригиналов
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from news.image_proxy import ORIG_INDEX
+from news.utils import image_failures, thumb_store
+from news.utils.thumb_cache import EVICTION_ORDER, evict, get_stats, reindex
+from news.views_media import THUMB_INDEX
+
+
+def _mb(n):
+    return f"{n / (1024 * 1024):.1f} МБ"
+
+
+class Command(BaseCommand):
+    help = "Держит кэш миниатюр в пределах бюджета (LRU/LFU) и показывает статистику."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--budget-mb", type=float, help="Бюджет, МБ (по умолчанию THUMB_CACHE_MAX_BYTES).")
+        parser.add_argument("--shared-budget-mb", type=float,
+                            help="Бюджет общего хранилища, МБ (по умолчанию THUMB_STORAGE_MAX_BYTES).")
+        parser.add_argument("--orig-budget-mb", type=float,
+                            help="Бюджет кэша оригиналов, МБ (по умолчанию THUMB_ORIGINALS_MAX_BYTES).")
+        parser.add_argument("--policy", choices=sorted(EVICTION_ORDER), help="Политика вытеснения.")
+        parser.add_argument("--dry-run", action="store_true", help="Ничего не удалять.")
+        parser.add_argument("--stats", action="store_true", help="Только показать статистику.")
+        parser.add_argument("--no-reindex", action="store_true", help="Не сверять индекс с диском.")
+
+    def handle(self, *args, **options):
+        budget = (
+            int(options["budget_mb"] * 1024 * 1024)
+            if options["budget_mb"] is not None
+            else int(getattr(settings, "THUMB_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+        )
+        if budget <= 0:
+            raise CommandError("Бюджет должен быть больше нуля")
+        shared_budget = (
+            int(options["shared_budget_mb"] * 1024 * 1024)
+            if options["shared_budget_mb"] is not None
+            else int(getattr(settings, "THUMB_STORAGE_MAX_BYTES", 20 * 1024 ** 3))
+        )
+        if shared_budget <= 0:
+            raise CommandError("Бюджет общего хранилища должен быть больше нуля")
+        orig_budget = (
+            int(options["orig_budget_mb"] * 1024 * 1024)
+            if options["orig_budget_mb"] is not None
+            else int(getattr(settings, "THUMB_ORIGINALS_MAX_BYTES", 1024 ** 3))
+        )
+        if orig_budget <= 0:
+            raise CommandError("Бюджет кэша оригиналов должен быть больше нуля")
+        policy = options["policy"] or getattr(settings, "THUMB_CACHE_EVICTION", "lru")
+        if policy not in EVICTION_ORDER:
+            raise CommandError(f"Неизвестная политика {policy!r}")
+
+        if not options["stats"]:
+            verb = "было бы удалено" if options["dry_run"] else "удалено"
+            for index, label, limit in ((THUMB_INDEX, "Миниатюры", budget), (ORIG_INDEX, "Оригиналы", orig_budget)):
+                if not options["no_reindex"]:
+                    r = reindex(index)
+                    self.stdout.write(
+                        f"{label}, индекс: перенесено {r['moved']}, добавлено {r['added']}, "
+                        f"удалено записей {r['dropped']}, временных файлов {r['tmp_removed']}"
+                    )
+                res = evict(index, limit, policy=policy, dry_run=options["dry_run"])
+                self.stdout.write(
+                    f"{label}, вытеснение ({policy}): {verb} {res['removed_files']} файлов, "
+                    f"{_mb(res['removed_bytes'])}; {_mb(res['before_bytes'])} → {_mb(res['after_bytes'])}"
+                )
+            if not options["dry_run"]:
+                res = image_failures.purge_expired()
+                self.stdout.write(f"Негативный кэш: удалено просроченных URL {res['urls']}, хостов {res['hosts']}")
+            if thumb_store.enabled():
+                res = thumb_store.evict(shared_budget, dry_run=options["dry_run"])
+                self.stdout.write(
+                    f"Общее хранилище (lru): {verb} {res['removed_files']} файлов, {_mb(res['removed_bytes'])}; "
+                    f"{_mb(res['before_bytes'])} → {_mb(res['after_bytes'])}"
+                )
+
+        self._print_stats(budget, orig_budget)
+        if thumb_store.enabled():
+            shared = thumb_store.totals()
+            self.stdout.write(self.style.NOTICE(
+                f"Общее хранилище: {shared['shared_files']} файлов, {_mb(shared['shared_bytes'])} из {_mb(shared_budget)}"
+            ))
+
+    def _print_stats(self, budget, orig_budget):
+        THUMB_INDEX.flush()
+        totals = THUMB_INDEX.totals()
+        stats = get_stats()
+        occupancy = totals["bytes"] * 100 / budget
+        self.stdout.write(self.style.NOTICE(
+            f"Кэш миниатюр: {totals['files']} файлов, {_mb(totals['bytes'])} из {_mb(budget)} ({occupancy:.1f}%)"
+        ))
+        ORIG_INDEX.flush()
+        orig = ORIG_INDEX.totals()
+        self.stdout.write(self.style.NOTICE(
+            f"Кэш оригиналов: {orig['files']} файлов, {_mb(orig['bytes'])} из {_mb(orig_budget)} "
+            f"({orig['bytes'] * 100 / orig_budget:.1f}%)"
+        ))
+        for kind, label in (("thumb", "миниатюры"), ("orig", "оригиналы")):
+            rate = stats[f"{kind}_hit_rate"]
+            self.stdout.write(f"  Попадания ({label}): {'—' if rate is None else f'{rate * 100:.1f}%'}")
+        self.stdout.write(f"  Попаданий по индексу: {totals['hits']}")
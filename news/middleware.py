@@ -0,0 +1,13 @@
+# Путь: backend/news/middleware.py
+# Назначение: GZipMiddleware, который не трогает ответы с поддержкой Range (views_media_serve.serve_media).
+# Зачем: Content-Range и Content-Length таких ответов считаются по исходным байтам файла — сжатое тело
+#        с ними не сходится, а видео/картинки всё равно не сжимаются.
+
+from django.middleware.gzip import GZipMiddleware as DjangoGZipMiddleware
+
+
+class GZipMiddleware(DjangoGZipMiddleware):
+    def process_response(self, request, response):
+        if response.get("Accept-Ranges") == "bytes" or response.has_header("Content-Range"):
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,49 @@
+# Путь: backend/news/migrations/0026_article_text_len_importednews_text_len.py
+# Назначение: поле text_len (длина текста без краёвых пробелов) для Article/ImportedNews
+#             + пакетное заполнение для уже существующих записей.
+
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def _backfill(Model, text_field):
+    last_pk = 0
+    while True:
+        batch = list(
+            Model.objects.filter(pk__gt=last_pk, text_len__isnull=True)
+            .order_by("pk")
+            .only("pk", text_field)[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for obj in batch:
+            obj.text_len = len((getattr(obj, text_field) or "").strip())
+        Model.objects.bulk_update(batch, ["text_len"], batch_size=BATCH_SIZE)
+        last_pk = batch[-1].pk
+
+
+def fill_text_len(apps, schema_editor):
+    _backfill(apps.get_model("news", "Article"), "content")
+    _backfill(apps.get_model("news", "ImportedNews"), "summary")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0025_favorite'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='text_len',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True, verbose_name='Длина текста'),
+        ),
+        migrations.AddField(
+            model_name='importednews',
+            name='text_len',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True, verbose_name='Длина текста'),
+        ),
+        migrations.RunPython(fill_text_len, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Путь: backend/news/migrations/0027_image_meta.py
+# Назначение: метаданные картинки (ширина/высота/доминирующий цвет/LQIP) для Article и ImportedNews.
+#             Заполняются в фоне задачей news.image_meta (для старых записей — manage.py fill_image_meta).
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0026_article_text_len_importednews_text_len'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='image_color',
+            field=models.CharField(blank=True, default='', editable=False, max_length=7, verbose_name='Доминирующий цвет'),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота картинки'),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='image_lqip',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='LQIP-превью (data URI)'),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='image_meta_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=40),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина картинки'),
+        ),
+        migrations.AddField(
+            model_name='importednews',
+            name='image_color',
+            field=models.CharField(blank=True, default='', editable=False, max_length=7, verbose_name='Доминирующий цвет'),
+        ),
+        migrations.AddField(
+            model_name='importednews',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота картинки'),
+        ),
+        migrations.AddField(
+            model_name='importednews',
+            name='image_lqip',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='LQIP-превью (data URI)'),
+        ),
+        migrations.AddField(
+            model_name='importednews',
+            name='image_meta_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=40),
+        ),
+        migrations.AddField(
+            model_name='importednews',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина картинки'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Путь: backend/news/migrations/0028_canonical_images.py
+# Назначение: канонические картинки (dHash) и привязка к ним URL — склейка дубликатов (news/utils/image_dedup.py).
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0027_image_meta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CanonicalImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dhash', models.CharField(db_index=True, max_length=16, verbose_name='dHash')),
+                ('band0', models.PositiveIntegerField(db_index=True)),
+                ('band1', models.PositiveIntegerField(db_index=True)),
+                ('band2', models.PositiveIntegerField(db_index=True)),
+                ('band3', models.PositiveIntegerField(db_index=True)),
+                ('width', models.PositiveIntegerField(verbose_name='Ширина')),
+                ('height', models.PositiveIntegerField(verbose_name='Высота')),
+                ('original', models.CharField(blank=True, default='', max_length=500, verbose_name='Оригинал в кэше')),
+                ('color', models.CharField(blank=True, default='', max_length=7, verbose_name='Доминирующий цвет')),
+                ('lqip', models.TextField(blank=True, default='', verbose_name='LQIP-превью')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Впервые загружена')),
+            ],
+            options={
+                'verbose_name': 'Каноническая картинка',
+                'verbose_name_plural': 'Канонические картинки (дубликаты)',
+            },
+        ),
+        migrations.CreateModel(
+            name='ImageUrl',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_hash', models.CharField(max_length=40, unique=True)),
+                ('url', models.TextField(verbose_name='URL')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('canonical', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='urls', to='news.canonicalimage')),
+            ],
+            options={
+                'verbose_name': 'URL картинки',
+                'verbose_name_plural': 'URL картинок',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Путь: backend/news/migrations/0029_image_probe.py
+# Назначение: таблица результатов проверки картинок по URL (manage.py probe_images / clean_broken_images).
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0028_canonical_images'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageProbe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_hash', models.CharField(max_length=40, unique=True)),
+                ('url', models.TextField(verbose_name='URL')),
+                ('ok', models.BooleanField(db_index=True, default=False, verbose_name='Доступна')),
+                ('status', models.CharField(blank=True, default='', max_length=64, verbose_name='Результат')),
+                ('http_status', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='HTTP-код')),
+                ('content_type', models.CharField(blank=True, default='', max_length=100)),
+                ('width', models.PositiveIntegerField(blank=True, null=True, verbose_name='Ширина')),
+                ('height', models.PositiveIntegerField(blank=True, null=True, verbose_name='Высота')),
+                ('checked_at', models.DateTimeField(db_index=True, verbose_name='Проверена')),
+            ],
+            options={
+                'verbose_name': 'Проверка картинки',
+                'verbose_name_plural': 'Проверки картинок',
+            },
+        ),
+    ]
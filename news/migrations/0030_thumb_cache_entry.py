@@ -0,0 +1,29 @@
+# Путь: backend/news/migrations/0030_thumb_cache_entry.py
+# Назначение: индекс миниатюр в общем хранилище THUMB_STORAGE (news/utils/thumb_store.py).
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0029_image_probe'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThumbCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='Ключ кэша')),
+                ('name', models.CharField(max_length=255, verbose_name='Имя в хранилище')),
+                ('size', models.PositiveIntegerField(default=0, verbose_name='Размер, байт')),
+                ('content_type', models.CharField(blank=True, default='', max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Миниатюра в общем кэше',
+                'verbose_name_plural': 'Миниатюры в общем кэше',
+            },
+        ),
+    ]
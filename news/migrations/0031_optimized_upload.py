@@ -0,0 +1,34 @@
+# Путь: backend/news/migrations/0031_optimized_upload.py
+# Назначение: учёт оптимизированных загрузок — байты до/после и варианты (news/utils/upload_optimize.py).
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0030_thumb_cache_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OptimizedUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Файл')),
+                ('original_bytes', models.PositiveIntegerField(verbose_name='Было, байт')),
+                ('optimized_bytes', models.PositiveIntegerField(verbose_name='Стало, байт')),
+                ('original_width', models.PositiveIntegerField(blank=True, null=True, verbose_name='Ширина до')),
+                ('original_height', models.PositiveIntegerField(blank=True, null=True, verbose_name='Высота до')),
+                ('width', models.PositiveIntegerField(blank=True, null=True, verbose_name='Ширина')),
+                ('height', models.PositiveIntegerField(blank=True, null=True, verbose_name='Высота')),
+                ('replaced', models.BooleanField(default=False, verbose_name='Оригинал заменён')),
+                ('renditions', models.JSONField(blank=True, default=dict, verbose_name='Варианты')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Оптимизированная загрузка',
+                'verbose_name_plural': 'Оптимизированные загрузки',
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Путь: backend/news/migrations/0032_upload_blob.py
+# Назначение: sha256 загруженных файлов → имя в хранилище, для дедупликации загрузок (news/utils/upload_stream.py).
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0031_optimized_upload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(db_index=True, max_length=255, verbose_name='Файл')),
+                ('size', models.PositiveBigIntegerField(default=0, verbose_name='Размер, байт')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Загруженный файл',
+                'verbose_name_plural': 'Загруженные файлы (по содержимому)',
+            },
+        ),
+    ]
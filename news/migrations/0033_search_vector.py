@@ -0,0 +1,125 @@
+# Путь: backend/news/migrations/0033_search_vector.py
+# Назначение: хранимый взвешенный tsvector для полнотекстового поиска (news/utils/search.py).
+#   • поля search_vector у Article (title A + content B) и ImportedNews (title A + summary B);
+#   • PostgreSQL: триггеры BEFORE INSERT / UPDATE OF <текстовые поля> пересчитывают вектор при каждой записи
+#     (в т.ч. bulk_create и QuerySet.update); заполнение старых строк — пачками по BATCH id, каждая пачка
+#     в своей транзакции (atomic = False), чтобы не держать блокировку на всю таблицу;
+#   • GIN-индексы по search_vector создаются CONCURRENTLY; старые выражения-индексы из 0021 удаляются —
+#     с ними запросы поиска не совпадали, и индексы только замедляли запись.
+# На SQLite и других БД добавляются только пустые столбцы (индексы — лишь в состоянии миграций).
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+BATCH = 5000
+
+TABLES = {
+    # таблица: (текстовые поля, выражение вектора для строки NEW / текущей строки)
+    "news_article": ("title, content", "setweight(to_tsvector('russian', coalesce({p}title, '')), 'A') || "
+                                       "setweight(to_tsvector('russian', coalesce({p}content, '')), 'B')"),
+    "news_importednews": ("title, summary", "setweight(to_tsvector('russian', coalesce({p}title, '')), 'A') || "
+                                            "setweight(to_tsvector('russian', coalesce({p}summary, '')), 'B')"),
+}
+INDEXES = {"news_article": "news_article_search_gin", "news_importednews": "news_imported_search_gin"}
+
+
+def _is_pg(schema_editor):
+    return schema_editor.connection.vendor == "postgresql"
+
+
+def create_triggers(apps, schema_editor):
+    if not _is_pg(schema_editor):
+        return
+    for table, (columns, expr) in TABLES.items():
+        schema_editor.execute(f"""
+            CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {expr.format(p="NEW.")};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql;
+        """)
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_trg ON {table};")
+        schema_editor.execute(f"""
+            CREATE TRIGGER {table}_search_vector_trg
+            BEFORE INSERT OR UPDATE OF {columns} ON {table}
+            FOR EACH ROW EXECUTE PROCEDURE {table}_search_vector_update();
+        """)
+
+
+def drop_triggers(apps, schema_editor):
+    if not _is_pg(schema_editor):
+        return
+    for table in TABLES:
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_trg ON {table};")
+        schema_editor.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update();")
+
+
+def backfill(apps, schema_editor):
+    if not _is_pg(schema_editor):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table, (_, expr) in TABLES.items():
+            cursor.execute(f"SELECT min(id), max(id) FROM {table}")
+            lo, hi = cursor.fetchone()
+            if lo is None:
+                continue
+            for start in range(lo, hi + 1, BATCH):
+                cursor.execute(
+                    f"UPDATE {table} SET search_vector = {expr.format(p='')} "
+                    f"WHERE id >= %s AND id < %s AND search_vector IS NULL",
+                    [start, start + BATCH],
+                )
+
+
+def create_indexes(apps, schema_editor):
+    if not _is_pg(schema_editor):
+        return
+    for table, name in INDEXES.items():
+        schema_editor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING gin (search_vector);")
+    schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_article_search;")
+    schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_imported_search;")
+
+
+def drop_indexes(apps, schema_editor):
+    if not _is_pg(schema_editor):
+        return
+    for name in INDEXES.values():
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
+
+
+class Migration(migrations.Migration):
+    atomic = False  # пачки заполнения и CREATE INDEX CONCURRENTLY — вне общей транзакции
+
+    dependencies = [
+        ('news', '0032_upload_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='importednews',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='article',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='news_article_search_gin'),
+                ),
+                migrations.AddIndex(
+                    model_name='importednews',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='news_imported_search_gin'),
+                ),
+            ],
+            database_operations=[migrations.RunPython(create_indexes, drop_indexes)],
+        ),
+    ]
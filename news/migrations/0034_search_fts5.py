@@ -0,0 +1,34 @@
+# Путь: backend/news/migrations/0034_search_fts5.py
+# Назначение: полнотекстовый поиск на SQLite (staging, edge-узлы) — FTS5-индексы вместо icontains по всей таблице.
+#   • news_article_fts (title, content) и news_importednews_fts (title, summary) — external content таблицы FTS5:
+#     текст не дублируется, в индексе только термы; rowid = id строки новости;
+#   • триггеры AFTER INSERT / DELETE / UPDATE OF <текстовые поля> держат индекс в актуальном состоянии
+#     (в т.ч. при bulk_create и QuerySet.update);
+#   • существующие строки индексируются командой FTS5 'rebuild'.
+# SQL — news/utils/search_fts.py (install / uninstall; тем же install пользуется manage.py rebuild_indexes).
+# На PostgreSQL и на SQLite без FTS5 ничего не делает — поиск там идёт по search_vector / icontains.
+
+from django.db import migrations
+
+
+def create_fts(apps, schema_editor):
+    from news.utils import search_fts
+
+    search_fts.install(schema_editor.connection)
+
+
+def drop_fts(apps, schema_editor):
+    from news.utils import search_fts
+
+    search_fts.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0033_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
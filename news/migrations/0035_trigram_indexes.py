@@ -0,0 +1,69 @@
+# Путь: backend/news/migrations/0035_trigram_indexes.py
+# Назначение: триграммные GIN-индексы (pg_trgm) для «похожих новостей» и мягкого поиска по слагу/ссылке.
+#   • title__icontains / slug__icontains / link__icontains в PostgreSQL компилируются в
+#     UPPER(col::text) LIKE UPPER('%...%') — индекс построен по тому же выражению UPPER(col) с gin_trgm_ops,
+#     поэтому OR из нескольких icontains идёт через BitmapOr индексов, а не полным проходом таблицы;
+#   • тот же индекс обслуживает оператор похожести UPPER(col) % UPPER(текст) (news/utils/trigram.py).
+#   • индексы создаются CONCURRENTLY (atomic = False) — таблицы не блокируются на запись;
+#   • расширение pg_trgm ставится через CREATE EXTENSION IF NOT EXISTS, при откате не удаляется.
+# Проверка, что планировщик их использует: python manage.py check_trgm_indexes.
+# На SQLite и других БД — только состояние миграций, в самой БД ничего не создаётся.
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+INDEXES = [
+    # (имя, таблица, столбец)
+    ("news_article_title_trgm", "news_article", "title"),
+    ("news_article_slug_trgm", "news_article", "slug"),
+    ("news_imported_title_trgm", "news_importednews", "title"),
+    ("news_imported_slug_trgm", "news_importednews", "slug"),
+    ("news_imported_link_trgm", "news_importednews", "link"),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    # IF NOT EXISTS и без удаления при откате: расширение могло стоять и до этой миграции
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    for name, table, column in INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING gin (UPPER({column}) gin_trgm_ops);"
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in INDEXES:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
+
+
+def _gin(column, name):
+    return django.contrib.postgres.indexes.GinIndex(
+        django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(column), name='gin_trgm_ops'),
+        name=name,
+    )
+
+
+class Migration(migrations.Migration):
+    atomic = False  # CREATE INDEX CONCURRENTLY нельзя выполнять в транзакции
+
+    dependencies = [
+        ('news', '0034_search_fts5'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='article', index=_gin('title', 'news_article_title_trgm')),
+                migrations.AddIndex(model_name='article', index=_gin('slug', 'news_article_slug_trgm')),
+                migrations.AddIndex(model_name='importednews', index=_gin('title', 'news_imported_title_trgm')),
+                migrations.AddIndex(model_name='importednews', index=_gin('slug', 'news_imported_slug_trgm')),
+                migrations.AddIndex(model_name='importednews', index=_gin('link', 'news_imported_link_trgm')),
+            ],
+            database_operations=[migrations.RunPython(create_indexes, drop_indexes)],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Путь: backend/news/migrations/0036_thumbcache_accessed_at.py
+# Назначение: отметка последнего обращения к миниатюре в общем хранилище — по ней thumbcache_gc вытесняет
+#             давно не читанные файлы (news/utils/thumb_store.py). Существующим записям — время создания.
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill(apps, schema_editor):
+    ThumbCacheEntry = apps.get_model("news", "ThumbCacheEntry")
+    ThumbCacheEntry.objects.update(accessed_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0035_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='thumbcacheentry',
+            name='accessed_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Последнее обращение'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Путь: backend/news/migrations/0037_image_failures.py
+# Назначение: негативный кэш битых картинок и счётчик отказов хостов в БД (news/utils/image_failures.py) —
+#             общий для всех воркеров, а не в LocMem-кэше каждого процесса.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0036_thumbcache_accessed_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageFailure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_hash', models.CharField(max_length=40, unique=True)),
+                ('url', models.TextField(verbose_name='URL')),
+                ('reason', models.CharField(max_length=32, verbose_name='Причина')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Не качать до')),
+            ],
+            options={
+                'verbose_name': 'Битая картинка',
+                'verbose_name_plural': 'Битые картинки (негативный кэш)',
+            },
+        ),
+        migrations.CreateModel(
+            name='ImageHostFailure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('host', models.CharField(max_length=255, unique=True, verbose_name='Хост')),
+                ('failures', models.PositiveIntegerField(default=0, verbose_name='Временных отказов')),
+                ('window_start', models.DateTimeField(verbose_name='Начало окна')),
+            ],
+            options={
+                'verbose_name': 'Отказы хоста картинок',
+                'verbose_name_plural': 'Отказы хостов картинок',
+            },
+        ),
+    ]
@@ -5,14 +5,35 @@
 #   ✅ Сохраняется SEO-схема: /<категория>/<slug>/
 #   ✅ Добавлены проверки на уникальность slug и автоисправления дубликатов.
 #   ✅ Полностью совместимо с UniversalNewsDetailView и фронтендом IzotovLife.
+#   ✅ text_len — длина текста без краёвых пробелов, пересчитывается в save();
+#      по ней cleanup_broken_news() удаляет «битые» записи одним запросом, без обхода в Python.
+#   ✅ image_width/image_height/image_color/image_lqip — метаданные картинки для карточек (считаются в фоне).
+#   ✅ search_vector — взвешенный tsvector (заголовок A, текст B) для полнотекстового поиска в PostgreSQL;
+#      заполняется триггером БД (миграция 0033_search_vector), ищется по GIN-индексу (news/utils/search.py).
+#   ✅ Триграммные GIN-индексы по UPPER(title/slug/link) (pg_trgm, миграция 0035_trigram_indexes): их используют
+#      __icontains и сравнение похожести (%) из news/utils/trigram.py.
 
 import uuid
 import re
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 from django.conf import settings
 from django.utils.text import slugify
 from unidecode import unidecode
 from .models_logs import NewsResolverLog
+from .models_images import (  # noqa: F401
+    CanonicalImage, ImageFailure, ImageHostFailure, ImageProbe, ImageUrl, OptimizedUpload, ThumbCacheEntry, UploadBlob,
+)
+
+
+def _sync_text_len(instance, text_field: str, kwargs: dict) -> None:
+    """Пересчитывает text_len и добавляет его в update_fields, если сохраняется сам текст."""
+    instance.text_len = len((getattr(instance, text_field) or "").strip())
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and text_field in update_fields and "text_len" not in update_fields:
+        kwargs["update_fields"] = list(update_fields) + ["text_len"]
 
 
 # ==============================
@@ -69,11 +90,25 @@ class Article(models.Model):
     archived_at = models.DateTimeField("В архиве с", null=True, blank=True)
     views_count = models.PositiveIntegerField("Просмотры", default=0)
     type = models.CharField(max_length=20, default="article", editable=False)
+    text_len = models.PositiveIntegerField("Длина текста", null=True, blank=True, editable=False, db_index=True)
+    # Метаданные картинки (news/utils/image_meta.py, задача news.image_meta): размер, цвет фона, LQIP
+    image_width = models.PositiveIntegerField("Ширина картинки", null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField("Высота картинки", null=True, blank=True, editable=False)
+    image_color = models.CharField("Доминирующий цвет", max_length=7, blank=True, default="", editable=False)
+    image_lqip = models.TextField("LQIP-превью (data URI)", blank=True, default="", editable=False)
+    image_meta_key = models.CharField(max_length=40, blank=True, default="", editable=False)
+    # title (вес A) + content (вес B); пишет триггер PostgreSQL, в других БД остаётся пустым
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ["-published_at", "-created_at"]
         verbose_name = "Авторская статья"
         verbose_name_plural = "Авторские статьи"
+        indexes = [
+            GinIndex(fields=["search_vector"], name="news_article_search_gin"),
+            GinIndex(OpClass(Upper("title"), name="gin_trgm_ops"), name="news_article_title_trgm"),
+            GinIndex(OpClass(Upper("slug"), name="gin_trgm_ops"), name="news_article_slug_trgm"),
+        ]
 
     def save(self, *args, **kwargs):
         # 🔹 Формируем уникальный slug из заголовка и категории
@@ -92,6 +127,7 @@ class Article(models.Model):
                 new_slug = f"{cat_slug}-{base_slug}-{counter}"
                 counter += 1
             self.slug = new_slug
+        _sync_text_len(self, "content", kwargs)
         super().save(*args, **kwargs)
 
     # 🔹 SEO-адрес /<категория>/<slug>/
@@ -173,11 +209,26 @@ class ImportedNews(models.Model):
     archived_at = models.DateTimeField("В архиве с", null=True, blank=True)
     views_count = models.PositiveIntegerField("Просмотры", default=0)
     type = models.CharField(max_length=20, default="rss", editable=False)
+    text_len = models.PositiveIntegerField("Длина текста", null=True, blank=True, editable=False, db_index=True)
+    # Метаданные картинки (news/utils/image_meta.py, задача news.image_meta): размер, цвет фона, LQIP
+    image_width = models.PositiveIntegerField("Ширина картинки", null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField("Высота картинки", null=True, blank=True, editable=False)
+    image_color = models.CharField("Доминирующий цвет", max_length=7, blank=True, default="", editable=False)
+    image_lqip = models.TextField("LQIP-превью (data URI)", blank=True, default="", editable=False)
+    image_meta_key = models.CharField(max_length=40, blank=True, default="", editable=False)
+    # title (вес A) + summary (вес B); пишет триггер PostgreSQL, в других БД остаётся пустым
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ["-published_at", "-created_at"]
         verbose_name = "Импортированная новость"
         verbose_name_plural = "Импортированные новости"
+        indexes = [
+            GinIndex(fields=["search_vector"], name="news_imported_search_gin"),
+            GinIndex(OpClass(Upper("title"), name="gin_trgm_ops"), name="news_imported_title_trgm"),
+            GinIndex(OpClass(Upper("slug"), name="gin_trgm_ops"), name="news_imported_slug_trgm"),
+            GinIndex(OpClass(Upper("link"), name="gin_trgm_ops"), name="news_imported_link_trgm"),
+        ]
 
     def save(self, *args, **kwargs):
         # 🔹 slug без source, всегда латиницей
@@ -195,6 +246,7 @@ class ImportedNews(models.Model):
         if not self.link:
             self.link = str(uuid.uuid4())
 
+        _sync_text_len(self, "summary", kwargs)
         super().save(*args, **kwargs)
 
     @property
@@ -0,0 +1,152 @@
+# backend/news/models_images.py
+# Назначение: «канонические» картинки — одно изображение под разными URL (агентское фото в перепечатках).
+#   CanonicalImage — картинка, узнанная по перцептивному хэшу (dHash, 64 бита); размеры, цвет и LQIP общие.
+#   ImageUrl      — конкретный URL → его CanonicalImage (заполняется при первой загрузке оригинала).
+#   ImageProbe    — последний результат сетевой проверки URL (manage.py probe_images, clean_broken_images).
+#   ThumbCacheEntry — миниатюра в общем хранилище (THUMB_STORAGE): индекс «есть ли файл» для всех узлов
+#                     и отметка последнего обращения для вытеснения (thumbcache_gc).
+#   OptimizedUpload — загруженная картинка после оптимизации (utils/upload_optimize.py): байты до/после, варианты.
+#   UploadBlob    — sha256 загруженного файла → имя в хранилище (utils/upload_stream.py): повтор не копируется.
+#   ImageFailure / ImageHostFailure — негативный кэш битых URL (с TTL) и счётчик отказов хоста
+#                     (utils/image_failures.py): общие для всех воркеров и узлов, как ImageProbe.
+# Логика — news/utils/image_dedup.py; отчёт по крупнейшим кластерам — админка (admin_images.py).
+
+from django.db import models
+from django.utils import timezone
+
+
+class CanonicalImage(models.Model):
+    dhash = models.CharField("dHash", max_length=16, db_index=True)
+    # 4 части хэша по 16 бит: картинки на расстоянии Хэмминга ≤ 3 совпадут хотя бы в одной части
+    band0 = models.PositiveIntegerField(db_index=True)
+    band1 = models.PositiveIntegerField(db_index=True)
+    band2 = models.PositiveIntegerField(db_index=True)
+    band3 = models.PositiveIntegerField(db_index=True)
+    width = models.PositiveIntegerField("Ширина")
+    height = models.PositiveIntegerField("Высота")
+    original = models.CharField("Оригинал в кэше", max_length=500, blank=True, default="")
+    color = models.CharField("Доминирующий цвет", max_length=7, blank=True, default="")
+    lqip = models.TextField("LQIP-превью", blank=True, default="")
+    created_at = models.DateTimeField("Впервые загружена", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Каноническая картинка"
+        verbose_name_plural = "Канонические картинки (дубликаты)"
+
+    def __str__(self):
+        return f"#{self.pk} {self.dhash} {self.width}×{self.height}"
+
+
+class ImageUrl(models.Model):
+    url_hash = models.CharField(max_length=40, unique=True)
+    url = models.TextField("URL")
+    canonical = models.ForeignKey(CanonicalImage, on_delete=models.CASCADE, related_name="urls")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "URL картинки"
+        verbose_name_plural = "URL картинок"
+
+    def __str__(self):
+        return self.url[:100]
+
+
+class ImageProbe(models.Model):
+    url_hash = models.CharField(max_length=40, unique=True)
+    url = models.TextField("URL")
+    ok = models.BooleanField("Доступна", default=False, db_index=True)
+    status = models.CharField("Результат", max_length=64, blank=True, default="")  # ok-get / http-404 / err-Timeout ...
+    http_status = models.PositiveSmallIntegerField("HTTP-код", null=True, blank=True)
+    content_type = models.CharField(max_length=100, blank=True, default="")
+    width = models.PositiveIntegerField("Ширина", null=True, blank=True)
+    height = models.PositiveIntegerField("Высота", null=True, blank=True)
+    checked_at = models.DateTimeField("Проверена", db_index=True)
+
+    class Meta:
+        verbose_name = "Проверка картинки"
+        verbose_name_plural = "Проверки картинок"
+
+    def __str__(self):
+        return f"{'OK' if self.ok else 'BROKEN'} {self.status} {self.url[:80]}"
+
+
+class ThumbCacheEntry(models.Model):
+    key = models.CharField("Ключ кэша", max_length=64, unique=True)
+    name = models.CharField("Имя в хранилище", max_length=255)
+    size = models.PositiveIntegerField("Размер, байт", default=0)
+    content_type = models.CharField(max_length=50, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # грубая отметка (не чаще THUMB_STORAGE_TOUCH_INTERVAL) — по ней thumbcache_gc вытесняет давно не читанные
+    accessed_at = models.DateTimeField("Последнее обращение", default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = "Миниатюра в общем кэше"
+        verbose_name_plural = "Миниатюры в общем кэше"
+
+    def __str__(self):
+        return self.name
+
+
+class OptimizedUpload(models.Model):
+    name = models.CharField("Файл", max_length=255, unique=True)
+    original_bytes = models.PositiveIntegerField("Было, байт")
+    optimized_bytes = models.PositiveIntegerField("Стало, байт")
+    original_width = models.PositiveIntegerField("Ширина до", null=True, blank=True)
+    original_height = models.PositiveIntegerField("Высота до", null=True, blank=True)
+    width = models.PositiveIntegerField("Ширина", null=True, blank=True)
+    height = models.PositiveIntegerField("Высота", null=True, blank=True)
+    replaced = models.BooleanField("Оригинал заменён", default=False)
+    renditions = models.JSONField("Варианты", default=dict, blank=True)  # {"webp": {"name": ..., "bytes": ...}}
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Оптимизированная загрузка"
+        verbose_name_plural = "Оптимизированные загрузки"
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - self.optimized_bytes
+
+
+class UploadBlob(models.Model):
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField("Файл", max_length=255, db_index=True)
+    size = models.PositiveBigIntegerField("Размер, байт", default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Загруженный файл"
+        verbose_name_plural = "Загруженные файлы (по содержимому)"
+
+    def __str__(self):
+        return self.name
+
+
+class ImageFailure(models.Model):
+    url_hash = models.CharField(max_length=40, unique=True)
+    url = models.TextField("URL")
+    reason = models.CharField("Причина", max_length=32)
+    expires_at = models.DateTimeField("Не качать до", db_index=True)
+
+    class Meta:
+        verbose_name = "Битая картинка"
+        verbose_name_plural = "Битые картинки (негативный кэш)"
+
+    def __str__(self):
+        return f"{self.reason} {self.url[:80]}"
+
+
+class ImageHostFailure(models.Model):
+    host = models.CharField("Хост", max_length=255, unique=True)
+    failures = models.PositiveIntegerField("Временных отказов", default=0)
+    window_start = models.DateTimeField("Начало окна")
+
+    class Meta:
+        verbose_name = "Отказы хоста картинок"
+        verbose_name_plural = "Отказы хостов картинок"
+
+    def __str__(self):
+        return f"{self.host}: {self.failures}"
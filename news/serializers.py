@@ -3,12 +3,15 @@
 # Исправления:
 #   - ✅ Добавлены seo_url и category_display для фронта.
 #   - ✅ Ссылки теперь формируются по /news/<category>/<slug>/ и /news/<source>/<slug>/.
+#   - ✅ image_width/image_height/image_color/image_lqip — место под картинку и превью до загрузки миниатюры.
+#   - ✅ Поле thumbnails: подписанные ссылки на миниатюры стандартных размеров ({"card": ..., "hero": ...}).
 #   - ✅ Ничего не удалено из текущего функционала.
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.conf import settings
 from .models import Article, Category, ImportedNews, NewsSource
+from .utils.thumb_urls import thumbnail_urls
 
 User = get_user_model()
 
@@ -60,13 +63,15 @@ class ArticleSerializer(serializers.ModelSerializer):
     seo_url = serializers.SerializerMethodField()
     category_display = serializers.SerializerMethodField()
     cover_image_url = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = Article
         fields = [
             "id", "title", "slug", "content", "summary",
             "created_at", "published_at", "cover_image", "cover_image_url",
-            "type", "seo_url", "category_display",
+            "type", "seo_url", "category_display", "thumbnails",
+            "image_width", "image_height", "image_color", "image_lqip",
         ]
 
     def get_summary(self, obj):
@@ -89,6 +94,9 @@ class ArticleSerializer(serializers.ModelSerializer):
             return obj.cover_image.url if hasattr(obj.cover_image, "url") else obj.cover_image
         return settings.MEDIA_URL + "defaults/default_news.png"
 
+    def get_thumbnails(self, obj):
+        return thumbnail_urls(obj, self.context.get("request"))
+
 
 class NewsSourceSerializer(serializers.ModelSerializer):
     """Источник новостей (РИА, ТАСС и т.п.)."""
@@ -105,6 +113,7 @@ class ImportedNewsSerializer(serializers.ModelSerializer):
     summary = serializers.SerializerMethodField()
     external_url = serializers.SerializerMethodField()
     image_url = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = ImportedNews
@@ -114,7 +123,8 @@ class ImportedNewsSerializer(serializers.ModelSerializer):
             "image", "image_url", "link", "external_url",
             "published_at", "category", "created_at",
             "feed_url", "type", "source",
-            "seo_url", "category_display",
+            "seo_url", "category_display", "thumbnails",
+            "image_width", "image_height", "image_color", "image_lqip",
         ]
 
     def get_summary(self, obj):
@@ -141,6 +151,9 @@ class ImportedNewsSerializer(serializers.ModelSerializer):
             return obj.image
         return settings.MEDIA_URL + "defaults/default_news.png"
 
+    def get_thumbnails(self, obj):
+        return thumbnail_urls(obj, self.context.get("request"))
+
 
 class NewsSerializer(serializers.Serializer):
     """Полиморфный сериализатор для объединённой ленты."""
@@ -1,5 +1,6 @@
 # backend/news/signals.py
 # Назначение: Блокируем сохранение «пустых» новостей (после очистки HTML).
+#             После сохранения с новой картинкой ставим расчёт её метаданных (размер/цвет/LQIP) в фон.
 # Что изменено сейчас:
 #   • Удалён старый импорт has_text_dict (его больше нет).
 #   • Используем строгую проверку instance_has_text_strict(...).
@@ -7,12 +8,14 @@
 #   • Разрешаем сознательные пустые записи, если у модели выставлен allow_empty=True или force_save=True.
 # Путь: backend/news/signals.py
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 
 from . import models
 from .utils.content_filters import instance_has_text_strict
+from .utils.image_meta import needs_update
 
 # Применяем защиту к основным моделям (переименуйте, если у вас другие названия)
 _PROTECT_MODELS = []
@@ -35,3 +38,14 @@ for Model in _PROTECT_MODELS:
         # Строго: после очистки HTML должен остаться текст (>=1 символ и >=1 слово)
         if not instance_has_text_strict(instance, min_chars=1, min_words=1):
             raise ValidationError("Запрещено сохранять новости без текста (после очистки HTML).")
+
+
+for Model in _PROTECT_MODELS:
+    @receiver(post_save, sender=Model)
+    def _queue_image_meta(sender, instance, **kwargs):
+        if kwargs.get("raw") or not getattr(settings, "IMAGE_META_ON_SAVE", True):
+            return
+        if needs_update(instance):
+            from .tasks import enqueue_image_meta
+
+            enqueue_image_meta(instance)
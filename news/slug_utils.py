@@ -1,6 +1,8 @@
 # Путь: backend/news/slug_utils.py
 # Назначение: Транслитерация RU→LAT и безопасная генерация уникальных slug для категорий (и не только).
 
+import threading
+
 from django.utils.text import slugify
 from unidecode import unidecode
 
@@ -28,3 +30,54 @@ def make_unique(base_slug: str, exists) -> str:
         candidate = f"{base}-{n}"
         n += 1
     return candidate
+
+
+class SlugAllocator:
+    """
+    Раздаёт уникальные slug пачкой (для команд на news/utils/maintenance.py).
+    Базовые варианты проверяются одним запросом на пачку; суффиксы -N — точечно (редкий случай).
+    Слаги, выданные в этом прогоне, резервируются, чтобы две записи не получили один и тот же.
+    start — первый суффикс (1 → base-1, 2 → base-2, как в make_unique).
+    """
+
+    def __init__(self, model, field: str = "slug", start: int = 1):
+        self.model = model
+        self.field = field
+        self.start = start
+        self._reserved = {}  # slug -> pk
+        self._lock = threading.Lock()
+
+    def _is_free(self, slug: str, pk, bases: set, taken: dict) -> bool:
+        owner = self._reserved.get(slug)
+        if owner is not None:
+            return owner == pk
+        if slug in bases:
+            # для базовых вариантов занятость уже известна из пакетного запроса
+            return taken.get(slug, pk) == pk
+        return not self.model._default_manager.filter(**{self.field: slug}).exclude(pk=pk).exists()
+
+    def allocate_many(self, items) -> dict:
+        """items: [(pk, base_slug), ...] → {pk: unique_slug}."""
+        bases = {base for _, base in items if base}
+        with self._lock:
+            taken = {
+                slug: pk for pk, slug in
+                self.model._default_manager.filter(**{f"{self.field}__in": bases}).values_list("pk", self.field)
+            }
+            result = {}
+            for pk, base in items:
+                if not base:
+                    continue
+                candidate, n = base, self.start
+                while not self._is_free(candidate, pk, bases, taken):
+                    candidate = f"{base}-{n}"
+                    n += 1
+                self._reserved[candidate] = pk
+                result[pk] = candidate
+            return result
+
+    def release(self, slugs) -> None:
+        """Снимает резерв со слагов, которые уже записаны в БД (дальше их видно запросом)."""
+        with self._lock:
+            for slug in slugs:
+                self._reserved.pop(slug, None)
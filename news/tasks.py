@@ -0,0 +1,80 @@
+# Путь: backend/news/tasks.py
+# Назначение: Фоновые задачи news (выполняются воркером manage.py run_workers).
+
+import hashlib
+
+from django.apps import apps
+from django.conf import settings
+
+from jobs.api import PRIORITY_LOW, enqueue, register
+
+from .utils.image_meta import update_image_meta
+from .utils.upload_optimize import optimize_upload
+from .utils.thumb_urls import thumbnail_sources
+
+
+def enqueue_pregen(obj, presets=None):
+    """Ставит предгенерацию миниатюр новости в очередь (по одной задаче на картинку)."""
+    jobs = []
+    for src in thumbnail_sources(obj):
+        payload = {"src": src}
+        if presets:
+            payload["presets"] = list(presets)
+        jobs.append(enqueue(
+            "news.pregen_thumbnails", payload, priority=PRIORITY_LOW, max_attempts=2,
+            unique_key=f"news.pregen_thumbnails:{hashlib.sha1(src.encode('utf-8')).hexdigest()}",
+        ))
+    return jobs
+
+
+@register("news.pregen_thumbnails")
+def pregen_thumbnails_job(src, presets=None):
+    from .views_media import pregenerate
+
+    return pregenerate(src, presets or getattr(settings, "THUMB_PREGEN_PRESETS", None))
+
+
+def enqueue_image_meta(obj):
+    """Ставит расчёт размеров/цвета/LQIP картинки obj в очередь (news/utils/image_meta.py)."""
+    label = obj._meta.label_lower
+    return enqueue(
+        "news.image_meta", {"model": label, "pk": obj.pk}, priority=PRIORITY_LOW, max_attempts=2,
+        unique_key=f"news.image_meta:{label}:{obj.pk}",
+    )
+
+
+@register("news.image_meta")
+def image_meta_job(model, pk):
+    from .views_media import _source_path
+
+    obj = apps.get_model(model).objects.filter(pk=pk).first()
+    if obj is None:
+        return {"skipped": "запись удалена"}
+    values = update_image_meta(obj, _source_path)
+    return {k: v for k, v in values.items() if k != "image_lqip"}
+
+
+def enqueue_optimize_upload(name, field=None):
+    """
+    Ставит оптимизацию загруженной картинки в очередь (news/utils/upload_optimize.py).
+    field — "app_label.Model.field", чьё хранилище использовать (по умолчанию default_storage).
+    """
+    if not name or not getattr(settings, "UPLOAD_OPTIMIZE", True):
+        return None
+    return enqueue(
+        "news.optimize_upload", {"name": name, "field": field}, priority=PRIORITY_LOW, max_attempts=2,
+        unique_key=f"news.optimize_upload:{name}",
+    )
+
+
+@register("news.optimize_upload")
+def optimize_upload_job(name, field=None):
+    from django.core.files.storage import default_storage
+
+    storage = default_storage
+    if field:
+        model_label, field_name = field.rsplit(".", 1)
+        storage = apps.get_model(model_label)._meta.get_field(field_name).storage
+    if not storage.exists(name):
+        return {"skipped": "файл удалён"}
+    return optimize_upload(storage, name) or {"skipped": "не картинка или уже оптимизирован"}
@@ -43,7 +43,7 @@ from .views_upload import upload_image
 from . import editor_views
 from . import api_extra_views
 from .views_universal_detail import UniversalNewsDetailView
-from .views_media import thumbnail_proxy
+from .views_media import thumbnail_cache_stats, thumbnail_proxy
 
 # Батч-обложки категорий
 from .api.category_covers import CategoryCoversView  # noqa: E402
@@ -229,4 +229,5 @@ urlpatterns = [
 
     # -------------------- Ресайзер --------------------
     path("media/thumbnail/", thumbnail_proxy, name="media-thumbnail"),
+    path("media/thumbnail/stats/", thumbnail_cache_stats, name="media-thumbnail-stats"),
 ]
@@ -0,0 +1,70 @@
+# Путь: backend/news/utils/byte_ranges.py
+# Назначение: Разбор заголовков Range / If-Range (RFC 9110, §14) для отдачи медиа частями (views_media_serve.py).
+# Правила:
+#   • Range не "bytes=..." или с синтаксической ошибкой — игнорируется (отдаём файл целиком, 200).
+#   • Ни один диапазон не попадает в файл — 416 (parse_range возвращает []).
+#   • Пересекающиеся и соседние диапазоны склеиваются; больше max_ranges частей — заголовок игнорируется
+#     (защита от запросов из сотен крошечных диапазонов).
+#   • If-Range: ETag (только сильное сравнение) или дата Last-Modified (точное совпадение);
+#     не совпало — файл изменился, отдаём целиком.
+
+from __future__ import annotations
+
+from django.utils.http import parse_http_date_safe
+
+MAX_RANGES = 16
+
+
+def parse_range(header: str, size: int, max_ranges: int = MAX_RANGES) -> list[tuple[int, int]] | None:
+    """
+    Диапазоны [(start, end), ...] (end включительно) из заголовка Range для файла размером size.
+    None — заголовок не применим (отдать целиком), [] — ни один диапазон не выполним (416).
+    """
+    unit, _, spec = (header or "").partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, dash, last = part.partition("-")
+        first, last = first.strip(), last.strip()
+        if not dash or not (first.isdigit() or first == "") or not (last.isdigit() or last == ""):
+            return None
+        if first == "":
+            if last == "":
+                return None
+            suffix = int(last)  # bytes=-500 — последние 500 байт
+            if suffix > 0 and size > 0:
+                ranges.append((max(0, size - suffix), size - 1))
+            continue
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start < size:
+            ranges.append((start, min(int(last), size - 1) if last else size - 1))
+    if len(ranges) > max_ranges:
+        return None
+    return _coalesce(ranges)
+
+
+def _coalesce(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def if_range_matches(header: str, etag: str, last_modified: int | None) -> bool:
+    """Выполнено ли условие If-Range (пустой заголовок — выполнено)."""
+    header = (header or "").strip()
+    if not header:
+        return True
+    if header.startswith('"') or header.startswith("W/"):
+        return not header.startswith("W/") and header == etag
+    ts = parse_http_date_safe(header)
+    return ts is not None and last_modified is not None and ts == last_modified
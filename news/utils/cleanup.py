@@ -1,31 +1,95 @@
 # Путь: backend/news/utils/cleanup.py
 # Назначение: Очистка "битых" новостей (без текста, пустые slug).
+# Как работает:
+#   • Битость определяется в SQL по сохранённому полю text_len и длине slug — без обхода строк в Python.
+#   • Удаление пачками по pk (chunk_size), чтобы не держать длинные блокировки на больших таблицах.
+#   • Инкрементальный режим: article_ids / imported_ids — проверяем только строки, тронутые текущим импортом.
+#   • dry_run=True — ничего не удаляем, только отчёт.
+
+from django.db.models import Q
+from django.db.models.functions import Length
 
 from news.models import Article, ImportedNews
 
-def cleanup_broken_news(stdout=None):
+MIN_SLUG_LEN = 3
+MIN_TEXT_LEN = 50
+CHUNK_SIZE = 500
+REPORT_SAMPLE = 20
+
+
+def _fill_missing_text_len(Model, text_field, qs, chunk_size):
+    """Досчитывает text_len там, где он ещё не заполнен (строки, сохранённые в обход save())."""
+    last_pk = 0
+    while True:
+        batch = list(
+            qs.filter(pk__gt=last_pk, text_len__isnull=True).order_by("pk").only("pk", text_field)[:chunk_size]
+        )
+        if not batch:
+            break
+        for obj in batch:
+            obj.text_len = len((getattr(obj, text_field) or "").strip())
+        Model.objects.bulk_update(batch, ["text_len"])
+        last_pk = batch[-1].pk
+
+
+def _broken_qs(qs):
+    return qs.annotate(_slug_len=Length("slug")).filter(
+        Q(slug__isnull=True) | Q(_slug_len__lt=MIN_SLUG_LEN) | Q(text_len__lt=MIN_TEXT_LEN)
+    )
+
+
+def _purge(Model, text_field, kind, ids, dry_run, chunk_size, broken):
+    qs = Model.objects.all() if ids is None else Model.objects.filter(pk__in=list(ids))
+    _fill_missing_text_len(Model, text_field, qs, chunk_size)
+
+    candidates = _broken_qs(qs).order_by("pk")
+    last_pk = 0
+    while True:
+        chunk = list(candidates.filter(pk__gt=last_pk).values_list("pk", "slug")[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1][0]
+        broken.extend((kind, slug) for _, slug in chunk)
+        if not dry_run:
+            Model.objects.filter(pk__in=[pk for pk, _ in chunk]).delete()
+
+
+def cleanup_broken_news(stdout=None, *, article_ids=None, imported_ids=None, dry_run=False, chunk_size=CHUNK_SIZE):
     """
     Удаляет все новости, которые считаются 'битыми':
     - slug пустой или слишком короткий
     - пустой или слишком короткий content/summary
+    Если передан article_ids и/или imported_ids — проверяются только эти строки
+    (модель без переданного списка в инкрементальном режиме не трогается).
+    Возвращает список (kind, slug) найденных битых записей.
     """
     broken = []
+    incremental = article_ids is not None or imported_ids is not None
 
     # Авторские статьи
-    for a in Article.objects.all():
-        if not a.slug or len(a.slug) < 3 or not a.content or len(a.content.strip()) < 50:
-            broken.append(("article", a.slug))
-            a.delete()
+    if not incremental or article_ids is not None:
+        _purge(Article, "content", "article", article_ids, dry_run, chunk_size, broken)
 
     # Импортированные RSS
-    for n in ImportedNews.objects.all():
-        if not n.slug or len(n.slug) < 3 or not n.summary or len(n.summary.strip()) < 50:
-            broken.append(("rss", n.slug))
-            n.delete()
+    if not incremental or imported_ids is not None:
+        _purge(ImportedNews, "summary", "rss", imported_ids, dry_run, chunk_size, broken)
 
     if stdout:
         if not broken:
             stdout.write("✓ Битых новостей не найдено")
+        elif dry_run:
+            by_kind = {}
+            for kind, _ in broken:
+                by_kind[kind] = by_kind.get(kind, 0) + 1
+            stdout.write(
+                f"DRY-RUN: найдено {len(broken)} битых новостей ("
+                + ", ".join(f"{k}: {v}" for k, v in sorted(by_kind.items()))
+                + "), ничего не удалено"
+            )
+            for kind, slug in broken[:REPORT_SAMPLE]:
+                stdout.write(f"  • [{kind}] {slug or '<пустой slug>'}")
+            if len(broken) > REPORT_SAMPLE:
+                stdout.write(f"  … и ещё {len(broken) - REPORT_SAMPLE}")
         else:
             stdout.write(f"✖ Удалено {len(broken)} битых новостей")
 
@@ -0,0 +1,169 @@
+# Путь: backend/news/utils/image_dedup.py
+# Назначение: Склейка одинаковых картинок под разными URL по перцептивному хэшу (dHash).
+# Как работает:
+#   • При первой загрузке оригинала (image_proxy.download_original) считаем dHash 64 бита: картинка 9×8 в градациях
+#     серого, бит = «левый пиксель ярче правого». Пережатие, ресайз и смена формата хэш почти не меняют.
+#   • Ищем CanonicalImage с расстоянием Хэмминга ≤ IMAGE_DEDUP_MAX_DISTANCE (0..3) и тем же соотношением сторон;
+#     кандидатов выбираем по 4 индексированным 16-битным частям хэша (при ≤ 3 отличиях хотя бы одна часть совпадёт).
+#   • URL привязывается к канонической картинке (ImageUrl). Файл-дубликат оригинала заменяется жёсткой ссылкой
+#     только при побайтном совпадении (равный sha256): «почти такие же» картинки (шаблонные карточки с разным
+#     текстом) dHash может не различить, и собственный файл URL должен остаться его собственным.
+#   • Дальше общее: варианты миниатюр (views_media), проверка image_guard, размеры/цвет/LQIP (image_meta).
+# Ошибки склейки никогда не ломают загрузку — только пишутся в лог.
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from PIL import Image, ImageOps
+
+log = logging.getLogger(__name__)
+
+HASH_W, HASH_H = 9, 8
+ASPECT_TOLERANCE = 0.02
+ORIENTATION_TAG = 0x0112
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def dhash(im: Image.Image) -> int:
+    small = im.convert("L").resize((HASH_W, HASH_H), Image.LANCZOS)
+    px = list(small.getdata())
+    value = 0
+    for row in range(HASH_H):
+        for col in range(HASH_W - 1):
+            left = px[row * HASH_W + col]
+            right = px[row * HASH_W + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+def bands(value: int) -> tuple[int, int, int, int]:
+    return tuple((value >> shift) & 0xFFFF for shift in (48, 32, 16, 0))
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _max_distance() -> int:
+    return max(0, min(3, int(getattr(settings, "IMAGE_DEDUP_MAX_DISTANCE", 3))))
+
+
+def find_canonical(value: int, width: int, height: int):
+    """Ближайшая CanonicalImage с похожим хэшем и тем же соотношением сторон (или None)."""
+    from news.models import CanonicalImage
+
+    b = bands(value)
+    cond = Q(dhash=f"{value:016x}")
+    if _max_distance():
+        cond |= Q(band0=b[0]) | Q(band1=b[1]) | Q(band2=b[2]) | Q(band3=b[3])
+    aspect = width / height if height else 0
+    best, best_d = None, _max_distance() + 1
+    # частые части хэша (0x0000 у однотонных картинок) дают много кандидатов: сначала точное совпадение хэша,
+    # потом — у кого совпало больше частей (они ближе по Хэммингу), иначе нужная могла не попасть в первые 50
+    rank = Case(When(dhash=f"{value:016x}", then=Value(8)), default=Value(0), output_field=IntegerField())
+    for i, band in enumerate(b):
+        rank = rank + Case(When(**{f"band{i}": band}, then=Value(1)), default=Value(0), output_field=IntegerField())
+    candidates = (
+        CanonicalImage.objects.filter(cond)
+        .annotate(rank=rank)
+        .order_by("-rank", "id")
+        .only("id", "dhash", "width", "height", "original")[:50]
+    )
+    for cand in candidates:
+        if not cand.height or abs(cand.width / cand.height - aspect) > ASPECT_TOLERANCE:
+            continue
+        d = hamming(value, int(cand.dhash, 16))
+        if d < best_d:
+            best, best_d = cand, d
+    return best
+
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _relink(path: str, target: str) -> None:
+    """
+    Заменяет файл path жёсткой ссылкой на target (экономия места на дубликатах оригиналов) — только если
+    байты совпадают: близкий dHash ещё не значит ту же картинку, чужой файл под этим URL показал бы не то.
+    """
+    if not target or os.path.splitext(path)[1] != os.path.splitext(target)[1]:
+        return  # другой формат — расширение файла должно совпадать с содержимым
+    if not os.path.isfile(target) or os.path.samefile(path, target):
+        return
+    if os.path.getsize(path) != os.path.getsize(target) or _file_sha256(path) != _file_sha256(target):
+        return
+    tmp = os.path.join(os.path.dirname(path), f".tmp-link-{os.getpid()}-{os.path.basename(path)}")
+    try:
+        os.link(target, tmp)
+        os.replace(tmp, path)
+    except OSError:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def register_original(url: str, path: str):
+    """
+    Привязывает URL к канонической картинке (создаёт новую, если похожей нет). Возвращает CanonicalImage или None.
+    Вызывается один раз на URL — при первой загрузке оригинала.
+    """
+    from news.models import CanonicalImage, ImageUrl
+
+    if not getattr(settings, "IMAGE_DEDUP_ENABLED", True):
+        return None
+    try:
+        existing = ImageUrl.objects.select_related("canonical").filter(url_hash=url_hash(url)).first()
+        if existing:
+            return existing.canonical
+        with Image.open(path) as im:
+            width, height = im.size  # как в image_meta.compute_meta: с учётом EXIF-поворота
+            if im.getexif().get(ORIENTATION_TAG) in (5, 6, 7, 8):
+                width, height = height, width
+            if im.format == "JPEG":
+                im.draft("L", (HASH_W * 8, HASH_H * 8))
+            value = dhash(ImageOps.exif_transpose(im))
+
+        canonical = find_canonical(value, width, height)
+        if canonical is None:
+            b = bands(value)
+            canonical = CanonicalImage.objects.create(
+                dhash=f"{value:016x}", band0=b[0], band1=b[1], band2=b[2], band3=b[3],
+                width=width, height=height, original=path,
+            )
+        else:
+            _relink(path, canonical.original)
+        try:
+            with transaction.atomic():
+                ImageUrl.objects.create(url_hash=url_hash(url), url=url, canonical=canonical)
+        except IntegrityError:  # тот же URL параллельно зарегистрировал другой процесс
+            pass
+        return canonical
+    except Exception as e:
+        log.warning("image_dedup: %s: %s", url[:200], e)
+        return None
+
+
+def canonical_for_url(url: str):
+    from news.models import ImageUrl
+
+    link = ImageUrl.objects.select_related("canonical").filter(url_hash=url_hash(url)).first()
+    return link.canonical if link else None
+
+
+def canonical_id_for_url(url: str) -> int | None:
+    from news.models import ImageUrl
+
+    return ImageUrl.objects.filter(url_hash=url_hash(url)).values_list("canonical_id", flat=True).first()
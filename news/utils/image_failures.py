@@ -0,0 +1,182 @@
+# Путь: backend/news/utils/image_failures.py
+# Назначение: Общий «негативный» кэш битых картинок и счётчик отказов по хостам.
+# Зачем: картинка, которая отдала 404 / HTML / таймаут, иначе заново качается (вместе с http↔https-переключением)
+#        при каждом показе ленты. Здесь URL запоминается как плохой с TTL по причине отказа, а хост, который
+#        подряд таймаутит или отдаёт 5xx, на время считается недоступным. Пользуются views_media (ресайзер)
+#        и image_tools.fetch_image. Хранилище — таблицы БД ImageFailure / ImageHostFailure (как ImageProbe):
+#        общие для всех воркеров gunicorn и узлов; CACHES по умолчанию — LocMem, у каждого процесса свой.
+#        Просроченные записи чистит thumbcache_gc (purge_expired), на чтение они и так не влияют.
+# Настройки:
+#   IMAGE_NEGATIVE_TTL = {"not_found": 86400, ...}  — переопределить TTL отдельных причин, сек
+#   IMAGE_HOST_FAIL_THRESHOLD = 20  — столько временных отказов за окно → хост считаем лежащим
+#   IMAGE_HOST_FAIL_WINDOW = 600    — окно счётчика, сек
+
+from __future__ import annotations
+
+import hashlib
+import socket
+from datetime import timedelta
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import F
+from django.utils import timezone
+from PIL import UnidentifiedImageError
+
+from .safe_dns import UnsafeHost
+
+DEFAULT_TTL = {
+    "not_found": 24 * 3600,    # 404/410 — картинку удалили, вернётся вряд ли
+    "forbidden": 6 * 3600,     # 401/403 — анти-хотлинк, иногда снимают
+    "http_error": 3600,        # прочие 4xx
+    "not_image": 12 * 3600,    # вместо картинки HTML-заглушка
+    "too_large": 24 * 3600,
+    "decode": 24 * 3600,       # Pillow не распознал файл
+    "unsafe": 24 * 3600,       # имя ведёт в приватную сеть (в т.ч. через редирект)
+    "server_error": 600,       # 5xx — временно
+    "timeout": 300,
+    "connection": 600,         # DNS/TCP/SSL
+    "other": 900,
+}
+# временные причины копятся в счётчике хоста; постоянные — только в записи конкретного URL
+TRANSIENT = {"server_error", "timeout", "connection"}
+
+
+class KnownBadImage(Exception):
+    """URL уже в негативном кэше (или его хост недоступен) — качать не пытаемся."""
+
+    def __init__(self, reason: str):
+        super().__init__(f"known bad image: {reason}")
+        self.reason = reason
+
+
+def _ttl(reason: str) -> int:
+    return int({**DEFAULT_TTL, **getattr(settings, "IMAGE_NEGATIVE_TTL", {})}.get(reason, DEFAULT_TTL["other"]))
+
+
+def _url_hash(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def _host(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+def _window() -> timedelta:
+    return timedelta(seconds=int(getattr(settings, "IMAGE_HOST_FAIL_WINDOW", 600)))
+
+
+def classify(exc: BaseException) -> str:
+    """Причина отказа по исключению requests / Pillow / image_proxy."""
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        code = exc.response.status_code
+        if code in (404, 410):
+            return "not_found"
+        if code in (401, 403):
+            return "forbidden"
+        return "server_error" if code >= 500 else "http_error"
+    if isinstance(exc, (requests.Timeout, socket.timeout, TimeoutError)):
+        return "timeout"
+    if isinstance(exc, (requests.ConnectionError, ConnectionError)):
+        return "connection"
+    if isinstance(exc, UnidentifiedImageError):
+        return "decode"
+    if isinstance(exc, UnsafeHost):
+        return "unsafe"
+    msg = str(exc).lower()
+    if "too large" in msg:
+        return "too_large"
+    if "content-type" in msg:
+        return "not_image"
+    return "other"
+
+
+def mark_bad(url: str, reason: str) -> None:
+    """Запоминает URL как плохой на TTL причины; временные отказы ещё и копятся в счётчике хоста."""
+    from news.models import ImageFailure, ImageHostFailure
+
+    now = timezone.now()
+    host = _host(url)
+    try:
+        ImageFailure.objects.update_or_create(
+            url_hash=_url_hash(url),
+            defaults={"url": url, "reason": reason, "expires_at": now + timedelta(seconds=_ttl(reason))},
+        )
+        if reason in TRANSIENT and host:
+            # атомарный +1 в текущем окне; окно истекло (или записи нет) — начинаем новое с единицы
+            if not ImageHostFailure.objects.filter(host=host, window_start__gt=now - _window()).update(
+                failures=F("failures") + 1
+            ):
+                ImageHostFailure.objects.update_or_create(host=host, defaults={"failures": 1, "window_start": now})
+    except DatabaseError:
+        pass  # негативный кэш — вспомогательный: без него картинка просто скачается ещё раз
+
+
+def mark_ok(url: str) -> None:
+    """Успешная загрузка: хост снова считается живым."""
+    from news.models import ImageHostFailure
+
+    host = _host(url)
+    if host:
+        try:
+            ImageHostFailure.objects.filter(host=host).delete()
+        except DatabaseError:
+            pass
+
+
+def host_failures(url_or_host: str) -> int:
+    from news.models import ImageHostFailure
+
+    host = _host(url_or_host if "//" in url_or_host else f"//{url_or_host}")
+    if not host:
+        return 0
+    return (
+        ImageHostFailure.objects.filter(host=host, window_start__gt=timezone.now() - _window())
+        .values_list("failures", flat=True)
+        .first()
+        or 0
+    )
+
+
+def get_bad(url: str) -> str | None:
+    """Причина, по которой URL сейчас не стоит качать, или None."""
+    from news.models import ImageFailure
+
+    try:
+        reason = (
+            ImageFailure.objects.filter(url_hash=_url_hash(url), expires_at__gt=timezone.now())
+            .values_list("reason", flat=True)
+            .first()
+        )
+        if reason:
+            return reason
+        if host_failures(url) >= int(getattr(settings, "IMAGE_HOST_FAIL_THRESHOLD", 20)):
+            return "host_down"
+    except DatabaseError:
+        pass
+    return None
+
+
+def check(url: str) -> None:
+    """KnownBadImage, если URL в негативном кэше или его хост недоступен."""
+    reason = get_bad(url)
+    if reason:
+        raise KnownBadImage(reason)
+
+
+def forget(url: str) -> None:
+    from news.models import ImageFailure
+
+    ImageFailure.objects.filter(url_hash=_url_hash(url)).delete()
+
+
+def purge_expired() -> dict:
+    """Удаляет истёкшие записи негативного кэша и счётчики хостов с закрытым окном."""
+    from news.models import ImageFailure, ImageHostFailure
+
+    now = timezone.now()
+    urls, _ = ImageFailure.objects.filter(expires_at__lte=now).delete()
+    hosts, _ = ImageHostFailure.objects.filter(window_start__lte=now - _window()).delete()
+    return {"urls": urls, "hosts": hosts}
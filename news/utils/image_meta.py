@@ -0,0 +1,112 @@
+# Путь: backend/news/utils/image_meta.py
+# Назначение: Метаданные картинки новости/статьи для фронтенда: ширина, высота, доминирующий цвет и LQIP
+#             (крошечное WebP-превью data:URI ~16px). Карточка сразу резервирует место (width/height),
+#             красит фон (image_color) и показывает размытое превью (image_lqip), а настоящую миниатюру
+#             можно грузить лениво — только для карточек в зоне видимости.
+# Считается один раз на картинку в фоне (задача news.image_meta, ставится сигналом post_save из news/signals.py);
+# image_meta_key = sha1(src) помнит, для какой картинки посчитано — при смене картинки пересчёт.
+# Для картинки, склеенной с канонической (utils/image_dedup.py), метаданные считаются один раз на все её URL.
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+
+from PIL import Image, ImageOps
+
+from .image_dedup import canonical_for_url
+from .thumb_urls import thumbnail_sources
+
+LQIP_SIZE = 16      # px по большей стороне
+LQIP_QUALITY = 40
+COLOR_SAMPLE = 64   # px: доминирующий цвет считаем по уменьшенной копии
+ORIENTATION_TAG = 0x0112
+
+
+def meta_key(src: str) -> str:
+    return hashlib.sha1(src.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def current_source(obj) -> str | None:
+    sources = thumbnail_sources(obj)
+    return sources[0] if sources else None
+
+
+def needs_update(obj) -> bool:
+    """Картинка сменилась (или метаданные ещё не считались / картинку убрали)."""
+    src = current_source(obj)
+    return (meta_key(src) if src else "") != (getattr(obj, "image_meta_key", "") or "")
+
+
+def _dominant_color(im: Image.Image) -> str:
+    small = im.copy()
+    small.thumbnail((COLOR_SAMPLE, COLOR_SAMPLE))
+    pal = small.quantize(colors=6, method=Image.Quantize.FASTOCTREE)
+    count, index = max(pal.getcolors())
+    r, g, b = pal.getpalette()[index * 3: index * 3 + 3]
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def compute_meta(path: str) -> dict:
+    """width/height (с учётом EXIF-поворота), color (#rrggbb) и lqip (data:image/webp;base64,...) для файла."""
+    with Image.open(path) as im:
+        width, height = im.size
+        try:
+            if im.getexif().get(ORIENTATION_TAG) in (5, 6, 7, 8):
+                width, height = height, width
+        except Exception:
+            pass
+        if im.format == "JPEG":
+            im.draft("RGB", (COLOR_SAMPLE * 2, COLOR_SAMPLE * 2))  # размеры уже запомнили — декодируем уменьшенно
+        im = ImageOps.exif_transpose(im)
+        if im.mode in ("RGBA", "LA", "P"):
+            rgba = im.convert("RGBA")
+            rgb = Image.new("RGB", rgba.size, (255, 255, 255))
+            rgb.paste(rgba, mask=rgba.split()[-1])
+        else:
+            rgb = im.convert("RGB")
+
+    tiny = rgb.copy()
+    tiny.thumbnail((LQIP_SIZE, LQIP_SIZE), Image.LANCZOS)
+    buf = io.BytesIO()
+    tiny.save(buf, "WEBP", quality=LQIP_QUALITY, method=6)
+    return {
+        "image_width": width,
+        "image_height": height,
+        "image_color": _dominant_color(rgb),
+        "image_lqip": "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii"),
+    }
+
+
+def _shared_meta(src: str, resolve_path) -> dict:
+    """Метаданные src: готовые у канонической картинки или посчитанные (и сохранённые ей для остальных URL)."""
+    path = resolve_path(src)  # заодно регистрирует новый URL в image_dedup
+    canonical = canonical_for_url(src) if src.startswith(("http://", "https://")) else None
+    if canonical is not None and canonical.lqip:
+        return {
+            "image_width": canonical.width,
+            "image_height": canonical.height,
+            "image_color": canonical.color,
+            "image_lqip": canonical.lqip,
+        }
+    meta = compute_meta(path)
+    if canonical is not None:
+        type(canonical).objects.filter(pk=canonical.pk).update(color=meta["image_color"], lqip=meta["image_lqip"])
+    return meta
+
+
+def update_image_meta(obj, resolve_path) -> dict | None:
+    """
+    Пересчитывает и сохраняет метаданные obj (только поля image_*).
+    resolve_path(src) -> локальный путь к оригиналу (views_media._source_path: кэш оригиналов, SSRF, негативный кэш).
+    """
+    src = current_source(obj)
+    if src:
+        values = {**_shared_meta(src, resolve_path), "image_meta_key": meta_key(src)}
+    else:
+        values = {"image_width": None, "image_height": None, "image_color": "", "image_lqip": "", "image_meta_key": ""}
+    type(obj).objects.filter(pk=obj.pk).update(**values)  # без save(): не трогаем сигналы и остальные поля
+    for name, value in values.items():
+        setattr(obj, name, value)
+    return values
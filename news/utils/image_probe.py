@@ -0,0 +1,251 @@
+# Путь: backend/news/utils/image_probe.py
+# Назначение: Массовая проверка картинок по URL с сохранением результатов в таблицу ImageProbe.
+# Как работает:
+#   • asyncio распределяет проверки: общий лимит параллельности + отдельный лимит на хост (не «кладём» один CDN
+#     и не попадаем под его rate limit). Сам HTTP — общая requests.Session с keep-alive в пуле потоков цикла.
+#   • Один GET c Range: bytes=0-65535 вместо HEAD + GET: ответ 206 дочитывается целиком (соединение остаётся
+#     живым для следующего URL того же хоста), а по первым байтам Pillow узнаёт размеры картинки.
+#   • «Не картинка» (not-image) — только если и Content-Type не image/* и не «безликий» (octet-stream, пусто),
+#     и Pillow не узнал картинку по первым байтам: clean_broken_images по такому статусу очищает поле.
+#   • Результат (ok, статус, HTTP-код, размеры, checked_at) пишется в ImageProbe по sha1(URL) пачками по ходу
+#     проверки — прерванный прогон не теряет сделанное. Повторный прогон проверяет только новые URL и те,
+#     что проверялись раньше stale_before.
+# Пользуются: manage.py probe_images (отчёт по категориям) и manage.py clean_broken_images (зачистка).
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import unquote, urlparse
+
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from PIL import Image, ImageFile
+from requests.adapters import HTTPAdapter
+
+PROBE_BYTES = 65536   # байт на URL: размеры картинки почти всегда в первых нескольких КБ
+SAVE_BATCH = 200
+DEFAULT_CONCURRENCY = 32
+DEFAULT_PER_HOST = 4
+DEFAULT_TIMEOUT = (3.0, 5.0)
+USER_AGENT = "IzotovLife-Probe/2.0 (+https://izotovlife.ru)"
+# Content-Type, по которому нельзя судить о содержимом (S3/CDN часто отдают картинки так)
+GENERIC_TYPES = ("", "application/octet-stream", "binary/octet-stream", "application/binary")
+
+
+@dataclass
+class ProbeResult:
+    url: str
+    ok: bool
+    status: str
+    http_status: int | None = None
+    content_type: str = ""
+    width: int | None = None
+    height: int | None = None
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def _flip_scheme(url: str) -> str | None:
+    if url.startswith("http://"):
+        return "https://" + url[len("http://"):]
+    if url.startswith("https://"):
+        return "http://" + url[len("https://"):]
+    return None
+
+
+def _headers(url: str) -> dict:
+    u = urlparse(url)
+    h = {"User-Agent": USER_AGENT, "Range": f"bytes=0-{PROBE_BYTES - 1}"}
+    if u.scheme and u.netloc:
+        h["Referer"] = f"{u.scheme}://{u.netloc}/"
+    return h
+
+
+def make_session(per_host: int = DEFAULT_PER_HOST, hosts: int = 256) -> requests.Session:
+    """Сессия с пулом keep-alive соединений: per_host соединений на хост, до hosts хостов одновременно."""
+    sess = requests.Session()
+    adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=per_host)
+    sess.mount("http://", adapter)
+    sess.mount("https://", adapter)
+    return sess
+
+
+def _probe_local(url: str) -> ProbeResult:
+    """/media/... — проверяем файл на диске, а не ходим HTTP-запросом к самому себе."""
+    media_url = getattr(settings, "MEDIA_URL", "/media/") or "/media/"
+    if not url.startswith(media_url):
+        return ProbeResult(url, False, "relative-url")
+    path = os.path.join(str(settings.MEDIA_ROOT), unquote(url[len(media_url):]).lstrip("/"))
+    if not os.path.isfile(path):
+        return ProbeResult(url, False, "missing-local")
+    try:
+        with Image.open(path) as im:
+            return ProbeResult(url, True, "ok-local", width=im.size[0], height=im.size[1])
+    except Exception:
+        return ProbeResult(url, False, "decode-local")
+
+
+def _get(session: requests.Session, url: str, timeout) -> ProbeResult:
+    with session.get(url, stream=True, timeout=timeout, headers=_headers(url), allow_redirects=True) as r:
+        ct = (r.headers.get("Content-Type") or "").lower().split(";")[0].strip()
+        if r.status_code not in (200, 206):
+            return ProbeResult(url, False, f"http-{r.status_code}", r.status_code, ct)
+        parser = ImageFile.Parser()
+        read = 0
+        try:
+            for chunk in r.iter_content(8192):
+                read += len(chunk)
+                if parser.image is None:
+                    parser.feed(chunk)
+                # 206: дочитываем (до PROBE_BYTES) — соединение вернётся в пул; 200: хватит размеров
+                if (parser.image is not None and r.status_code == 200) or read >= PROBE_BYTES:
+                    break
+        except Exception:
+            pass  # заголовок не распознан — размеры неизвестны
+        if parser.image is not None:
+            # картинка по содержимому — даже если S3/CDN отдаёт её как application/octet-stream
+            status = "ok-get" if ct.startswith("image/") else "ok-sniffed"
+            return ProbeResult(url, True, status, r.status_code, ct, *parser.image.size)
+        if ct.startswith("image/") or ct in GENERIC_TYPES:
+            # формат, которого Pillow не знает (SVG, ...), или тип не указан — живым считаем, как раньше
+            return ProbeResult(url, True, "ok-get", r.status_code, ct)
+        return ProbeResult(url, False, "not-image", r.status_code, ct)  # text/html и т.п., и байты не картинка
+
+
+def probe_url(session: requests.Session, url: str, timeout=DEFAULT_TIMEOUT) -> ProbeResult:
+    """Проверка одного URL (блокирующая). Исключения наружу не бросает."""
+    url = (url or "").strip()
+    if not url:
+        return ProbeResult(url, False, "empty-url")
+    if url.startswith("data:"):
+        return ProbeResult(url, False, "data-uri")
+    if url.startswith("/") and not url.startswith("//"):
+        return _probe_local(url)
+    if url.startswith("//"):
+        url = "https:" + url
+
+    try:
+        res = _get(session, url, timeout)
+    except Exception as e:
+        res = ProbeResult(url, False, f"err-{type(e).__name__}")
+    if res.ok:
+        return res
+
+    alt = _flip_scheme(url)
+    if alt:
+        try:
+            alt_res = _get(session, alt, timeout)
+        except Exception as e:
+            return ProbeResult(url, False, f"{res.status}/alt-err-{type(e).__name__}", res.http_status, res.content_type)
+        if alt_res.ok:
+            alt_res.url, alt_res.status = url, "ok-alt-scheme"
+            return alt_res
+    return res
+
+
+def _save(results: list[ProbeResult]) -> None:
+    from news.models import ImageProbe
+
+    now = timezone.now()
+    rows = [
+        ImageProbe(
+            url_hash=url_hash(r.url), url=r.url, ok=r.ok, status=r.status[:64], http_status=r.http_status,
+            content_type=r.content_type[:100], width=r.width, height=r.height, checked_at=now,
+        )
+        for r in results
+    ]
+    ImageProbe.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=["url_hash"],
+        update_fields=["url", "ok", "status", "http_status", "content_type", "width", "height", "checked_at"],
+    )
+
+
+def stored(urls) -> dict:
+    """
+    {url: ImageProbe} для уже проверенных URL. Записи not-image с «безликим» Content-Type сделаны по прежнему
+    правилу (без проверки байтов) — их нет в ответе: probe_many проверит такие URL заново.
+    """
+    from news.models import ImageProbe
+
+    by_hash = {url_hash(u): u for u in urls}
+    out = {}
+    hashes = list(by_hash)
+    for i in range(0, len(hashes), 500):
+        for p in ImageProbe.objects.filter(url_hash__in=hashes[i:i + 500]):
+            if p.status == "not-image" and p.content_type in GENERIC_TYPES:
+                continue
+            out[by_hash[p.url_hash]] = p
+    return out
+
+
+async def _probe_all(urls, *, concurrency, per_host, timeout, progress):
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="probe")
+    session = make_session(per_host)
+    total_sem = asyncio.Semaphore(concurrency)
+    host_sems = defaultdict(lambda: asyncio.Semaphore(per_host))
+    save = sync_to_async(_save)
+    pending: list[ProbeResult] = []
+    done = 0
+
+    async def one(url):
+        nonlocal done
+        # сначала слот хоста, потом общий: ожидающий занятый хост не держит общий слот
+        async with host_sems[(urlparse(url).hostname or "").lower()], total_sem:
+            res = await loop.run_in_executor(executor, probe_url, session, url, timeout)
+        res.url = url  # ключ — исходное значение поля (//host/... проверяется как https://host/...)
+        pending.append(res)
+        done += 1
+        if progress:
+            progress(done, len(urls))
+        if len(pending) >= SAVE_BATCH:
+            batch = pending[:]
+            pending.clear()
+            await save(batch)
+
+    try:
+        await asyncio.gather(*(one(u) for u in urls))
+    finally:
+        if pending:
+            await save(pending)
+        executor.shutdown(wait=False, cancel_futures=True)
+        session.close()
+
+
+def probe_many(urls, *, stale_before=None, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+               timeout=DEFAULT_TIMEOUT, progress=None) -> tuple[dict, int]:
+    """
+    Результаты для всех urls: свежие — из ImageProbe, новые и устаревшие (checked_at < stale_before;
+    stale_before=None — проверить все) — проверяются по сети и сохраняются.
+    Возвращает ({url: ImageProbe}, число проверенных по сети).
+    """
+    urls = list(dict.fromkeys(u for u in urls if u))
+    known = stored(urls)
+    todo = [u for u in urls if u not in known or stale_before is None or known[u].checked_at < stale_before]
+    if todo:
+        try:
+            asyncio.run(_probe_all(todo, concurrency=max(1, concurrency), per_host=max(1, per_host),
+                                   timeout=timeout, progress=progress))
+        finally:
+            known.update(stored(todo))  # в т.ч. частичный результат после Ctrl+C
+    return known, len(todo)
+
+
+def log_progress(step: int, write):
+    """progress-колбэк для probe_many: строка в лог каждые step URL и в конце."""
+    start = time.time()
+
+    def progress(done, total):
+        if done % step == 0 or done == total:
+            write(f"  • проверено {done}/{total} URL  ({time.time() - start:.1f}s)")
+    return progress
@@ -6,7 +6,7 @@
 #   - make_placeholder(): генерирует плейсхолдер (Pillow) с текстом (например, название категории/новости)
 #   - encode_image(): кодирует в WEBP/JPEG/PNG
 #   - get_thumbnail_bytes(): единая точка — вернуть байты готового превью или плейсхолдера
-#   - простое кэширование “плохих” урлов через Django cache, чтобы не ддосить источники
+#   - “плохие” урлы запоминаются в общем негативном кэше (news/utils/image_failures.py), чтобы не ддосить источники
 
 import io
 import math
@@ -14,11 +14,10 @@ from typing import Optional, Tuple
 
 import requests
 from PIL import Image, ImageDraw, ImageFont
-from django.core.cache import cache
+from news.utils import image_failures
 
 SAFE_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif"}
 UA = "IzotovLifeThumbnailer/1.0 (+https://izotovlife.ru)"
-BAD_CACHE_TTL = 6 * 60 * 60        # 6 часов
 OK_CACHE_TTL = 60 * 60             # 1 час
 DEFAULT_BG = (10, 15, 26)          # темно-синий фон под плейсхолдер
 DEFAULT_FG = (230, 235, 245)
@@ -27,9 +26,7 @@ def fetch_image(url: str, timeout: float = 4.0) -> Image.Image:
     """
     Скачивает изображение по URL, валидирует заголовки. Исключение -> считаем “плохим” урлом.
     """
-    bad_key = f"img_bad:{url}"
-    if cache.get(bad_key):
-        raise ValueError("cached bad image")
+    image_failures.check(url)  # KnownBadImage — URL недавно уже не отдал картинку
 
     try:
         resp = requests.get(
@@ -50,8 +47,8 @@ def fetch_image(url: str, timeout: float = 4.0) -> Image.Image:
             img = img.convert("RGB")
         return img
 
-    except Exception:
-        cache.set(bad_key, True, BAD_CACHE_TTL)
+    except Exception as e:
+        image_failures.mark_bad(url, image_failures.classify(e))
         raise
 
 
@@ -0,0 +1,333 @@
+# Путь: backend/news/utils/maintenance.py
+# Назначение: Общий движок для «обслуживающих» management-команд (чистка новостей, пересчёт slug, починка картинок).
+# Что умеет:
+#   • Keyset-обход таблицы пачками по pk (pk > last ORDER BY pk LIMIT chunk) через iterator(chunk_size) —
+#     память ограничена одной пачкой, без OFFSET и без .all() на всю таблицу.
+#   • Запись пачкой: bulk_update(update_fields) или удаление filter(pk__in=...).delete() — одна транзакция на пачку.
+#   • Чекпойнт (границы диапазона воркера + последний обработанный pk) в JSON-файле → --resume продолжает
+#     после прерывания по тем же диапазонам (после удалений Min/Max pk сдвигаются — заново их не делим).
+#   • Прогресс и ETA в stdout.
+#   • --workers N: диапазон pk делится на N частей, каждая обрабатывается своим потоком (со своим соединением с БД).
+#     Имеет смысл на PostgreSQL и для задач с сетевыми проверками; на SQLite оставляйте 1.
+# Как пользоваться (в команде):
+#   class SlugTask(MaintenanceTask): model = ...; update_fields = ("slug",); def process(self, obj): ...
+#   add_maintenance_arguments(parser)
+#   stats = runner_from_options(SlugTask(), options, self.stdout).run()
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Min
+
+from news.slug_utils import SlugAllocator
+
+DEFAULT_CHUNK_SIZE = 1000
+PROGRESS_EVERY_S = 2.0
+
+
+def _checkpoint_dir() -> str:
+    return getattr(
+        settings, "MAINTENANCE_CHECKPOINT_DIR", os.path.join(settings.BASE_DIR, ".maintenance")
+    )
+
+
+@dataclass
+class MaintenanceStats:
+    processed: int = 0
+    changed: int = 0
+    errors: int = 0
+
+
+class MaintenanceTask:
+    """
+    Одна «проходка» по одной модели.
+    process(obj) меняет объект и возвращает True, если его надо записать (или удалить при delete=True).
+    """
+
+    name = ""                 # ключ чекпойнта, например "fix_slugs.article"
+    model = None
+    update_fields: tuple = ()
+    only_fields: tuple | None = None
+    select_related: tuple = ()
+    prefetch_related: tuple = ()
+    delete = False
+
+    def get_queryset(self):
+        qs = self.model._default_manager.all()
+        if self.select_related:
+            qs = qs.select_related(*self.select_related)
+        if self.prefetch_related:
+            qs = qs.prefetch_related(*self.prefetch_related)
+        if self.only_fields:
+            qs = qs.only(*self.only_fields)
+        return qs
+
+    def prepare_chunk(self, objs) -> None:
+        """Хук перед обработкой пачки (например, пакетная проверка уникальности slug)."""
+
+    def process(self, obj) -> bool:
+        raise NotImplementedError
+
+    def after_write(self, objs) -> None:
+        """Хук после записи пачки в БД (в dry-run не вызывается)."""
+
+
+class MaintenanceRunner:
+    def __init__(self, task: MaintenanceTask, *, chunk_size: int = DEFAULT_CHUNK_SIZE, dry_run: bool = False,
+                 resume: bool = False, workers: int = 1, stdout=None):
+        self.task = task
+        self.chunk_size = max(1, int(chunk_size))
+        self.dry_run = dry_run
+        self.resume = resume
+        self.workers = max(1, int(workers))
+        self.stdout = stdout
+        self.stats = MaintenanceStats()
+        self._lock = threading.Lock()
+        self._total = 0
+        self._started = 0.0
+        self._last_report = 0.0
+        self._reported_done = 0
+
+    # ---------- чекпойнты ----------
+
+    def _checkpoint_path(self, idx: int) -> str:
+        name = self.task.name or f"{self.task.model._meta.label_lower}"
+        return os.path.join(_checkpoint_dir(), f"{name}.w{idx}of{self.workers}.json")
+
+    def _load_checkpoint(self, idx: int):
+        if not self.resume:
+            return None
+        try:
+            with open(self._checkpoint_path(idx), encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
+
+    def _save_checkpoint(self, idx: int, lo, hi, last_pk) -> None:
+        if self.dry_run:
+            return
+        path = self._checkpoint_path(idx)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"lo": lo, "hi": hi, "last_pk": last_pk, "saved_at": time.time()}, f)
+        os.replace(tmp, path)
+
+    def _clear_checkpoint(self, idx: int) -> None:
+        try:
+            os.remove(self._checkpoint_path(idx))
+        except OSError:
+            pass
+
+    # ---------- прогресс ----------
+
+    def _write(self, msg: str) -> None:
+        if self.stdout:
+            self.stdout.write(msg)
+
+    def _report(self, force: bool = False) -> None:
+        now = time.monotonic()
+        done = self.stats.processed
+        if done == self._reported_done or (not force and now - self._last_report < PROGRESS_EVERY_S):
+            return
+        self._last_report = now
+        self._reported_done = done
+        elapsed = max(now - self._started, 1e-6)
+        rate = done / elapsed
+        left = max(self._total - done, 0)
+        eta = time.strftime("%H:%M:%S", time.gmtime(left / rate)) if rate > 0 else "—"
+        pct = (done * 100 // self._total) if self._total else 100
+        self._write(
+            f"  [{self.task.name or self.task.model.__name__}] {done}/{self._total} ({pct}%), "
+            f"{'к удалению' if self.task.delete else 'изменено'} {self.stats.changed}, {rate:.0f} стр/с, ETA {eta}"
+        )
+
+    # ---------- обход ----------
+
+    def _ranges(self, qs):
+        bounds = qs.aggregate(lo=Min("pk"), hi=Max("pk"))
+        lo, hi = bounds["lo"], bounds["hi"]
+        if lo is None:
+            return []
+        if self.workers == 1 or not isinstance(lo, int):
+            return [(lo, hi)]
+        step = max(1, (hi - lo + 1) // self.workers)
+        ranges = []
+        start = lo
+        for i in range(self.workers):
+            end = hi if i == self.workers - 1 else min(hi, start + step - 1)
+            ranges.append((start, end))
+            start = end + 1
+            if start > hi:
+                break
+        return ranges
+
+    def _write_chunk(self, changed) -> None:
+        model = self.task.model
+        with transaction.atomic():
+            if self.task.delete:
+                model._default_manager.filter(pk__in=[o.pk for o in changed]).delete()
+            else:
+                model._default_manager.bulk_update(changed, list(self.task.update_fields), batch_size=self.chunk_size)
+
+    def _run_range(self, idx: int, lo, hi, start_after) -> None:
+        qs = self.task.get_queryset()
+        last_pk = start_after
+        try:
+            while True:
+                chunk_qs = qs.filter(pk__lte=hi).order_by("pk")
+                chunk_qs = chunk_qs.filter(pk__gt=last_pk) if last_pk is not None else chunk_qs.filter(pk__gte=lo)
+                objs = list(chunk_qs[: self.chunk_size].iterator(chunk_size=self.chunk_size))
+                if not objs:
+                    break
+
+                self.task.prepare_chunk(objs)
+                changed, errors = [], 0
+                for obj in objs:
+                    try:
+                        if self.task.process(obj):
+                            changed.append(obj)
+                    except Exception as e:
+                        errors += 1
+                        self._write(f"  ✖ {self.task.model.__name__} #{obj.pk}: {e}")
+
+                if changed and not self.dry_run:
+                    self._write_chunk(changed)
+                    self.task.after_write(changed)
+
+                last_pk = objs[-1].pk
+                self._save_checkpoint(idx, lo, hi, last_pk)
+                with self._lock:
+                    self.stats.processed += len(objs)
+                    self.stats.changed += len(changed)
+                    self.stats.errors += errors
+                    self._report()
+        finally:
+            if self.workers > 1:
+                connection.close()
+
+    def _plan(self, qs):
+        """
+        [(idx, lo, hi, start_after)]. При --resume берём границы из чекпойнтов: last_pk воркера
+        имеет смысл только в том диапазоне, по которому он шёл.
+        """
+        saved = [self._load_checkpoint(idx) for idx in range(self.workers)]
+        if any(cp and "lo" in cp and "hi" in cp for cp in saved):
+            return [
+                (idx, cp["lo"], cp["hi"], cp.get("last_pk"))
+                for idx, cp in enumerate(saved)
+                if cp and "lo" in cp and "hi" in cp
+            ]
+        # старый формат чекпойнта (только last_pk) — диапазоны считаем заново
+        return [
+            (idx, lo, hi, (saved[idx] or {}).get("last_pk"))
+            for idx, (lo, hi) in enumerate(self._ranges(qs))
+        ]
+
+    def run(self) -> MaintenanceStats:
+        qs = self.task.get_queryset()
+        plan = self._plan(qs)
+        for idx, lo, hi, start_after in plan:
+            remaining = qs.filter(pk__gte=lo, pk__lte=hi)
+            if start_after is not None:
+                remaining = remaining.filter(pk__gt=start_after)
+            self._total += remaining.count()
+            # границы фиксируем сразу — даже у воркера, который не успеет обработать ни одной пачки
+            self._save_checkpoint(idx, lo, hi, start_after)
+
+        if self.resume and any(p[3] is not None for p in plan):
+            self._write(f"  ↻ Продолжаем с чекпойнта ({self.task.name})")
+
+        self._started = time.monotonic()
+        if self.workers == 1 or len(plan) <= 1:
+            for args in plan:
+                self._run_range(*args)
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for fut in [pool.submit(self._run_range, *args) for args in plan]:
+                    fut.result()
+
+        self._report(force=True)
+        if not self.dry_run:
+            for idx, *_ in plan:
+                self._clear_checkpoint(idx)
+        return self.stats
+
+
+def add_maintenance_arguments(parser, *, dry_run: bool = False) -> None:
+    """Общие ключи для команд на движке обслуживания."""
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Размер пачки (строк).")
+    parser.add_argument("--workers", type=int, default=1, help="Параллельные потоки по диапазонам pk.")
+    parser.add_argument("--resume", action="store_true", help="Продолжить с последнего чекпойнта.")
+    if dry_run:
+        parser.add_argument("--dry-run", action="store_true", help="Ничего не записывать, только посчитать.")
+
+
+def runner_from_options(task: MaintenanceTask, options: dict, stdout=None, *, dry_run=None) -> MaintenanceRunner:
+    return MaintenanceRunner(
+        task,
+        chunk_size=options.get("chunk_size") or DEFAULT_CHUNK_SIZE,
+        dry_run=options.get("dry_run", False) if dry_run is None else dry_run,
+        resume=options.get("resume", False),
+        workers=options.get("workers") or 1,
+        stdout=stdout,
+    )
+
+
+class SlugTask(MaintenanceTask):
+    """
+    Пересчёт slug: base_slug(obj) даёт желаемый slug (или None — запись не трогаем),
+    уникальность обеспечивается пакетно через SlugAllocator, запись — bulk_update.
+    """
+
+    slug_field = "slug"
+    suffix_start = 1
+    label = ""
+
+    def __init__(self, stdout=None):
+        self.stdout = stdout
+        self.update_fields = (self.slug_field,)
+        self.allocator = SlugAllocator(self.model, self.slug_field, start=self.suffix_start)
+
+    def base_slug(self, obj):
+        raise NotImplementedError
+
+    def format_change(self, obj, old, new) -> str:
+        return f"[{self.label or self.model.__name__.upper()}] {old} → {new}"
+
+    def prepare_chunk(self, objs) -> None:
+        items = []
+        for obj in objs:
+            base = self.base_slug(obj)
+            if base:
+                items.append((obj.pk, base))
+        planned = self.allocator.allocate_many(items)
+        unchanged = []
+        for obj in objs:
+            obj._planned_slug = planned.get(obj.pk)
+            if obj._planned_slug and obj._planned_slug == getattr(obj, self.slug_field):
+                unchanged.append(obj._planned_slug)
+        # slug, который уже лежит в БД у этой же записи, резервировать незачем
+        self.allocator.release(unchanged)
+
+    def process(self, obj) -> bool:
+        new = getattr(obj, "_planned_slug", None)
+        old = getattr(obj, self.slug_field)
+        if not new or new == old:
+            return False
+        if self.stdout:
+            self.stdout.write(self.format_change(obj, old, new))
+        setattr(obj, self.slug_field, new)
+        return True
+
+    def after_write(self, objs) -> None:
+        self.allocator.release(getattr(o, self.slug_field) for o in objs)
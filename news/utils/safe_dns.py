@@ -0,0 +1,147 @@
+# Путь: backend/news/utils/safe_dns.py
+# Назначение: SSRF-проверка адресов с кэшем DNS и «прибитые» соединения для загрузки картинок.
+# Зачем: раньше _is_safe_url делал getaddrinfo, потом requests резолвил имя ещё раз — два DNS-запроса на промах
+#        и окно для DNS rebinding (проверили публичный IP, а подключились уже к 127.0.0.1).
+#        Теперь имя резолвится один раз (кэш на THUMB_DNS_TTL сек в процессе), а PinnedAdapter подключается
+#        ровно к проверенному IP. SNI, проверка сертификата и заголовок Host остаются по исходному имени.
+#        Проверяется и каждый редирект: новое соединение тоже идёт через vetted_ips().
+# Настройки:
+#   THUMB_DNS_TTL = 300            — сколько помнить успешный ответ DNS, сек
+#   THUMB_DNS_NEGATIVE_TTL = 30    — сколько помнить NXDOMAIN/ошибку резолва
+#   THUMB_DNS_PIN = True           — подключаться к проверенному IP (False — только проверка, как раньше)
+
+from __future__ import annotations
+
+import ipaddress
+import socket
+import threading
+import time
+
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+
+# Простейшая защита от SSRF: запрещаем приватные/loopback/link-local адреса
+PRIVATE_NETS = [
+    ipaddress.ip_network("0.0.0.0/8"),
+    ipaddress.ip_network("127.0.0.0/8"),
+    ipaddress.ip_network("10.0.0.0/8"),
+    ipaddress.ip_network("172.16.0.0/12"),
+    ipaddress.ip_network("192.168.0.0/16"),
+    ipaddress.ip_network("169.254.0.0/16"),  # link-local, в т.ч. метаданные облака 169.254.169.254
+    ipaddress.ip_network("::1/128"),
+    ipaddress.ip_network("fc00::/7"),
+    ipaddress.ip_network("fe80::/10"),
+]
+
+_cache: dict[str, tuple[float, tuple[str, ...] | None]] = {}
+_lock = threading.Lock()
+
+
+class UnsafeHost(ValueError):
+    """Имя не резолвится или ведёт в приватную сеть."""
+
+
+def is_public_ip(ip: str) -> bool:
+    ip_obj = ipaddress.ip_address(ip)
+    if getattr(ip_obj, "ipv4_mapped", None):  # ::ffff:127.0.0.1
+        ip_obj = ip_obj.ipv4_mapped
+    return not any(ip_obj in n for n in PRIVATE_NETS)
+
+
+def resolve(host: str) -> tuple[str, ...]:
+    """IP-адреса host из кэша (или свежий getaddrinfo). UnsafeHost — если имя не резолвится."""
+    host = (host or "").strip("[]").rstrip(".").lower()
+    if not host:
+        raise UnsafeHost("empty host")
+    try:
+        return (str(ipaddress.ip_address(host)),)  # IP-литерал — резолвить нечего
+    except ValueError:
+        pass
+
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(host)
+    if hit and hit[0] > now:
+        if hit[1] is None:
+            raise UnsafeHost(f"cannot resolve {host}")
+        return hit[1]
+
+    try:
+        infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+        ips = tuple(dict.fromkeys(info[4][0] for info in infos))
+        ttl = float(getattr(settings, "THUMB_DNS_TTL", 300))
+    except OSError:
+        ips = None
+        ttl = float(getattr(settings, "THUMB_DNS_NEGATIVE_TTL", 30))
+    with _lock:
+        if len(_cache) > 10000:  # не даём кэшу расти бесконечно
+            _cache.clear()
+        _cache[host] = (now + ttl, ips)
+    if ips is None:
+        raise UnsafeHost(f"cannot resolve {host}")
+    return ips
+
+
+def vetted_ips(host: str) -> tuple[str, ...]:
+    """Адреса host, если все они публичные; иначе UnsafeHost (как и прежняя проверка — по любому адресу)."""
+    ips = resolve(host)
+    if not all(is_public_ip(ip) for ip in ips):
+        raise UnsafeHost(f"{host} resolves to a private address")
+    return ips
+
+
+def is_safe_host(host: str) -> bool:
+    try:
+        vetted_ips(host)
+        return True
+    except (UnsafeHost, ValueError):
+        return False
+
+
+def clear_cache() -> None:
+    with _lock:
+        _cache.clear()
+
+
+class _PinnedMixin:
+    """Подключается к проверенному IP; self.host (SNI, сертификат, Host) остаётся исходным именем."""
+
+    def _new_conn(self):
+        last_exc = None
+        for ip in vetted_ips(self.host):
+            self._dns_host = ip
+            try:
+                return super()._new_conn()
+            except NewConnectionError as e:  # адрес недоступен — пробуем следующий
+                last_exc = e
+        raise last_exc
+
+
+class PinnedHTTPConnection(_PinnedMixin, HTTPConnection):
+    pass
+
+
+class PinnedHTTPSConnection(_PinnedMixin, HTTPSConnection):
+    pass
+
+
+class PinnedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = PinnedHTTPConnection
+
+
+class PinnedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = PinnedHTTPSConnection
+
+
+class PinnedAdapter(HTTPAdapter):
+    """HTTPAdapter, чьи соединения идут только на проверенные публичные адреса (см. vetted_ips)."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": PinnedHTTPConnectionPool,
+            "https": PinnedHTTPSConnectionPool,
+        }
@@ -0,0 +1,105 @@
+# Путь: backend/news/utils/search.py
+# Назначение: Общий слой полнотекстового поиска для SearchView и SmartSearchViewEnhanced (news/views.py).
+# Бэкенды (выбираются по БД, интерфейс один):
+#   • postgres — запрос сравнивается с хранимым взвешенным search_vector (заголовок — вес A, текст — B;
+#     пишет триггер из миграции 0033_search_vector), условие @@ обслуживает GIN-индекс. Ранг — ts_rank
+#     по тому же столбцу, сниппет — ts_headline.
+#   • fts5 — SQLite с FTS5-индексом (news/utils/search_fts.py, миграция 0034_search_fts5): префиксный поиск
+#     по словам, ранг — bm25 (заголовок весомее), сниппет — snippet().
+#   • basic — icontains по заголовку и тексту (SQLite без FTS5 и прочие БД).
+# Использование:
+#   search(Article.objects.filter(status="PUBLISHED"), q)                              — фильтр (plainto_tsquery)
+#   search(ImportedNews.objects.all(), q, search_type="websearch", rank=True, min_rank=0.1, snippet=True)
+#                                                                                      — + rank, snippet
+#   attach_snippets(objs, data) — переносит сниппеты (HTML с <mark>) в сериализованные записи.
+
+from __future__ import annotations
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import connections, router
+from django.db.models import F, Q
+from django.utils.html import escape, strip_tags
+
+from . import search_fts
+
+CONFIG = "russian"  # тот же словарь, что в триггерах миграции 0033_search_vector
+
+# Поля, по которым строится search_vector / FTS5-индекс (и ищет запасной вариант)
+TEXT_FIELDS = {
+    "news.article": ("title", "content"),
+    "news.importednews": ("title", "summary"),
+}
+
+# Маркеры совпадений в сырых сниппетах: переживают strip_tags и не встречаются в тексте новостей
+MARK_START, MARK_STOP = "⟦", "⟧"
+
+
+def backend(model=None) -> str:
+    """"postgres" | "fts5" | "basic" для БД, где лежит model (по умолчанию — default)."""
+    connection = connections[router.db_for_read(model) if model is not None else "default"]
+    if connection.vendor == "postgresql":
+        return "postgres"
+    if model is not None and search_fts.available(connection, model._meta.db_table):
+        return "fts5"
+    return "basic"
+
+
+def text_fields(model) -> tuple[str, ...]:
+    return TEXT_FIELDS[model._meta.label_lower]
+
+
+def search(qs, q: str, *, search_type: str = "plain", rank: bool = False, min_rank: float = 0.0,
+           title_only: bool = False, snippet: bool = False):
+    """
+    qs, отфильтрованный по запросу q. rank=True — с аннотацией rank, отсортированный по ней (basic —
+    в порядке модели по умолчанию). min_rank — порог ts_rank, только для postgres (у bm25 другая шкала).
+    title_only — только для basic: искать лишь в заголовке. snippet=True — аннотация snippet (сырой текст
+    с маркерами MARK_START/MARK_STOP; в HTML — через highlight / attach_snippets).
+    """
+    kind = backend(qs.model)
+    if kind == "postgres":
+        query = SearchQuery(q, search_type=search_type, config=CONFIG)
+        qs = qs.filter(search_vector=query).defer("search_vector")  # сам вектор в ответ не нужен
+        if rank:
+            qs = qs.annotate(rank=SearchRank(F("search_vector"), query))
+            if min_rank:
+                qs = qs.filter(rank__gte=min_rank)
+            qs = qs.order_by("-rank")
+        if snippet:
+            qs = qs.annotate(snippet=SearchHeadline(
+                text_fields(qs.model)[1], query, config=CONFIG, start_sel=MARK_START, stop_sel=MARK_STOP,
+                max_words=35, min_words=15,
+            ))
+        return qs
+
+    if kind == "fts5":
+        match = search_fts.match_query(q)
+        if match is None:
+            return qs.none()
+        table = qs.model._meta.db_table
+        qs = qs.filter(pk__in=search_fts.matching_ids(table, match))
+        if rank:
+            qs = qs.annotate(rank=search_fts.rank_expr(table, match)).order_by("-rank")
+        if snippet:
+            qs = qs.annotate(snippet=search_fts.snippet_expr(table, match, MARK_START, MARK_STOP))
+        return qs
+
+    fields = text_fields(qs.model)[:1] if title_only else text_fields(qs.model)
+    cond = Q()
+    for name in fields:
+        cond |= Q(**{f"{name}__icontains": q})
+    return qs.filter(cond)
+
+
+def highlight(raw: str) -> str:
+    """Сырой сниппет → безопасный HTML: теги текста убраны, совпадения в <mark>."""
+    text = escape(" ".join(strip_tags(raw or "").split()))
+    return text.replace(MARK_START, "<mark>").replace(MARK_STOP, "</mark>")
+
+
+def attach_snippets(objs, data) -> None:
+    """Добавляет поле snippet в сериализованные записи data (в том же порядке, что objs)."""
+    for obj, item in zip(objs, data):
+        raw = getattr(obj, "snippet", None)
+        if raw:
+            item["snippet"] = highlight(raw)
@@ -0,0 +1,175 @@
+# Путь: backend/news/utils/search_fts.py
+# Назначение: SQLite FTS5 для полнотекстового поиска (staging, edge-узлы на SQLite) — бэкенд "fts5" в news/utils/search.py.
+# Как устроено:
+#   • <таблица>_fts — external content таблица FTS5 над news_article (title, content) и news_importednews
+#     (title, summary): хранит только термы, rowid = id новости. Триггеры AFTER INSERT/DELETE/UPDATE держат её
+#     в актуальном состоянии. Ставится миграцией 0034_search_fts5, переустанавливается manage.py rebuild_indexes.
+#   • Запрос пользователя переводится в синтаксис FTS5 (match_query): каждое слово от 3 букв ищется как префикс
+#     («новост» найдёт «новости», «новостей» — морфологии у unicode61 нет), "фраза в кавычках" — фразой,
+#     -слово — исключение, or/или — ИЛИ. Спецсимволы FTS5 из ввода не проходят: всё экранируется кавычками.
+#   • Ранг — bm25 с весом заголовка TITLE_WEIGHT, сниппет — snippet() по лучшему столбцу.
+# Важно: Django на SQLite при изменении столбцов пересоздаёт таблицу, и триггеры пропадают. Тогда available()
+#        вернёт False (поиск временно на icontains) — восстановить: manage.py rebuild_indexes.
+
+from __future__ import annotations
+
+import logging
+import re
+
+from django.db.models.expressions import RawSQL
+
+log = logging.getLogger(__name__)
+
+TABLES = {
+    "news_article": ("title", "content"),
+    "news_importednews": ("title", "summary"),
+}
+TRIGGERS = ("ai", "ad", "au")
+TITLE_WEIGHT = 10.0
+PREFIX_MIN = 3  # короче — только точное слово (иначе «на*» совпадёт с половиной словаря)
+SNIPPET_TOKENS = 24
+
+_TOKEN_RE = re.compile(r'(-?)"([^"]*)"|(-?)([\w]+)', re.UNICODE)
+_OR_WORDS = {"or", "или"}
+
+_available: dict[str, bool] = {}
+
+
+def fts_table(db_table: str) -> str:
+    return f"{db_table}_fts"
+
+
+def _memo_key(connection) -> str:
+    return f"{connection.alias}:{connection.settings_dict.get('NAME')}"
+
+
+def available(connection, db_table: str) -> bool:
+    """Есть ли для db_table рабочий FTS5-индекс (таблица и все триггеры) в этой БД."""
+    if connection.vendor != "sqlite" or db_table not in TABLES:
+        return False
+    key = f"{_memo_key(connection)}:{db_table}"
+    if key not in _available:
+        fts = fts_table(db_table)
+        names = [fts] + [f"{fts}_{t}" for t in TRIGGERS]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT count(*) FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(names))})", names,
+            )
+            ok = cursor.fetchone()[0] == len(names)
+        if not ok:
+            log.warning("search_fts: нет FTS5-индекса или его триггеров для %s — выполните manage.py rebuild_indexes",
+                        db_table)
+        _available[key] = ok
+    return _available[key]
+
+
+def install(connection, rebuild: bool = True) -> bool:
+    """Создаёт недостающие FTS5-таблицы и триггеры и (rebuild) переиндексирует всё. False — в SQLite нет FTS5."""
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.news_fts5_probe USING fts5(x)")
+            cursor.execute("DROP TABLE temp.news_fts5_probe")
+        except Exception:
+            log.warning("search_fts: SQLite собран без FTS5 — поиск останется на icontains")
+            return False
+        for table, (title, body) in TABLES.items():
+            fts = fts_table(table)
+            cols = f"{title}, {body}"
+            new = f"new.id, new.{title}, new.{body}"
+            old = f"'delete', old.id, old.{title}, old.{body}"
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', "
+                f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='{PREFIX_MIN}')"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, {cols}) VALUES ({new}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ({old}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ({old}); "
+                f"INSERT INTO {fts}(rowid, {cols}) VALUES ({new}); END"
+            )
+            if rebuild:
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('optimize')")
+    _available.clear()
+    return True
+
+
+def uninstall(connection) -> None:
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for table in TABLES:
+            fts = fts_table(table)
+            for t in TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {fts}_{t}")
+            cursor.execute(f"DROP TABLE IF EXISTS {fts}")
+    _available.clear()
+
+
+def _term(word: str) -> str:
+    word = word.replace('"', "")
+    return f'"{word}"*' if len(word) >= PREFIX_MIN else f'"{word}"'
+
+
+def match_query(q: str) -> str | None:
+    """Запрос FTS5 из пользовательского ввода (см. описание модуля). None — искать нечего."""
+    groups: list[list[str]] = []
+    negative: list[str] = []
+    join_or = False
+    for neg_phrase, phrase, neg_word, word in _TOKEN_RE.findall(q or ""):
+        if word and not neg_word and word.lower() in _OR_WORDS:
+            join_or = bool(groups)
+            continue
+        if phrase:
+            words = re.findall(r"\w+", phrase)
+            if not words:
+                continue
+            term = '"' + " ".join(words) + '"'
+        else:
+            term = _term(word)
+        if neg_phrase or neg_word:
+            negative.append(term)
+        elif join_or:
+            groups[-1].append(term)
+        else:
+            groups.append([term])
+        join_or = False
+    if not groups:
+        return None
+    expr = " AND ".join(g[0] if len(g) == 1 else "(" + " OR ".join(g) + ")" for g in groups)
+    for term in negative:
+        expr = f"({expr}) NOT {term}"
+    return expr
+
+
+def matching_ids(db_table: str, match: str) -> RawSQL:
+    """Подзапрос id строк, совпавших с match (для pk__in)."""
+    fts = fts_table(db_table)
+    return RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [match])
+
+
+def rank_expr(db_table: str, match: str) -> RawSQL:
+    """Ранг строки: -bm25 (у bm25 «лучше» = меньше), чтобы сортировать по убыванию, как ts_rank."""
+    fts = fts_table(db_table)
+    return RawSQL(
+        f"(SELECT -bm25({fts}, {TITLE_WEIGHT}, 1.0) FROM {fts} WHERE {fts} MATCH %s AND rowid = {db_table}.id)",
+        [match],
+    )
+
+
+def snippet_expr(db_table: str, match: str, start: str, stop: str) -> RawSQL:
+    fts = fts_table(db_table)
+    return RawSQL(
+        f"(SELECT snippet({fts}, -1, %s, %s, '…', {SNIPPET_TOKENS}) FROM {fts} "
+        f"WHERE {fts} MATCH %s AND rowid = {db_table}.id)",
+        [start, stop, match],
+    )
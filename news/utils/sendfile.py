@@ -0,0 +1,58 @@
+# Путь: backend/news/utils/sendfile.py
+# Назначение: Отдача файлов с диска фронт-прокси: X-Accel-Redirect (nginx) или X-Sendfile (Apache/lighttpd).
+# Зачем: FileResponse(open(...)) держит воркер Django на всё время передачи; с offload Django отвечает
+#        одними заголовками (ETag, Cache-Control, ...), а байты шлёт nginx/Apache без копирования через Python.
+# Настройки:
+#   MEDIA_SENDFILE = ""              — "" (отдаёт Django, как раньше) | "nginx" | "xsendfile"
+#   MEDIA_ACCEL_PREFIX = "/_protected_media/" — internal-location nginx, смотрящий на MEDIA_ROOT
+# nginx:
+#   location /_protected_media/ {
+#       internal;
+#       alias /srv/izotovlife/backend/media/;
+#   }
+# Файлы вне MEDIA_ROOT (и режим по умолчанию) отдаются по-старому — через FileResponse.
+
+from __future__ import annotations
+
+import os
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+
+MODES = ("nginx", "xsendfile")
+
+
+def get_mode() -> str:
+    mode = str(getattr(settings, "MEDIA_SENDFILE", "") or "").lower()
+    return mode if mode in MODES else ""
+
+
+def _media_relpath(path: str) -> str | None:
+    """Путь относительно MEDIA_ROOT или None, если файл лежит вне его (такой фронт-прокси не отдаст)."""
+    root = os.path.realpath(str(getattr(settings, "MEDIA_ROOT", "") or ""))
+    real = os.path.realpath(path)
+    if not root or os.path.commonpath([root, real]) != root:
+        return None
+    return os.path.relpath(real, root).replace(os.sep, "/")
+
+
+def send_file(path: str, content_type: str) -> HttpResponse:
+    """
+    Ответ с содержимым файла path: заголовок для фронт-прокси (MEDIA_SENDFILE) или поток через Django.
+    FileNotFoundError — если файла нет (проверяется в обоих режимах, чтобы вызывающий мог перегенерировать).
+    """
+    mode = get_mode()
+    rel = _media_relpath(path) if mode else None
+    if rel is None:
+        return FileResponse(open(path, "rb"), content_type=content_type)
+
+    if not os.path.isfile(path):
+        raise FileNotFoundError(path)
+    resp = HttpResponse(content_type=content_type)
+    if mode == "nginx":
+        prefix = getattr(settings, "MEDIA_ACCEL_PREFIX", "/_protected_media/").rstrip("/")
+        resp["X-Accel-Redirect"] = f"{prefix}/{quote(rel)}"
+    else:
+        resp["X-Sendfile"] = os.path.realpath(path)
+    return resp
@@ -0,0 +1,407 @@
+# Путь: backend/news/utils/thumb_cache.py
+# Назначение: Дисковый кэш миниатюр — общие примитивы для views_media.thumbnail_proxy.
+#   • atomic_write(path, data): запись через временный файл в той же папке + os.replace —
+#     читатель видит либо старый файл, либо полностью записанный новый, но не «половинку».
+#   • single_flight(key): пока один запрос генерирует миниатюру для ключа, остальные ждут его,
+#     а потом отдают готовый файл из кэша (вместо того чтобы десятки раз качать оригинал и жать WebP).
+#     Внутри процесса — threading.Lock на ключ, между процессами (gunicorn workers) — flock на файл-замок.
+#     Файлов-замков фиксированное число (LOCK_STRIPES по префиксу ключа), мусор не копится.
+#   • bump(name) / get_stats(): счётчики попаданий/промахов — оригиналы и миниатюры. Копятся в памяти процесса
+#     и сбрасываются вместе с обращениями в SQLite-индекс миниатюр (таблица counters): их видят все воркеры
+#     и thumbcache_gc, а не только процесс, обслуживший запрос (CACHES по умолчанию — LocMem на процесс).
+#   • shard_path(root, key, ext): файлы раскладываются по подпапкам ab/cd/<key><ext> — в одной папке
+#     не скапливаются сотни тысяч файлов.
+#   • AccessIndex: маленький SQLite-индекс: размер, время последнего обращения и число попаданий по каждому файлу.
+#     Обращения копятся в памяти и сбрасываются пачкой, чтобы отдача из кэша не писала в SQLite на каждый запрос.
+#     По индексу работает thumbcache_gc (LRU/LFU). Файл индекса миниатюр — THUMB_INDEX_PATH, вне MEDIA_ROOT:
+#     кэш лежит под /media/, а /media/ в проде отдаёт nginx. Прежний index.sqlite3 / .index.sqlite3 из папки
+#     кэша переносится туда при старте.
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:  # POSIX
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: остаётся только блокировка внутри процесса
+    fcntl = None
+
+STAT_NAMES = ("orig_hit", "orig_miss", "thumb_hit", "thumb_miss", "thumb_wait", "thumb_busy", "thumb_negative")
+
+INDEX_FILENAME = ".index.sqlite3"
+LEGACY_INDEX_FILENAMES = ("index.sqlite3", ".index.sqlite3")  # прежние имена в папке кэша — переносим в path
+INDEX_FLUSH_EVERY_S = 5.0
+INDEX_FLUSH_BATCH = 200
+
+LOCK_STRIPES_HEX = 3  # 16^3 = 4096 файлов-замков
+LOCK_POLL_S = 0.05
+
+_key_locks: dict[str, list] = {}  # key -> [Lock, число ожидающих]
+_key_locks_guard = threading.Lock()
+
+
+_pending_stats: dict[str, int] = {}
+_stats_guard = threading.Lock()
+_stats_index: "AccessIndex | None" = None  # индекс, в который сбрасываются счётчики (AccessIndex(stats=True))
+
+
+def bump(name: str, n: int = 1) -> None:
+    """Увеличивает счётчик статистики (в памяти; в индекс — вместе с обращениями). Отдачу картинок не тормозит."""
+    with _stats_guard:
+        _pending_stats[name] = _pending_stats.get(name, 0) + n
+    if _stats_index is not None:
+        _stats_index._maybe_flush()
+
+
+def get_stats() -> dict:
+    values = _stats_index.counters() if _stats_index is not None else {}
+    stats = {n: int(values.get(n) or 0) for n in STAT_NAMES}
+    for kind in ("orig", "thumb"):
+        hits = stats[f"{kind}_hit"] + (stats["thumb_wait"] if kind == "thumb" else 0)
+        total = hits + stats[f"{kind}_miss"]
+        stats[f"{kind}_hit_rate"] = round(hits / total, 4) if total else None
+    return stats
+
+
+def shard_path(root: str, key: str, ext: str) -> str:
+    """root/ab/cd/<key><ext> — два уровня по 256 подпапок."""
+    return os.path.join(root, key[:2], key[2:4], key + ext)
+
+
+class AccessIndex:
+    """
+    Индекс файлов кэша: key → (path, size, created, last_access, hits).
+    Запись буферизуется: touch()/add() копят изменения, flush() пишет их одной транзакцией.
+    """
+
+    def __init__(self, root: str, path: str | None = None, stats: bool = False):
+        global _stats_index
+        self.root = root
+        self.path = path or os.path.join(root, INDEX_FILENAME)
+        self._migrate_legacy()
+        self._lock = threading.Lock()
+        self._pending_add: dict[str, tuple] = {}
+        self._pending_hits: dict[str, list] = {}  # key -> [last_access, hits]
+        self._last_flush = time.monotonic()
+        self._ready = False
+        self.stats = stats
+        if stats:
+            _stats_index = self
+
+    def _migrate_legacy(self) -> None:
+        """Индекс из папки кэша (index.sqlite3 / .index.sqlite3, + -wal/-shm) → path; при ошибке соберётся reindex."""
+        if os.path.exists(self.path):
+            return
+        for name in LEGACY_INDEX_FILENAMES:
+            legacy = os.path.join(self.root, name)
+            if legacy == self.path or not os.path.exists(legacy):
+                continue
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            for suffix in ("-wal", "-shm", ""):  # основной файл последним: его появление = перенос завершён
+                try:
+                    os.replace(legacy + suffix, self.path + suffix)
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    return
+            return
+
+    def connect(self) -> sqlite3.Connection:
+        os.makedirs(self.root, exist_ok=True)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, path TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created REAL NOT NULL, last_access REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries(last_access)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def add(self, key: str, path: str, size: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._pending_add[key] = (key, os.path.relpath(path, self.root), size, now, now)
+        self._maybe_flush()
+
+    def touch(self, key: str) -> None:
+        with self._lock:
+            entry = self._pending_hits.setdefault(key, [0.0, 0])
+            entry[0] = time.time()
+            entry[1] += 1
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if (
+            len(self._pending_add) + len(self._pending_hits) >= INDEX_FLUSH_BATCH
+            or (self.stats and sum(_pending_stats.values()) >= INDEX_FLUSH_BATCH)
+            or time.monotonic() - self._last_flush >= INDEX_FLUSH_EVERY_S
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            adds, hits = list(self._pending_add.values()), self._pending_hits
+            self._pending_add, self._pending_hits = {}, {}
+            self._last_flush = time.monotonic()
+        counters = {}
+        if self.stats:
+            with _stats_guard:
+                counters = dict(_pending_stats)
+                _pending_stats.clear()
+        if not adds and not hits and not counters:
+            return
+        try:
+            conn = self.connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO entries(key, path, size, created, last_access, hits) VALUES (?, ?, ?, ?, ?, 0)"
+                        " ON CONFLICT(key) DO UPDATE SET path=excluded.path, size=excluded.size,"
+                        " created=excluded.created, last_access=excluded.last_access",
+                        adds,
+                    )
+                    conn.executemany(
+                        "UPDATE entries SET last_access=MAX(last_access, ?), hits=hits+? WHERE key=?",
+                        [(ts, n, key) for key, (ts, n) in hits.items()],
+                    )
+                    conn.executemany(
+                        "INSERT INTO counters(name, value) VALUES (?, ?)"
+                        " ON CONFLICT(name) DO UPDATE SET value=value+excluded.value",
+                        list(counters.items()),
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            # Индекс — вспомогательный: при сбое теряем статистику обращений, но не отдачу картинок
+            pass
+
+    def remove(self, keys) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        conn = self.connect()
+        try:
+            with conn:
+                conn.executemany("DELETE FROM entries WHERE key=?", [(k,) for k in keys])
+        finally:
+            conn.close()
+
+    def counters(self) -> dict:
+        """Счётчики bump() всех процессов (со сбросом своих накопленных)."""
+        self.flush()
+        try:
+            conn = self.connect()
+            try:
+                return dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return {}
+
+    def totals(self) -> dict:
+        conn = self.connect()
+        try:
+            files, size, hits = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM entries"
+            ).fetchone()
+        finally:
+            conn.close()
+        return {"files": files, "bytes": size, "hits": hits}
+
+
+def iter_cache_files(root: str):
+    """Файлы миниатюр под root (включая старые «плоские»), без индекса, замков и временных файлов."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for name in filenames:
+            if name.startswith(".") or name.startswith(LEGACY_INDEX_FILENAMES[0]):
+                continue
+            yield os.path.join(dirpath, name)
+
+
+def reindex(index: AccessIndex, tmp_max_age_s: float = 3600) -> dict:
+    """
+    Сверяет индекс с диском: «плоские» файлы старого формата переносит в подпапки, файлы без записи
+    добавляет (last_access = mtime), записи без файлов удаляет, брошенные временные файлы чистит.
+    """
+    index.flush()
+    stats = {"moved": 0, "added": 0, "dropped": 0, "tmp_removed": 0}
+    conn = index.connect()
+    try:
+        known = {row[0]: row[1] for row in conn.execute("SELECT key, path FROM entries")}
+        seen, rows = set(), []
+        for path in iter_cache_files(index.root):
+            name = os.path.basename(path)
+            key, ext = os.path.splitext(name)
+            target = shard_path(index.root, key, ext)
+            if path != target:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(path, target)
+                stats["moved"] += 1
+            seen.add(key)
+            if key not in known:
+                st = os.stat(target)
+                rows.append((key, os.path.relpath(target, index.root), st.st_size, st.st_mtime, st.st_mtime))
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO entries(key, path, size, created, last_access, hits) VALUES (?, ?, ?, ?, ?, 0)",
+                rows,
+            )
+            gone = [(k,) for k in known if k not in seen]
+            conn.executemany("DELETE FROM entries WHERE key=?", gone)
+        stats["added"], stats["dropped"] = len(rows), len(gone)
+    finally:
+        conn.close()
+
+    cutoff = time.time() - tmp_max_age_s
+    for dirpath, _, filenames in os.walk(index.root):
+        for name in filenames:
+            if name.startswith(".tmp-"):
+                path = os.path.join(dirpath, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        stats["tmp_removed"] += 1
+                except OSError:
+                    pass
+    return stats
+
+
+EVICTION_ORDER = {
+    "lru": "last_access ASC",
+    "lfu": "hits ASC, last_access ASC",
+}
+
+
+def evict(index: AccessIndex, budget_bytes: int, policy: str = "lru", low_watermark: float = 0.9,
+          dry_run: bool = False, batch: int = 500) -> dict:
+    """
+    Если кэш больше budget_bytes — удаляет файлы в порядке политики (lru — давно не читанные,
+    lfu — редко читаемые), пока не останется low_watermark * budget (запас, чтобы не чистить на каждом запуске).
+    """
+    index.flush()
+    total = index.totals()["bytes"]
+    result = {"before_bytes": total, "removed_files": 0, "removed_bytes": 0}
+    if total <= budget_bytes:
+        result["after_bytes"] = total
+        return result
+
+    target = int(budget_bytes * low_watermark)
+    order = EVICTION_ORDER[policy]
+    conn = index.connect()
+    try:
+        offset = 0
+        while total > target:
+            rows = conn.execute(f"SELECT key, path, size FROM entries ORDER BY {order} LIMIT ? OFFSET ?",
+                                (batch, offset)).fetchall()
+            if not rows:
+                break
+            removed = []
+            for key, rel, size in rows:
+                if total <= target:
+                    break
+                if not dry_run:
+                    try:
+                        os.remove(os.path.join(index.root, rel))
+                    except FileNotFoundError:
+                        pass
+                    except OSError:
+                        continue
+                removed.append(key)
+                total -= size
+                result["removed_files"] += 1
+                result["removed_bytes"] += size
+            if not dry_run and removed:
+                with conn:
+                    conn.executemany("DELETE FROM entries WHERE key=?", [(k,) for k in removed])
+            # в dry-run ничего не удалено, при ошибке удаления строка осталась — их пропускаем
+            offset += len(rows) - (0 if dry_run else len(removed))
+    finally:
+        conn.close()
+    result["after_bytes"] = total
+    return result
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=".tmp-", suffix=os.path.splitext(path)[1])
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+@contextmanager
+def _process_lock(key: str, deadline: float):
+    with _key_locks_guard:
+        entry = _key_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    acquired = entry[0].acquire(timeout=max(0.0, deadline - time.monotonic()))
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            entry[0].release()
+        with _key_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                _key_locks.pop(key, None)
+
+
+@contextmanager
+def _file_lock(lock_dir: str, key: str, deadline: float):
+    if fcntl is None:
+        yield True
+        return
+    os.makedirs(lock_dir, exist_ok=True)
+    path = os.path.join(lock_dir, f"{key[:LOCK_STRIPES_HEX]}.lock")
+    with open(path, "a+b") as f:
+        acquired = False
+        while True:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                acquired = True
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(LOCK_POLL_S)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def single_flight(key: str, lock_dir: str, timeout: float = 30.0):
+    """
+    Эксклюзивный доступ к генерации для key (hex-строка). Возвращает True, если замок получен,
+    False — если не дождались за timeout (тогда вызывающий генерирует сам, чтобы не висеть вечно).
+    После входа обязательно перепроверьте кэш: пока ждали, файл мог сделать другой запрос.
+    """
+    deadline = time.monotonic() + timeout
+    with _process_lock(key, deadline) as in_process:
+        if not in_process:
+            yield False
+            return
+        with _file_lock(lock_dir, key, deadline) as cross_process:
+            yield cross_process
@@ -0,0 +1,108 @@
+# Путь: backend/news/utils/thumb_pool.py
+# Назначение: Рендер миниатюр в отдельном пуле процессов с ограничением очереди.
+# Зачем: Pillow-ресайз — чистый CPU. В потоке веб-воркера пачка промахов кэша занимает все воркеры,
+#        и JSON-API ждёт картинки. Здесь рендер уходит в N процессов, а если в работе и в очереди уже
+#        THUMB_POOL_MAX_PENDING задач — render() сразу бросает PoolBusy, и вьюха деградирует
+#        (оригинал / плейсхолдер / 503 + Retry-After, см. THUMB_OVERLOAD_MODE).
+# Настройки:
+#   THUMB_POOL_WORKERS = 2        — процессов в пуле; 0 — рендерить прямо в запросе (как раньше)
+#   THUMB_POOL_MAX_PENDING = 8    — задач в работе + в очереди, сверх — PoolBusy
+#   THUMB_POOL_TIMEOUT = 15       — сек ожидания результата; дольше — тоже PoolBusy
+#   THUMB_POOL_START_METHOD = "spawn" — spawn безопаснее fork в многопоточном веб-сервере
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from .thumb_render import render_path
+
+log = logging.getLogger(__name__)
+
+
+class PoolBusy(Exception):
+    """Пул перегружен или не успел — миниатюру сейчас не сделать."""
+
+
+class RenderPool:
+    def __init__(self, workers: int, max_pending: int, timeout: float, start_method: str = "spawn"):
+        self.workers = workers
+        self.max_pending = max(1, max_pending)
+        self.timeout = timeout
+        self.start_method = start_method
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context(self.start_method)
+            )
+        return self._executor
+
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def render(self, path: str, *args, **kwargs) -> bytes:
+        """render_path(path, *args, **kwargs) в пуле. PoolBusy — если очередь полна или не дождались."""
+        if self.workers <= 0:
+            return render_path(path, *args, **kwargs)
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PoolBusy(f"{self._pending} задач в очереди рендера")
+            self._pending += 1
+            try:
+                future = self._get_executor().submit(render_path, path, *args, **kwargs)
+            except BrokenProcessPool:
+                # процесс пула упал (OOM на гигантской картинке) — пересоздаём пул
+                log.warning("thumb_pool: пул сломан, пересоздаём")
+                self._executor = None
+                try:
+                    future = self._get_executor().submit(render_path, path, *args, **kwargs)
+                except Exception:
+                    self._pending -= 1
+                    raise
+            except Exception:
+                self._pending -= 1
+                raise
+        # счётчик уменьшается, когда задача действительно завершится (даже если запрос ушёл по таймауту)
+        future.add_done_callback(self._release)
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise PoolBusy("рендер не уложился в THUMB_POOL_TIMEOUT")
+        except BrokenProcessPool:
+            with self._lock:
+                self._executor = None
+            raise PoolBusy("процесс рендера упал")
+
+
+_pool: RenderPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> RenderPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RenderPool(
+                workers=int(getattr(settings, "THUMB_POOL_WORKERS", 2)),
+                max_pending=int(getattr(settings, "THUMB_POOL_MAX_PENDING", 8)),
+                timeout=float(getattr(settings, "THUMB_POOL_TIMEOUT", 15)),
+                start_method=getattr(settings, "THUMB_POOL_START_METHOD", "spawn"),
+            )
+        return _pool
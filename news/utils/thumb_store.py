@@ -0,0 +1,227 @@
+# Путь: backend/news/utils/thumb_store.py
+# Назначение: Общий для всех веб-узлов кэш миниатюр поверх Django Storage.
+# Зачем: за балансировщиком каждый узел иначе рендерит те же миниатюры сам и держит свою копию.
+# Как работает:
+#   • Миниатюра после рендера кладётся в хранилище THUMB_STORAGE (алиас из settings.STORAGES: общий диск
+#     через FileSystemStorage, S3-совместимое хранилище через django-storages, в тестах — InMemoryStorage)
+#     под именем <THUMB_STORAGE_PREFIX>ab/cd/<key><ext>, а в таблицу ThumbCacheEntry (общая БД) — запись
+#     «ключ есть» с размером и типом. Узлы узнают о готовой миниатюре по индексу, не опрашивая хранилище
+#     (exists() у S3 — это HEAD-запрос); найденные записи запоминаются в Django cache.
+#   • Диск узла (MEDIA_ROOT/cache/thumbs) — локальный слой «читаем насквозь»: промах на узле → копия из общего
+#     хранилища → дальше отдаётся с диска (в т.ч. через X-Accel-Redirect). THUMB_STORAGE_LOCAL_CACHE=False —
+#     без локальных копий, каждый ответ читается из хранилища.
+#   • Ошибки хранилища не ломают отдачу: миниатюра тогда просто рендерится заново.
+#   • Размер общего хранилища держит thumbcache_gc (evict): сверх THUMB_STORAGE_MAX_BYTES удаляются давно
+#     не читанные миниатюры — файл в Storage и запись индекса. Время обращения (accessed_at) обновляется
+#     не чаще раза в THUMB_STORAGE_TOUCH_INTERVAL на ключ (touch), чтобы попадания не писали в БД каждый раз.
+# Настройки:
+#   THUMB_STORAGE = ""                — "" (как раньше: только диск узла) | алиас из STORAGES, например "thumbs"
+#   THUMB_STORAGE_PREFIX = "thumbs/"
+#   THUMB_STORAGE_LOCAL_CACHE = True
+#   THUMB_STORAGE_MAX_BYTES = 20 ГБ   — бюджет общего хранилища для thumbcache_gc
+#   THUMB_STORAGE_TOUCH_INTERVAL = 3600
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.db.models import Q
+from django.utils import timezone
+
+from .thumb_cache import atomic_write
+
+log = logging.getLogger(__name__)
+
+MEMO_PREFIX = "thumbstore:"
+MEMO_TTL = 24 * 3600
+TOUCH_MEMO_MAX = 100_000  # ключей в памяти процесса для touch(); больше — память сбрасывается
+
+_touched: dict[str, float] = {}  # ключ → monotonic-время последней отметки из этого процесса
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "THUMB_STORAGE", ""))
+
+
+def local_layer() -> bool:
+    """Пишем ли миниатюры на диск узла (без общего хранилища — всегда)."""
+    return not enabled() or bool(getattr(settings, "THUMB_STORAGE_LOCAL_CACHE", True))
+
+
+def get_storage():
+    alias = getattr(settings, "THUMB_STORAGE", "")
+    return storages[alias] if alias else None
+
+
+def name_for(key: str, ext: str) -> str:
+    prefix = getattr(settings, "THUMB_STORAGE_PREFIX", "thumbs/")
+    return f"{prefix}{key[:2]}/{key[2:4]}/{key}{ext}"
+
+
+def lookup(key: str) -> dict | None:
+    """Запись индекса {"name", "size", "content_type", "created_at"} или None, если миниатюры в хранилище нет."""
+    if not enabled():
+        return None
+    entry = cache.get(MEMO_PREFIX + key)
+    if entry is None:
+        from news.models import ThumbCacheEntry
+
+        entry = ThumbCacheEntry.objects.filter(key=key).values("name", "size", "content_type", "created_at").first()
+        if entry is not None:
+            cache.set(MEMO_PREFIX + key, entry, MEMO_TTL)
+    return entry
+
+
+def totals() -> dict:
+    """Заполненность общего хранилища по индексу (для /api/media/thumbnail/stats/)."""
+    if not enabled():
+        return {}
+    from django.db.models import Count, Sum
+
+    from news.models import ThumbCacheEntry
+
+    agg = ThumbCacheEntry.objects.aggregate(files=Count("id"), size=Sum("size"))
+    return {"shared_files": agg["files"], "shared_bytes": agg["size"] or 0}
+
+
+def touch(key: str) -> None:
+    """Отмечает обращение к миниатюре (для вытеснения). В БД пишет не чаще раза в THUMB_STORAGE_TOUCH_INTERVAL."""
+    if not enabled():
+        return
+    interval = int(getattr(settings, "THUMB_STORAGE_TOUCH_INTERVAL", 3600))
+    now = time.monotonic()
+    last = _touched.get(key)
+    if last is not None and now - last < interval:
+        return
+    if len(_touched) >= TOUCH_MEMO_MAX:
+        _touched.clear()
+    _touched[key] = now
+    from news.models import ThumbCacheEntry
+
+    stamp = timezone.now()
+    try:
+        ThumbCacheEntry.objects.filter(key=key, accessed_at__lt=stamp - timedelta(seconds=interval)).update(
+            accessed_at=stamp
+        )
+    except Exception as e:  # индекс недоступен — отдаче это не мешает
+        log.warning("thumb_store: touch %s: %s", key, e)
+
+
+def evict(budget_bytes: int, low_watermark: float = 0.9, dry_run: bool = False, batch: int = 500) -> dict:
+    """
+    Если общее хранилище больше budget_bytes — удаляет давно не читанные миниатюры (по accessed_at),
+    пока не останется low_watermark * budget. Файл, который не удалось удалить, остаётся вместе с записью.
+    """
+    from django.db.models import Sum
+
+    from news.models import ThumbCacheEntry
+
+    total = ThumbCacheEntry.objects.aggregate(size=Sum("size"))["size"] or 0
+    result = {"before_bytes": total, "removed_files": 0, "removed_bytes": 0}
+    storage = get_storage()
+    if storage is None or total <= budget_bytes:
+        result["after_bytes"] = total
+        return result
+
+    target = int(budget_bytes * low_watermark)
+    last = None  # (accessed_at, pk) последней просмотренной записи — курсор без OFFSET
+    while total > target:
+        qs = ThumbCacheEntry.objects.order_by("accessed_at", "pk")
+        if last is not None:
+            qs = qs.filter(Q(accessed_at__gt=last[0]) | Q(accessed_at=last[0], pk__gt=last[1]))
+        rows = list(qs.values_list("pk", "key", "name", "size", "accessed_at")[:batch])
+        if not rows:
+            break
+        removed = []
+        for pk, key, name, size, accessed_at in rows:
+            last = (accessed_at, pk)
+            if total <= target:
+                break
+            if not dry_run:
+                try:
+                    storage.delete(name)
+                except Exception as e:
+                    log.warning("thumb_store: delete %s: %s", name, e)
+                    continue
+            removed.append(key)
+            total -= size
+            result["removed_files"] += 1
+            result["removed_bytes"] += size
+        if not dry_run and removed:
+            forget(removed)
+    result["after_bytes"] = total
+    return result
+
+
+def forget(keys) -> None:
+    """Убирает записи индекса (файл в хранилище пропал или вытеснен)."""
+    from news.models import ThumbCacheEntry
+
+    keys = list(keys)
+    ThumbCacheEntry.objects.filter(key__in=keys).delete()
+    cache.delete_many([MEMO_PREFIX + k for k in keys])
+
+
+def open_file(key: str, entry: dict):
+    """Открытый файл миниатюры из хранилища или None (запись индекса без файла удаляется)."""
+    try:
+        return get_storage().open(entry["name"], "rb")
+    except FileNotFoundError:
+        forget([key])
+    except Exception as e:
+        log.warning("thumb_store: open %s: %s", entry["name"], e)
+    return None
+
+
+def storage_path(entry: dict) -> str | None:
+    """Путь на диске для файловых хранилищ (можно отдать через send_file / X-Accel-Redirect), иначе None."""
+    try:
+        path = get_storage().path(entry["name"])
+    except NotImplementedError:
+        return None
+    return path if os.path.isfile(path) else None  # InMemoryStorage тоже «знает» path, но файла на диске нет
+
+
+def pull(key: str, entry: dict, local_path: str) -> bool:
+    """Копирует миниатюру из хранилища на диск узла. False — файла в хранилище нет или оно недоступно."""
+    f = open_file(key, entry)
+    if f is None:
+        return False
+    try:
+        with f:
+            data = f.read()
+    except Exception as e:
+        log.warning("thumb_store: read %s: %s", entry["name"], e)
+        return False
+    atomic_write(local_path, data)
+    return True
+
+
+def put(key: str, ext: str, data: bytes, content_type: str) -> bool:
+    """Кладёт миниатюру в общее хранилище и индекс. Содержимое по ключу одинаково на всех узлах — повтор безвреден."""
+    storage = get_storage()
+    if storage is None:
+        return False
+    from news.models import ThumbCacheEntry
+
+    name = name_for(key, ext)
+    try:
+        if not storage.exists(name):
+            saved = storage.save(name, ContentFile(data))
+            if saved != name:  # другой узел успел первым, хранилище выбрало свободное имя — лишняя копия не нужна
+                storage.delete(saved)
+        ThumbCacheEntry.objects.bulk_create(
+            [ThumbCacheEntry(key=key, name=name, size=len(data), content_type=content_type)], ignore_conflicts=True,
+        )
+    except Exception as e:
+        log.warning("thumb_store: save %s: %s", name, e)
+        return False
+    cache.delete(MEMO_PREFIX + key)  # created_at возьмём из индекса при следующем lookup
+    return True
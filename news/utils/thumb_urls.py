@@ -0,0 +1,109 @@
+# Путь: backend/news/utils/thumb_urls.py
+# Назначение: Подписанные ссылки на ресайзер /api/media/thumbnail/ и проверка подписи.
+# Зачем: без ограничений любой клиент может перебирать w/h/q/fmt/fit/sharpen и плодить уникальные ключи кэша
+#        (и CPU-работу). Подпись — HMAC-SHA256 от нормализованных параметров; политика THUMB_URL_POLICY:
+#          open    — как раньше, принимается всё (по умолчанию, пока фронтенд строит ссылки сам)
+#          presets — без подписи только ?preset=<имя> без переопределений; произвольные размеры — только с sig
+#          signed  — любой запрос должен нести верный sig
+# Сериализаторы получают готовые ссылки через thumbnail_urls(obj, request) (поле thumbnails).
+# normalize_src — единый вид src для ключа кэша: ссылки на собственный /media/ (абсолютные, которые строит фронт,
+# и /media/...) сводятся к имени файла в MEDIA_ROOT — тому же, что у FieldFile и предгенерации (pregenerate).
+
+from __future__ import annotations
+
+from urllib.parse import unquote, urlencode, urlsplit
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .thumb_render import output_format
+
+SIGN_SALT = "news.thumbnail"
+SIG_LENGTH = 32  # hex-символов (128 бит) — достаточно и не раздувает URL
+POLICIES = ("open", "presets", "signed")
+DEFAULT_SERIALIZER_PRESETS = ("card", "hero")
+
+
+def get_policy() -> str:
+    policy = str(getattr(settings, "THUMB_URL_POLICY", "open")).lower()
+    return policy if policy in POLICIES else "open"
+
+
+def preset_params(name: str) -> dict:
+    """Параметры пресета с недостающими значениями по умолчанию. KeyError — если пресета нет."""
+    p = getattr(settings, "THUMB_PRESETS", {})[name]
+    return {"w": p["w"], "h": p["h"], "q": p.get("q", 82), "fmt": p.get("fmt", "webp"),
+            "fit": p.get("fit", "cover"), "sharpen": p.get("sharpen", 1)}
+
+
+def _canonical(src, w, h, q, fmt, fit, sharpen) -> str:
+    return f"{src}|{int(w)}|{int(h)}|{int(q)}|{output_format(fmt)}|{fit}|{int(sharpen)}"
+
+
+def sign(src, w, h, q, fmt, fit, sharpen) -> str:
+    secret = getattr(settings, "THUMB_URL_SECRET", "") or settings.SECRET_KEY
+    mac = salted_hmac(SIGN_SALT, _canonical(src, w, h, q, fmt, fit, sharpen), secret=secret, algorithm="sha256")
+    return mac.hexdigest()[:SIG_LENGTH]
+
+
+def verify(sig: str, src, w, h, q, fmt, fit, sharpen) -> bool:
+    return bool(sig) and constant_time_compare(sig, sign(src, w, h, q, fmt, fit, sharpen))
+
+
+def thumbnail_url(src: str, preset: str = "card", request=None, **overrides) -> str:
+    """
+    Ссылка на миниатюру src в размере preset (с подписью). overrides — w/h/q/fmt/fit/sharpen поверх пресета;
+    с request ссылка абсолютная.
+    """
+    params = {**preset_params(preset), **overrides}
+    query = {"src": src, "preset": preset}
+    query.update({k: v for k, v in overrides.items() if k in params})
+    query["sig"] = sign(unquote(src), **params)  # вьюха ещё раз раскодирует src — подписываем то, что она увидит
+    url = f"{reverse('news:media-thumbnail')}?{urlencode(query)}"
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def _own_hosts() -> set[str]:
+    return {h for h in getattr(settings, "ALLOWED_HOSTS", []) if h and "*" not in h and not h.startswith(".")}
+
+
+def normalize_src(src: str, request_host: str = "") -> str:
+    """
+    src для ключа кэша: http(s)://<наш хост>/media/<имя> и /media/<имя> → <имя> (как FieldFile.name).
+    Чужие URL и ссылки с query возвращаются как есть. request_host — Host текущего запроса (с портом).
+    """
+    parts = urlsplit(src)
+    if parts.query or parts.fragment:
+        return src
+    if parts.scheme in ("http", "https"):
+        if parts.hostname not in _own_hosts() and (not request_host or parts.netloc != request_host):
+            return src
+    elif parts.scheme or parts.netloc:
+        return src
+    prefix = urlsplit(getattr(settings, "MEDIA_URL", "") or "/media/").path.strip("/") + "/"
+    path = parts.path.lstrip("/")
+    return path[len(prefix):] if prefix != "/" and path.startswith(prefix) and len(path) > len(prefix) else src
+
+
+def thumbnail_sources(obj) -> list[str]:
+    """src-значения картинки новости/статьи в том виде, в каком их ждёт /api/media/thumbnail/."""
+    sources = []
+    for attr in ("image", "image_url", "cover_image", "image_file"):
+        value = getattr(obj, attr, None)
+        if isinstance(value, str):
+            value = value.strip()
+        else:  # FieldFile: путь внутри MEDIA_ROOT
+            value = getattr(value, "name", "") if value else ""
+        if value:
+            sources.append(normalize_src(value))
+    return list(dict.fromkeys(sources))
+
+
+def thumbnail_urls(obj, request=None, presets=None) -> dict | None:
+    """{пресет: подписанная ссылка} для основной картинки obj; None — если картинки нет."""
+    sources = thumbnail_sources(obj)
+    if not sources:
+        return None
+    names = presets or getattr(settings, "THUMB_SERIALIZER_PRESETS", DEFAULT_SERIALIZER_PRESETS)
+    return {name: thumbnail_url(sources[0], name, request=request) for name in names}
@@ -0,0 +1,70 @@
+# Путь: backend/news/utils/trigram.py
+# Назначение: Запросы «по подстроке» и «по похожести» для «похожих новостей» и мягкого поиска по слагу/ссылке,
+#             которые в PostgreSQL обслуживаются триграммными индексами (миграция 0035_trigram_indexes).
+# Как работает:
+#   • contains_any(fields, words) — OR из field__icontains. Индекс построен ровно по выражению, в которое Django
+#     компилирует icontains (UPPER(col::text) LIKE ...), так что запрос тот же и на SQLite, а в PostgreSQL
+#     идёт по индексу. Слова короче 3 символов отбрасываются: в них нет ни одной триграммы, и одно такое
+#     условие в OR заставило бы PostgreSQL читать всю таблицу.
+#   • by_similarity(qs, field, text) — сортировка по TrigramSimilarity (самые похожие заголовки первыми);
+#     без pg_trgm — порядок не меняется.
+#   • closest(qs, field, text) — «ближайшее» значение: UPPER(col) % UPPER(text) или подстрока, по убыванию
+#     похожести; без pg_trgm — просто подстрока.
+# Проверка индексов EXPLAIN-ом: python manage.py check_trgm_indexes.
+
+from __future__ import annotations
+
+from django.contrib.postgres.lookups import TrigramSimilar
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections, router
+from django.db.models import Q, Value
+from django.db.models.functions import Upper
+
+MIN_WORD = 3
+
+_available: dict[str, bool] = {}
+
+
+def available(model) -> bool:
+    """PostgreSQL с установленным pg_trgm (для БД, где лежит model)."""
+    alias = router.db_for_read(model)
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return False
+    if alias not in _available:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _available[alias] = cursor.fetchone() is not None
+    return _available[alias]
+
+
+def contains_any(fields, words) -> Q:
+    """OR из <field>__icontains по всем полям и словам (слова короче MIN_WORD пропускаются). Пусто — Q()."""
+    q = Q()
+    for w in words:
+        w = (w or "").strip()
+        if len(w) < MIN_WORD:
+            continue
+        for f in fields:
+            q |= Q(**{f"{f}__icontains": w})
+    return q
+
+
+def by_similarity(qs, field: str, text: str, *then):
+    """qs по убыванию похожести field на text (аннотация similarity), затем по then."""
+    if not text or not available(qs.model):
+        return qs.order_by(*then) if then else qs
+    return qs.annotate(similarity=TrigramSimilarity(field, text)).order_by("-similarity", *then)
+
+
+def closest(qs, field: str, text: str):
+    """Записи, где field похоже на text (%) или содержит его, — самые похожие первыми."""
+    if not available(qs.model):
+        return qs.filter(**{f"{field}__icontains": text})
+    # lookup-выражение, а не field__trigram_similar: django.contrib.postgres не в INSTALLED_APPS
+    similar = TrigramSimilar(Upper(field), Value(text.upper()))
+    return (
+        qs.filter(Q(similar) | Q(**{f"{field}__icontains": text}))
+        .annotate(similarity=TrigramSimilarity(field, text))
+        .order_by("-similarity")
+    )
@@ -0,0 +1,181 @@
+# Путь: backend/news/utils/upload_optimize.py
+# Назначение: Оптимизация загруженных картинок (редактор — views_upload.upload_image, «Предложить новость» —
+#             views_suggest.SuggestNewsView). Запускается в фоне задачей news.optimize_upload после сохранения файла.
+# Что делает с оригиналом:
+#   • применяет EXIF-поворот к пикселям и выбрасывает метаданные (EXIF с GPS/моделью камеры, XMP, комментарии);
+#     ICC-профиль оставляем — без него цвета «поплывут»;
+#   • уменьшает до UPLOAD_MAX_SIDE по большей стороне (камерные 6000×4000 → 2560×1707);
+#   • перекодирует в том же формате (имя и URL файла не меняются) и подменяет им оригинал — «мастер».
+#     Если мастер вышел не меньше, а поворачивать/уменьшать было нечего, оригинал остаётся как есть — но
+#     только когда в нём нет метаданных; иначе он всё равно заменяется: JPEG — тем же файлом без сегментов
+#     APPn/COM (без перекодирования), остальные форматы — перекодированным мастером, даже если он чуть больше.
+#   • рядом кладёт варианты <имя>.r.webp / <имя>.r.jpg (UPLOAD_RENDITIONS; формат мастера и JPEG для
+#     картинок с прозрачностью пропускаются).
+# Экономия записывается в OptimizedUpload (байт до/после). Видео не трогаем: перекодирование требует ffmpeg.
+
+from __future__ import annotations
+
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .image_tools import encode_image
+from .thumb_cache import atomic_write
+
+log = logging.getLogger(__name__)
+
+FORMAT_EXT = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}
+RENDITION_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+JPEG_KEEP_APP = (0xE0, 0xE2, 0xEE)  # JFIF, ICC-профиль, Adobe (нужен для цветов CMYK/YCCK)
+METADATA_KEYS = ("exif", "xmp", "XML:com.adobe.xmp", "comment", "photoshop")
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _has_alpha(im: Image.Image) -> bool:
+    return im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info)
+
+
+def _has_metadata(im: Image.Image) -> bool:
+    """В файле есть EXIF/XMP/IPTC/комментарии (ICC-профиль не считается)."""
+    if im.format == "JPEG":
+        return any(marker not in ("APP0", "APP2", "APP14") for marker, _ in getattr(im, "applist", []))
+    return any(k in im.info for k in METADATA_KEYS) or bool(getattr(im, "text", None))
+
+
+def _strip_jpeg_metadata(data: bytes) -> bytes | None:
+    """JPEG без сегментов APPn с метаданными и COM — сжатые данные не трогаются. None — поток не разобран."""
+    if data[:2] != b"\xff\xd8":
+        return None
+    out, pos = [data[:2]], 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # байты-заполнители перед маркером
+            pos += 1
+            continue
+        if marker == 0xDA:  # SOS: дальше — сжатые данные до конца файла
+            out.append(data[pos:])
+            return b"".join(out)
+        length = int.from_bytes(data[pos + 2:pos + 4], "big")
+        if not ((0xE0 <= marker <= 0xEF and marker not in JPEG_KEEP_APP) or marker == 0xFE):
+            out.append(data[pos:pos + 2 + length])
+        pos += 2 + length
+    return None
+
+
+def _encode_master(im: Image.Image, fmt: str, icc: bytes | None) -> bytes:
+    buf = io.BytesIO()
+    extra = {"icc_profile": icc} if icc else {}
+    if fmt == "JPEG":
+        im.convert("RGB").save(buf, "JPEG", quality=int(_setting("UPLOAD_JPEG_QUALITY", 85)),
+                               optimize=True, progressive=True, **extra)
+    elif fmt == "WEBP":
+        im.save(buf, "WEBP", quality=int(_setting("UPLOAD_WEBP_QUALITY", 82)), method=6, **extra)
+    else:
+        im.save(buf, "PNG", optimize=True, **extra)
+    return buf.getvalue()
+
+
+def _write(storage, name: str, data: bytes) -> str:
+    """Пишет data под именем name, заменяя существующий файл (имя должно сохраниться — на него уже ссылаются)."""
+    try:
+        atomic_write(storage.path(name), data)
+        return name
+    except NotImplementedError:  # не файловое хранилище (S3 и т.п.)
+        if storage.exists(name):
+            storage.delete(name)
+        return storage.save(name, ContentFile(data))
+
+
+def rendition_name(name: str, fmt: str) -> str:
+    root, _ = os.path.splitext(name)
+    return f"{root}.r.{'jpg' if fmt == 'jpeg' else fmt}"
+
+
+def optimize_upload(storage, name: str, force: bool = False) -> dict | None:
+    """
+    Оптимизирует картинку name в storage (см. описание модуля) и записывает результат в OptimizedUpload.
+    None — файл не картинка (или формат, который не трогаем: GIF-анимация, AVIF, ...) либо уже оптимизирован
+    (повтор задачи не должен записать «до» = уже сжатый мастер).
+    """
+    from news.models import OptimizedUpload
+
+    if not force and OptimizedUpload.objects.filter(name=name).exists():
+        return None
+    with storage.open(name, "rb") as f:
+        original = f.read()
+    max_side = int(_setting("UPLOAD_MAX_SIDE", 2560))
+    try:
+        im = Image.open(io.BytesIO(original))
+        fmt = im.format
+        if fmt not in FORMAT_EXT or getattr(im, "is_animated", False):
+            return None
+        icc = im.info.get("icc_profile")
+        metadata = _has_metadata(im)
+        orientation = im.getexif().get(0x0112, 1)
+        before_size = im.size[::-1] if orientation in (5, 6, 7, 8) else im.size
+        ratio = max_side / max(im.size)
+        if fmt == "JPEG" and ratio < 1:  # декодируем сразу уменьшенным (1/2, 1/4, 1/8), как thumb_render
+            im.draft(im.mode, (int(im.width * ratio) + 1, int(im.height * ratio) + 1))
+        im.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        log.info("upload_optimize: %s пропущен: %s", name, e)
+        return None
+
+    transformed = orientation not in (None, 1)
+    im = ImageOps.exif_transpose(im)
+    if max(im.size) > max_side:
+        im.thumbnail((max_side, max_side), Image.LANCZOS)
+        transformed = True
+
+    master = _encode_master(im, fmt, icc)
+    replaced = transformed or len(master) < len(original)
+    if not replaced and metadata:
+        # мастер не меньше оригинала, но EXIF (GPS, модель камеры) в опубликованном файле оставлять нельзя
+        master = (_strip_jpeg_metadata(original) if fmt == "JPEG" else None) or master
+        replaced = True
+    if replaced:
+        stored = _write(storage, name, master)
+        if stored != name:
+            log.warning("upload_optimize: хранилище сохранило мастер как %s вместо %s", stored, name)
+    else:
+        master = original
+
+    renditions = {}
+    alpha = _has_alpha(im)
+    if im.mode not in ("RGB", "RGBA"):
+        im = im.convert("RGBA" if alpha else "RGB")
+    for key in _setting("UPLOAD_RENDITIONS", ("webp", "jpeg")):
+        target = RENDITION_FORMATS.get(key)
+        if target is None or target == fmt or (target == "JPEG" and alpha):
+            continue
+        quality = _setting("UPLOAD_WEBP_QUALITY", 82) if key == "webp" else _setting("UPLOAD_JPEG_QUALITY", 85)
+        data, _ = encode_image(im, key, quality)
+        r_name = _write(storage, rendition_name(name, key), data)
+        renditions[key] = {"name": r_name, "bytes": len(data)}
+
+    record, _ = OptimizedUpload.objects.update_or_create(
+        name=name,
+        defaults={
+            "original_bytes": len(original),
+            "optimized_bytes": len(master),
+            "original_width": before_size[0],
+            "original_height": before_size[1],
+            "width": im.size[0],
+            "height": im.size[1],
+            "replaced": replaced,
+            "renditions": renditions,
+        },
+    )
+    return {
+        "name": name, "replaced": replaced, "original_bytes": len(original), "optimized_bytes": len(master),
+        "saved_bytes": record.saved_bytes, "size": list(im.size), "renditions": renditions,
+    }
@@ -0,0 +1,151 @@
+# Путь: backend/news/utils/upload_stream.py
+# Назначение: Потоковый приём файлов формы «Предложить новость» (views_suggest.SuggestNewsView) с жёсткими
+#             лимитами по полям.
+# Зачем: стандартные обработчики Django сначала принимают загрузку целиком (в память или во временный файл
+#        в /tmp), и только потом вьюха видит size — несколько больших видео съедают память/диск воркеров.
+# Как работает (CappedUploadHandler):
+#   • Content-Length запроса больше допустимого (max_body) → 413 сразу, тело не читается.
+#   • Файлы принимаются только из полей с лимитом (image/image_file/photo, video/video_file), остальные
+#     пропускаются без записи. Поля-синонимы объединены в группы (groups): фронт шлёт один и тот же файл
+#     под несколькими именами — сохраняется только первый, повторы пропускаются (SkipFile), не касаясь диска.
+#     Каждый кусок сразу пишется на диск — во временный .part-файл в каталоге хранилища (upload_to поля),
+#     чтобы сохранение было переименованием, а не копированием; заодно считается sha256 содержимого.
+#   • Как только поле превысило свой лимит — временный файл удаляется, ответ 413, остаток тела не читается.
+#   • Дедупликация: UploadBlob хранит sha256 → имя файла в хранилище; повторная загрузка того же файла
+#     (пользователь отправил форму дважды) не создаёт копию (store()). Такой файл ОБЩИЙ: на одно имя ссылаются
+#     image_file/video_file нескольких ImportedNews. Поэтому файлы загрузок при удалении новостей не удаляются
+#     (ни сигналов, ни чисток по ним нет), а оптимизация (upload_optimize) переписывает файл на месте один раз
+#     на имя (OptimizedUpload): у всех ссылающихся были те же байты — и результат для всех тот же.
+#     Запись UploadBlob, чей файл пропал из хранилища, store() просто перезаписывает новым именем.
+# Настройки: SUGGEST_IMAGE_MAX_BYTES (10 МБ), SUGGEST_VIDEO_MAX_BYTES (150 МБ).
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile, UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+log = logging.getLogger(__name__)
+
+FORM_OVERHEAD = 1024 * 1024  # текстовые поля и заголовки частей multipart сверх файлов
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Файл слишком большой."
+    default_code = "upload_too_large"
+
+
+class StreamedUploadFile(TemporaryUploadedFile):
+    """Временный файл загрузки в заданном каталоге (рядом с итоговым местом) + sha256 содержимого."""
+
+    def __init__(self, name, content_type, charset, content_type_extra=None, directory=None):
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(
+            prefix=".part-", suffix=".upload" + ext, dir=directory or settings.FILE_UPLOAD_TEMP_DIR,
+        )
+        UploadedFile.__init__(self, file, name, content_type, 0, charset, content_type_extra)
+        self.sha256 = ""
+
+
+class CappedUploadHandler(FileUploadHandler):
+    """
+    Единственный обработчик загрузки для запроса: caps — {поле формы: лимит в байтах},
+    dirs — {поле формы: каталог для временного файла} (None — FILE_UPLOAD_TEMP_DIR),
+    groups — {поле формы: группа}: из полей одной группы принимается только первый файл,
+    max_body — предел Content-Length всего запроса (по умолчанию сумма лимитов + FORM_OVERHEAD).
+    """
+
+    def __init__(self, request=None, caps=None, dirs=None, groups=None, max_body=None):
+        super().__init__(request)
+        self.caps = caps or {}
+        self.dirs = dirs or {}
+        self.groups = groups or {}
+        self.received = set()  # группы, файл которых уже принят
+        self.max_body = max_body or sum(self.caps.values()) + FORM_OVERHEAD
+        # self.file существует только пока принимается файл: MultiPartParser._close_files (при SkipFile)
+        # закрывает handler.file любого обработчика, у которого такой атрибут есть
+        self.digest = None
+        self.cap = 0
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length and content_length > self.max_body:
+            raise UploadTooLarge(f"Запрос больше допустимого ({content_length} байт).")
+        return None
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.cap = self.caps.get(field_name, 0)
+        if not self.cap or self.groups.get(field_name, field_name) in self.received:
+            raise SkipFile()
+        if content_length and content_length > self.cap:
+            raise self._too_large()
+        directory = self.dirs.get(field_name)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = StreamedUploadFile(file_name, content_type, charset, content_type_extra, directory)
+        self.digest = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.cap:
+            self._drop()
+            raise self._too_large()
+        self.file.write(raw_data)
+        self.digest.update(raw_data)
+        return None  # дальше по цепочке обработчиков кусок не передаём
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.digest.hexdigest()
+        self.received.add(self.groups.get(self.field_name, self.field_name))
+        return self.__dict__.pop("file")
+
+    def upload_interrupted(self):
+        self._drop()
+
+    def _drop(self):
+        f = self.__dict__.pop("file", None)
+        if f is not None:
+            f.close()  # NamedTemporaryFile удаляет себя сам
+
+    def _too_large(self):
+        return UploadTooLarge(f"Файл в поле '{self.field_name}' больше {self.cap // (1024 * 1024)} МБ.")
+
+
+def upload_dir(field) -> str | None:
+    """Каталог upload_to поля модели в файловом хранилище (для S3 и т.п. — None)."""
+    upload_to = field.upload_to if isinstance(field.upload_to, str) else ""
+    try:
+        return field.storage.path(upload_to)
+    except NotImplementedError:
+        return None
+
+
+def store(field, f) -> str:
+    """
+    Сохраняет загруженный файл в хранилище поля модели и возвращает имя. Файл с тем же sha256, который
+    уже лежит в хранилище, второй раз не сохраняется — возвращается имя существующего (файл становится общим
+    для нескольких записей, см. описание модуля: удалять его по одной из них нельзя).
+    """
+    from news.models import UploadBlob
+
+    storage = field.storage
+    sha = getattr(f, "sha256", "")
+    if sha:
+        blob = UploadBlob.objects.filter(sha256=sha).first()
+        if blob is not None and storage.exists(blob.name):
+            log.info("upload_stream: %s совпадает с %s, копия не сохраняется", f.name, blob.name)
+            return blob.name
+    name = storage.save(field.generate_filename(None, f.name), f)
+    if sha:
+        UploadBlob.objects.update_or_create(sha256=sha, defaults={"name": name, "size": f.size})
+    return name
+
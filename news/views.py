@@ -9,8 +9,11 @@
 #   ✅ UniversalNewsDetailView — отдаёт Article или ImportedNews по slug
 #   ♻️ Удалено (для корректности): вложенная функция suggest_news внутри класса RelatedNewsViewUniversal,
 #      а также дублирующие импорты DRF (они мешали статическому анализу). Функционала не лишились.
+#   ✅ Поиск (SearchView / SmartSearchViewEnhanced) — по хранимому взвешенному search_vector с GIN-индексом
+#      (news/utils/search.py), tsvector больше не пересчитывается по всей таблице на каждый запрос
+#   ✅ На SQLite — FTS5-индекс (bm25, префиксы слов); умный поиск отдаёт snippet с подсветкой <mark>
+#   ✅ «Похожие»: title__icontains идёт по триграммному индексу, порядок — по похожести заголовка (utils/trigram.py)
 
-from django.db import connection
 from django.db.models import Q, Count, F, Value, CharField
 from django.db.models.functions import Length, Coalesce
 from django.http import JsonResponse
@@ -30,6 +33,8 @@ import json
 
 from .models import Article, Category, ImportedNews
 from .serializers import ArticleSerializer, ImportedNewsSerializer, CategorySerializer
+from .utils import trigram
+from .utils.search import attach_snippets, search
 
 
 # ===========================================================
@@ -379,25 +384,9 @@ class SearchView(APIView):
         if not raw_q:
             return Response({"results": [], "count": 0})
 
-        vendor = connection.vendor
-        is_pg = vendor == "postgresql"
-
-        article_qs = Article.objects.filter(status="PUBLISHED")
-        imported_qs = ImportedNews.objects.all()
-
-        if is_pg:
-            # Упрощённый websearch (GIN)
-            article_qs = article_qs.extra(
-                where=["to_tsvector('russian', coalesce(title,'') || ' ' || coalesce(content,'')) @@ plainto_tsquery('russian', %s)"],
-                params=[raw_q]
-            )
-            imported_qs = imported_qs.extra(
-                where=["to_tsvector('russian', coalesce(title,'') || ' ' || coalesce(summary,'')) @@ plainto_tsquery('russian', %s)"],
-                params=[raw_q]
-            )
-        else:
-            article_qs = article_qs.filter(Q(title__icontains=raw_q) | Q(content__icontains=raw_q))
-            imported_qs = imported_qs.filter(Q(title__icontains=raw_q) | Q(summary__icontains=raw_q))
+        # PostgreSQL: search_vector + GIN; SQLite: FTS5 (префиксы); иначе icontains (news/utils/search.py)
+        article_qs = search(Article.objects.filter(status="PUBLISHED"), raw_q)
+        imported_qs = search(ImportedNews.objects.all(), raw_q)
 
         article_data = ArticleSerializer(article_qs, many=True, context={"request": request}).data
         imported_data = ImportedNewsSerializer(imported_qs, many=True, context={"request": request}).data
@@ -412,8 +401,6 @@ class SearchView(APIView):
 # УМНЫЙ ПОИСК (GIN)
 # ===========================================================
 
-from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank
-
 class SmartSearchViewEnhanced(APIView):
     permission_classes = [permissions.AllowAny]
 
@@ -422,28 +409,16 @@ class SmartSearchViewEnhanced(APIView):
         if not q:
             return Response({"results": [], "count": 0})
 
-        is_pg = connection.vendor == "postgresql"
-
-        if is_pg:
-            query = SearchQuery(q, search_type="websearch", config="russian")
-            article_qs = (
-                Article.objects.filter(status="PUBLISHED")
-                .annotate(rank=SearchRank(SearchVector("title", "content"), query))
-                .filter(rank__gte=0.1)
-                .order_by("-rank")[:50]
-            )
-            imported_qs = (
-                ImportedNews.objects
-                .annotate(rank=SearchRank(SearchVector("title", "summary"), query))
-                .filter(rank__gte=0.1)
-                .order_by("-rank")[:50]
-            )
-        else:
-            article_qs = Article.objects.filter(status="PUBLISHED", title__icontains=q)
-            imported_qs = ImportedNews.objects.filter(title__icontains=q)
+        # websearch-синтаксис, ранг по взвешенному search_vector / bm25 (заголовок важнее текста), сниппеты с <mark>
+        articles = list(search(Article.objects.filter(status="PUBLISHED"), q, search_type="websearch",
+                               rank=True, min_rank=0.1, title_only=True, snippet=True)[:50])
+        imported = list(search(ImportedNews.objects.all(), q, search_type="websearch",
+                               rank=True, min_rank=0.1, title_only=True, snippet=True)[:50])
 
-        article_data = ArticleSerializer(article_qs, many=True, context={"request": request}).data
-        imported_data = ImportedNewsSerializer(imported_qs, many=True, context={"request": request}).data
+        article_data = ArticleSerializer(articles, many=True, context={"request": request}).data
+        imported_data = ImportedNewsSerializer(imported, many=True, context={"request": request}).data
+        attach_snippets(articles, article_data)
+        attach_snippets(imported, imported_data)
 
         combined = deduplicate(article_data + imported_data)
         combined.sort(key=lambda x: x.get("published_at") or x.get("created_at") or "", reverse=True)
@@ -542,25 +517,24 @@ def related_news(request, *args, **kwargs):
 
     title = getattr(current, "title", "") or ""
     terms = [t for t in title.split() if len(t) > 3]
-    query = Q()
-    for t in terms:
-        query |= Q(title__icontains=t)
+    # OR из title__icontains — в PostgreSQL по триграммному индексу; самые похожие заголовки первыми
+    query = trigram.contains_any(["title"], terms)
 
     if type_ == "article":
         qs = (
             Article.objects.filter(status="PUBLISHED")
             .exclude(pk=current.pk)
             .filter(query)
-            .order_by("-published_at")[:max_results]
         )
+        qs = trigram.by_similarity(qs, "title", title, "-published_at")[:max_results]
         data = ArticleSerializer(qs, many=True, context={"request": request}).data
     else:
         qs = (
             ImportedNews.objects.filter(source_fk=getattr(current, "source_fk", None))
             .exclude(pk=current.pk)
             .filter(query)
-            .order_by("-published_at")[:max_results]
         )
+        qs = trigram.by_similarity(qs, "title", title, "-published_at")[:max_results]
         data = ImportedNewsSerializer(qs, many=True, context={"request": request}).data
 
     return JsonResponse({"results": data[:max_results]})
@@ -6,16 +6,33 @@
 # Совместимость: ничего существующего НЕ удаляет. Только расширяет возможности скачивания.
 # Обновления:
 #   ✅ _make_headers(src): добавлен корректный Referer (схема+хост) и UA — меньше анти-хотлинк 403
-#   ✅ _download_to_bytes: если http дал 403/404/415 — пробуем https (и наоборот), прежде чем сдаёмся
+#   ✅ _fetch_original: если http дал 403/404/415 — пробуем https (и наоборот), прежде чем сдаёмся
+#   ✅ Все варианты миниатюр делаются из одного закэшированного оригинала (image_proxy.download_original)
 #   ✅ Остальная логика (ETag/304/Last-Modified/UnsharpMask/AVIF→WEBP fallback/SSRF) — без изменений
-
+#   ✅ single-flight: одновременные промахи по одному ключу генерируют миниатюру один раз (utils/thumb_cache.py)
+#   ✅ Файлы кэша пишутся атомарно (временный файл + rename) — нельзя отдать недописанный файл
+#   ✅ Быстрое декодирование (JPEG draft / reduce), профили кодировщика, AVIF проверяется один раз при старте
+#   ✅ Кэш разложен по подпапкам ab/cd/<key>.<ext>, обращения пишутся в индекс; размер держит thumbcache_gc
+#   ✅ Рендер — в ограниченном пуле процессов; при переполнении очереди отдаём оригинал / плейсхолдер / 503
+#   ✅ Именованные пресеты (?preset=card) и их предгенерация после импорта (pregenerate, задача news.pregen_thumbnails)
+#   ✅ Подписанные ссылки (&sig=) и политика THUMB_URL_POLICY: open | presets | signed (utils/thumb_urls.py)
+#   ✅ DNS для SSRF-проверки кэшируется, а загрузка подключается к уже проверенному IP (без DNS rebinding)
+#   ✅ Попадания в кэш можно отдавать через nginx/Apache: X-Accel-Redirect / X-Sendfile (MEDIA_SENDFILE)
+#   ✅ Общий кэш для всех узлов за балансировщиком: Django Storage (THUMB_STORAGE) + индекс в БД, диск узла —
+#      локальный слой «читаем насквозь» (utils/thumb_store.py)
+#   ✅ Одинаковые картинки под разными URL (dHash, utils/image_dedup.py) делят отрендеренные варианты
+#   ✅ Негативный кэш битых URL с TTL по причине и счётчик отказов хоста: вместо повторной загрузки — плейсхолдер
+#   ✅ src на собственный /media/ (абсолютный URL от фронта) сводится к имени файла — ключ кэша тот же,
+#      что у предгенерированных миниатюр (utils/thumb_urls.normalize_src)
+#   ✅ Локальный src не выходит за MEDIA_ROOT (realpath + commonpath); при перегрузке оригинал отдаётся,
+#      только если это действительно картинка, иначе — плейсхолдер
+
+import atexit
 import hashlib
-import io
 import mimetypes
 import os
 import re
 import time
-import socket
 from urllib.parse import urlparse, unquote
 
 from django.conf import settings
@@ -23,35 +40,51 @@ from django.http import (
     FileResponse,
     HttpResponse,
     HttpResponseBadRequest,
+    HttpResponseForbidden,
     HttpResponseNotFound,
+    JsonResponse,
 )
 from django.views.decorators.http import require_GET
 
-from PIL import Image, ImageOps, ImageFilter
-import requests
-import ipaddress
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from news.image_proxy import download_original
+from news.utils import image_dedup, image_failures, thumb_store
+from news.utils.image_failures import KnownBadImage
+from news.utils.safe_dns import is_safe_host
+from news.utils.sendfile import send_file
+from news.utils.image_tools import encode_image, make_placeholder
+from news.utils.thumb_pool import PoolBusy, get_pool
+from news.utils.thumb_render import output_format, render_path
+from news.utils.thumb_urls import get_policy, normalize_src, preset_params, verify
+from news.utils.thumb_cache import AccessIndex, atomic_write, bump, get_stats, shard_path, single_flight
 
 # --- Настройки/пути кэша ---
 MEDIA_CACHE_DIR = os.path.join(getattr(settings, "MEDIA_ROOT", "media"), "cache", "thumbs")
 os.makedirs(MEDIA_CACHE_DIR, exist_ok=True)
+LOCK_DIR = os.path.join(MEDIA_CACHE_DIR, ".locks")
+# индекс обращений (размер/последнее чтение/число попаданий) и счётчики bump() — для thumbcache_gc и /stats/;
+# сам файл индекса — вне MEDIA_ROOT (THUMB_INDEX_PATH)
+THUMB_INDEX = AccessIndex(MEDIA_CACHE_DIR, path=getattr(settings, "THUMB_INDEX_PATH", None), stats=True)
+atexit.register(THUMB_INDEX.flush)
+# сколько ждать чужую генерацию той же миниатюры, прежде чем делать её самим
+LOCK_TIMEOUT = getattr(settings, "THUMB_LOCK_TIMEOUT", 20.0)
+# draft()/reduce() перед финальным LANCZOS (news/utils/thumb_render.py)
+FAST_DECODE = getattr(settings, "THUMB_FAST_DECODE", True)
+# что отдавать, когда пул рендера перегружен: original | placeholder | 503
+OVERLOAD_MODE = str(getattr(settings, "THUMB_OVERLOAD_MODE", "original")).lower()
+OVERLOAD_RETRY_AFTER = int(getattr(settings, "THUMB_OVERLOAD_RETRY_AFTER", 5))
+# именованные размеры (?preset=card) — их же заранее рендерит pregenerate() после импорта
+THUMB_PRESETS = getattr(settings, "THUMB_PRESETS", {})
+# сколько браузеру/CDN держать плейсхолдер вместо битой картинки (потом спросит снова)
+NEGATIVE_MAX_AGE = int(getattr(settings, "THUMB_NEGATIVE_MAX_AGE", 600))
 
 # --- Базовые лимиты/качество ---
 DEFAULT_QUALITY = 82
 MAX_W, MAX_H = 4096, 2160
-MAX_ORIGINAL_BYTES = 10 * 1024 * 1024  # 10MB
-REQUEST_TIMEOUT = (6.0, 12.0)  # (connect, read)
-
-# --- Простейшая защита от SSRF: запрещаем приватные/loopback адреса ---
-_PRIVATE_NETS = [
-    ipaddress.ip_network("127.0.0.0/8"),
-    ipaddress.ip_network("10.0.0.0/8"),
-    ipaddress.ip_network("172.16.0.0/12"),
-    ipaddress.ip_network("192.168.0.0/16"),
-    ipaddress.ip_network("::1/128"),
-    ipaddress.ip_network("fc00::/7"),
-]
-
+# лимит размера и таймауты оригинала — THUMB_MAX_ORIGINAL_BYTES / THUMB_REQUEST_TIMEOUT (news/image_proxy.py)
 
+# --- Защита от SSRF: публичные адреса, DNS с кэшем, соединение к проверенному IP (utils/safe_dns.py) ---
 def _is_safe_url(url: str) -> bool:
     try:
         u = urlparse(url)
@@ -60,14 +93,8 @@ def _is_safe_url(url: str) -> bool:
         if not u.netloc:
             # относительные пути к MEDIA считаем безопасными здесь (проверим позже)
             return True
-        # DNS → IP и проверка сетей
-        infos = socket.getaddrinfo(u.hostname, None)
-        ips = {info[4][0] for info in infos}
-        for ip in ips:
-            ip_obj = ipaddress.ip_address(ip)
-            if any(ip_obj in n for n in _PRIVATE_NETS):
-                return False
-        return True
+        # DNS → IP (кэш THUMB_DNS_TTL) и проверка сетей; загрузка потом идёт ровно на эти IP
+        return is_safe_host(u.hostname)
     except Exception:
         return False
 
@@ -91,27 +118,6 @@ def _make_headers(src_url: str) -> dict:
     return headers
 
 
-def _download_to_bytes_once(url: str, timeout=REQUEST_TIMEOUT, max_bytes=MAX_ORIGINAL_BYTES) -> bytes:
-    """Один заход загрузки. Поднимает исключение при любой проблеме."""
-    headers = _make_headers(url)
-    with requests.get(url, stream=True, timeout=timeout, headers=headers, allow_redirects=True) as r:
-        r.raise_for_status()
-        ct = (r.headers.get("Content-Type") or "").split(";")[0].strip().lower()
-        if not ct.startswith("image/"):
-            # Иногда отдают HTML-заглушку / SVG без image/* — пробовать дальше смысла нет
-            raise ValueError(f"content-type not image: {ct or 'unknown'}")
-        total = 0
-        bio = io.BytesIO()
-        for chunk in r.iter_content(64 * 1024):
-            if not chunk:
-                continue
-            total += len(chunk)
-            if total > max_bytes:
-                raise ValueError("image too large")
-            bio.write(chunk)
-        return bio.getvalue()
-
-
 def _flip_scheme(url: str) -> str | None:
     """Меняем http↔https, если возможно."""
     try:
@@ -125,43 +131,61 @@ def _flip_scheme(url: str) -> str | None:
     return None
 
 
-def _download_to_bytes(url: str, timeout=REQUEST_TIMEOUT, max_bytes=MAX_ORIGINAL_BYTES) -> bytes:
+def _fetch_original(url: str) -> str:
     """
-    Скачиваем картинку (стримом), ограничиваем размер, проверяем Content-Type.
-    NEW: если первый заход не удался по типичным сетевым причинам (403/404/415/SSLError) —
-         пробуем альтернативную схему (http↔https).
+    Путь к оригиналу в общем дисковом кэше (news/image_proxy.download_original): источник качается
+    один раз на картинку, а не на каждый размер/формат/качество.
+    Если первый заход не удался по типичным сетевым причинам (403/404/415/SSLError) —
+    пробуем альтернативную схему (http↔https); результат кэшируется под исходным URL.
+    Окончательный отказ попадает в негативный кэш (utils/image_failures.py) — KnownBadImage,
+    и следующие запросы к этому URL в сеть уже не ходят.
     """
+    image_failures.check(url)
     try:
-        return _download_to_bytes_once(url, timeout=timeout, max_bytes=max_bytes)
+        path = download_original(url, headers=_make_headers(url))
     except Exception as e:
         msg = str(getattr(e, "args", [e])[0]).lower()
         try_alt = any(code in msg for code in ("403", "404", "415", "ssl", "certificate", "forbidden", "not found"))
         alt = _flip_scheme(url) if try_alt else None
-        if alt:
-            return _download_to_bytes_once(alt, timeout=timeout, max_bytes=max_bytes)
-        raise
+        try:
+            if not alt:
+                raise
+            path = download_original(url, headers=_make_headers(alt), fetch_url=alt)
+        except Exception:
+            # причина — по ответу на исходный адрес (404 важнее, чем «https на этом хосте не слушает»)
+            reason = image_failures.classify(e)
+            image_failures.mark_bad(url, reason)
+            raise KnownBadImage(reason) from e
+    image_failures.mark_ok(url)
+    return path
 
 
-def _open_image_from_source(src: str) -> Image.Image:
-    """Открываем PIL.Image из URL или MEDIA-файла, учитываем EXIF-ориентацию."""
+def _source_path(src: str) -> str:
+    """Локальный путь к исходнику: оригинал из дискового кэша (для URL) или файл внутри MEDIA_ROOT."""
     if re.match(r"^https?://", src or ""):
         if not _is_safe_url(src):
             raise ValueError("unsafe url")
-        raw = _download_to_bytes(src)
-        im = Image.open(io.BytesIO(raw))
-        im = ImageOps.exif_transpose(im)
-        return im
+        return _fetch_original(src)
 
     # относительный путь внутри MEDIA_ROOT
     media_root = getattr(settings, "MEDIA_ROOT", "")
     if not media_root:
         raise FileNotFoundError("MEDIA_ROOT is not configured")
-    abs_path = os.path.join(media_root, src.lstrip("/"))
+    # ../ и симлинки наружу не пускаем: после realpath путь обязан остаться внутри MEDIA_ROOT;
+    # скрытые файлы (.part-*, служебные) — как в serve_media, 404
+    root = os.path.realpath(media_root)
+    abs_path = os.path.realpath(os.path.join(root, src.lstrip("/")))
+    rel = os.path.relpath(abs_path, root)
+    if os.path.commonpath([root, abs_path]) != root or any(p.startswith(".") for p in rel.split(os.sep)):
+        raise FileNotFoundError("file not found")
     if not os.path.isfile(abs_path):
         raise FileNotFoundError("file not found")
-    im = Image.open(abs_path)
-    im = ImageOps.exif_transpose(im)
-    return im
+    return abs_path
+
+
+def _open_image_from_source(src: str) -> Image.Image:
+    """Открываем PIL.Image из URL или MEDIA-файла, учитываем EXIF-ориентацию."""
+    return ImageOps.exif_transpose(Image.open(_source_path(src)))
 
 
 def _build_cache_key(src: str, w: int, h: int, q: int, fmt: str, fit: str, sharpen: int) -> str:
@@ -169,20 +193,227 @@ def _build_cache_key(src: str, w: int, h: int, q: int, fmt: str, fit: str, sharp
     return hsh
 
 
+def _thumb_ext(fmt: str) -> str:
+    return ".webp" if fmt == "webp" else ".jpg" if fmt in ("jpg", "jpeg") else f".{fmt}"
+
+
+def _cached_file(cache_key: str, ext: str) -> str:
+    """Путь файла в шардированном кэше; файл из старого «плоского» кэша при первом обращении переносится."""
+    path = shard_path(MEDIA_CACHE_DIR, cache_key, ext)
+    if not os.path.isfile(path):
+        legacy = os.path.join(MEDIA_CACHE_DIR, cache_key + ext)
+        if os.path.isfile(legacy):
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(legacy, path)
+                THUMB_INDEX.add(cache_key, path, os.path.getsize(path))
+            except OSError:
+                return legacy
+    return path
+
+
+def _canonical_cache_key(src: str, w: int, h: int, q: int, fmt: str, fit: str, sharpen: int) -> str | None:
+    """Ключ варианта, общего для всех URL одной канонической картинки (news/utils/image_dedup.py), или None."""
+    canonical_id = image_dedup.canonical_id_for_url(src)
+    if not canonical_id:
+        return None
+    return _build_cache_key(f"canonical:{canonical_id}", w, h, q, fmt, fit, sharpen)
+
+
+def _share_variant(src_path: str, dst_path: str) -> bool:
+    """Жёсткая ссылка dst_path → src_path (байты на диске одни). False — если src_path нет."""
+    if not os.path.isfile(src_path):
+        return False
+    if os.path.isfile(dst_path):
+        return True
+    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+    tmp = f"{dst_path}.tmp-link-{os.getpid()}"
+    try:
+        os.link(src_path, tmp)
+        os.replace(tmp, dst_path)
+        return True
+    except OSError:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        return False
+
+
+def _http_date(ts: float) -> str:
+    return time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(ts))
+
+
+def _not_modified(etag: str, mtime: float | None) -> HttpResponse:
+    resp = HttpResponse(status=304)
+    resp["ETag"] = etag
+    resp["Cache-Control"] = "public, max-age=31536000, immutable"
+    if mtime:
+        resp["Last-Modified"] = _http_date(mtime)
+    resp["X-Thumb-Cache"] = "HIT-304"
+    bump("thumb_hit")
+    return resp
+
+
+def _shared_hit(cache_key: str, cache_path: str, inm: str = "") -> HttpResponse | None:
+    """
+    Миниатюра, которую уже отрендерил другой узел (общее хранилище THUMB_STORAGE, utils/thumb_store.py), или None.
+    С локальным слоем копируется на диск узла и дальше отдаётся как обычное попадание; без него — читается из Storage.
+    """
+    entry = thumb_store.lookup(cache_key)
+    if entry is None:
+        return None
+    thumb_store.touch(cache_key)
+    created = entry["created_at"].timestamp()
+    if inm and inm == cache_key:
+        return _not_modified(cache_key, created)
+    if thumb_store.local_layer():
+        if not thumb_store.pull(cache_key, entry, cache_path):
+            return None
+        THUMB_INDEX.add(cache_key, cache_path, entry["size"])
+        resp = _send_file_cached(cache_path, cache_key)
+    else:
+        content_type = entry["content_type"] or "image/webp"
+        path = thumb_store.storage_path(entry)
+        if path:
+            try:
+                resp = send_file(path, content_type)
+            except FileNotFoundError:
+                thumb_store.forget([cache_key])
+                return None
+        else:
+            f = thumb_store.open_file(cache_key, entry)
+            if f is None:
+                return None
+            resp = FileResponse(f, content_type=content_type)
+        resp["Cache-Control"] = "public, max-age=31536000, immutable"
+        resp["ETag"] = cache_key
+        resp["Last-Modified"] = _http_date(created)
+    resp["X-Thumb-Cache"] = "HIT-SHARED"
+    bump("thumb_hit")
+    return resp
+
+
+def _store(cache_key: str, cache_path: str, fmt: str, data: bytes) -> None:
+    """Готовая миниатюра — на диск узла (локальный слой) и в общее хранилище, если оно настроено."""
+    if thumb_store.local_layer():
+        atomic_write(cache_path, data)
+        THUMB_INDEX.add(cache_key, cache_path, len(data))
+    if thumb_store.enabled():
+        thumb_store.put(cache_key, _thumb_ext(fmt), data, mimetypes.guess_type(cache_path)[0] or "image/webp")
+
+
 def _send_file_cached(cache_path: str, etag: str):
-    """Готовим FileResponse c корректными кэш-заголовками и 304 при If-None-Match."""
-    resp = FileResponse(open(cache_path, "rb"), content_type=mimetypes.guess_type(cache_path)[0] or "image/webp")
+    """
+    Ответ из кэша c корректными кэш-заголовками. Байты отдаёт Django (FileResponse) или, при MEDIA_SENDFILE,
+    фронт-прокси по X-Accel-Redirect / X-Sendfile (utils/sendfile.py).
+    """
+    resp = send_file(cache_path, mimetypes.guess_type(cache_path)[0] or "image/webp")
     resp["Cache-Control"] = "public, max-age=31536000, immutable"  # 1 год
     resp["ETag"] = etag
     try:
-        mtime = os.path.getmtime(cache_path)
-        resp["Last-Modified"] = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(mtime))
+        resp["Last-Modified"] = _http_date(os.path.getmtime(cache_path))
     except Exception:
         pass
     resp["X-Thumb-Cache"] = "HIT"
     return resp
 
 
+def _render_thumbnail(path: str, w: int, h: int, q: int, fmt: str, fit: str, sharpen: int,
+                      profile: str = "ondemand", pooled: bool = True) -> bytes:
+    """
+    Ресайзит/кадрирует, повышает резкость и кодирует исходник path (news/utils/thumb_render.py).
+    pooled=True — в пуле процессов (news/utils/thumb_pool.py); при перегрузке бросает PoolBusy.
+    """
+    if pooled:
+        return get_pool().render(path, w, h, q, fmt, fit, sharpen, profile=profile, fast=FAST_DECODE)
+    return render_path(path, w, h, q, fmt, fit, sharpen, profile=profile, fast=FAST_DECODE)
+
+
+def _overload_response(path: str, w: int, h: int, q: int, fmt: str) -> HttpResponse:
+    """
+    Ответ, когда пул рендера перегружен (THUMB_OVERLOAD_MODE). Ничего не кладём в кэш
+    и запрещаем долгое кэширование — следующий запрос получит настоящую миниатюру.
+    """
+    mode = OVERLOAD_MODE
+    content_type = _image_type(path) if mode == "original" else None
+    if mode == "original" and not content_type:
+        mode = "placeholder"  # оригинал как есть отдаём, только если Pillow узнал в нём картинку
+    if mode == "503":
+        resp = HttpResponse("thumbnail renderer is busy", status=503, content_type="text/plain")
+        resp["Retry-After"] = str(OVERLOAD_RETRY_AFTER)
+    elif mode == "placeholder":
+        data, placeholder_type = encode_image(make_placeholder(w, h), fmt, q)
+        resp = HttpResponse(data, content_type=placeholder_type)
+    else:  # original
+        resp = send_file(path, content_type)
+    resp["Cache-Control"] = "no-store" if mode == "503" else "public, max-age=60"
+    resp["X-Thumb-Cache"] = f"BUSY-{mode.upper()}"
+    bump("thumb_busy")
+    return resp
+
+
+def _negative_response(w: int, h: int, q: int, fmt: str, reason: str) -> HttpResponse:
+    """
+    Плейсхолдер вместо битой картинки. Он сам лежит в кэше миниатюр (один файл на размер/формат),
+    а короткий max-age даёт источнику шанс «ожить» к истечению TTL негативного кэша.
+    """
+    fmt = "png" if fmt == "png" else "jpg" if fmt in ("jpg", "jpeg") else "webp"
+    key = _build_cache_key("placeholder:", w, h, q, fmt, "cover", 0)
+    path = _cached_file(key, _thumb_ext(fmt))
+    if not os.path.isfile(path):
+        data, _ = encode_image(make_placeholder(w, h), fmt, q)
+        atomic_write(path, data)
+        THUMB_INDEX.add(key, path, len(data))
+    else:
+        THUMB_INDEX.touch(key)
+    resp = send_file(path, mimetypes.guess_type(path)[0] or "image/webp")
+    resp["Cache-Control"] = f"public, max-age={NEGATIVE_MAX_AGE}"
+    resp["X-Thumb-Cache"] = "NEGATIVE"
+    resp["X-Thumb-Error"] = reason
+    bump("thumb_negative")
+    return resp
+
+
+def _image_type(path: str) -> str | None:
+    """
+    MIME оригинала по сигнатуре (Pillow читает только заголовок), а не по расширению.
+    None — не растровая картинка: такой файл клиенту как есть не отдаём.
+    """
+    try:
+        with Image.open(path) as im:
+            return Image.MIME.get(im.format)
+    except Exception:
+        return None
+
+
+def pregenerate(src: str, presets=None) -> dict:
+    """
+    Рендерит миниатюры src для пресетов (по умолчанию THUMB_PREGEN_PRESETS) тем же ключом кэша,
+    что и thumbnail_proxy, — первый посетитель сразу попадает в кэш. Вызывается из фоновой задачи
+    news.pregen_thumbnails и команды pregen_thumbnails; рендер идёт в текущем процессе, профилем pregen.
+    """
+    src = normalize_src(unquote(src))  # как в thumbnail_proxy — иначе ключи кэша не совпадут
+    names = presets or getattr(settings, "THUMB_PREGEN_PRESETS", tuple(THUMB_PRESETS))
+    stats = {"rendered": 0, "cached": 0}
+    path = None
+    for name in names:
+        if name not in THUMB_PRESETS:
+            raise ValueError(f"unknown preset {name!r}")
+        p = preset_params(name)
+        fmt = output_format(p["fmt"])
+        q, fit, sharpen = p["q"], p["fit"], p["sharpen"]
+        cache_key = _build_cache_key(src, p["w"], p["h"], q, fmt, fit, sharpen)
+        cache_path = _cached_file(cache_key, _thumb_ext(fmt))
+        with single_flight(cache_key, LOCK_DIR, timeout=LOCK_TIMEOUT):
+            if os.path.isfile(cache_path) or thumb_store.lookup(cache_key):
+                stats["cached"] += 1
+                continue
+            path = path or _source_path(src)
+            data = _render_thumbnail(path, p["w"], p["h"], q, fmt, fit, sharpen, profile="pregen", pooled=False)
+            _store(cache_key, cache_path, fmt, data)
+            stats["rendered"] += 1
+    return stats
+
+
 @require_GET
 def thumbnail_proxy(request):
     """
@@ -190,6 +421,8 @@ def thumbnail_proxy(request):
     fit: cover | contain
     fmt: webp | jpeg | jpg | png | avif (если доступен)
     sharpen: 0..2 (0=нет, 1=умеренно, 2=сильнее)
+    preset: card | hero | ... (THUMB_PRESETS) — значения по умолчанию для w/h/q/fmt/fit/sharpen
+    sig: HMAC-подпись параметров (thumb_urls.thumbnail_url); обязательна при THUMB_URL_POLICY=signed
     """
     src_raw = (request.GET.get("src") or "").strip()
     if not src_raw:
@@ -200,119 +433,134 @@ def thumbnail_proxy(request):
         src = unquote(src_raw)
     except Exception:
         src = src_raw
+    # свой /media/ (фронт шлёт абсолютный URL) — по имени файла, как у предгенерированных миниатюр
+    src = normalize_src(src, request.get_host())
+
+    # пресет задаёт значения по умолчанию; явные параметры запроса их перекрывают
+    preset = request.GET.get("preset")
+    if preset and preset not in THUMB_PRESETS:
+        return HttpResponseBadRequest("unknown preset")
+    defaults = preset_params(preset) if preset else {
+        "w": 480, "h": 270, "q": DEFAULT_QUALITY, "fmt": "webp", "fit": "cover", "sharpen": 1,
+    }
 
     # размеры
     try:
-        w = max(1, min(int(request.GET.get("w", "480")), MAX_W))
-        h = max(1, min(int(request.GET.get("h", "270")), MAX_H))
+        w = max(1, min(int(request.GET.get("w", defaults["w"])), MAX_W))
+        h = max(1, min(int(request.GET.get("h", defaults["h"])), MAX_H))
     except Exception:
         return HttpResponseBadRequest("bad size")
 
     # формат
-    fmt = (request.GET.get("fmt") or "webp").lower()
+    fmt = (request.GET.get("fmt") or defaults["fmt"]).lower()
     if fmt not in ("webp", "jpeg", "jpg", "png", "avif"):
         fmt = "webp"
+    fmt = output_format(fmt)  # avif без кодека → webp (до ключа кэша, чтобы расширение и тип совпадали)
     # качество
     q = request.GET.get("q")
     try:
-        q = int(q) if q is not None else DEFAULT_QUALITY
+        q = int(q) if q is not None else int(defaults["q"])
         q = max(40, min(q, 95))
     except Exception:
         q = DEFAULT_QUALITY
 
     # подрезка/вписывание
-    fit = (request.GET.get("fit") or "cover").lower()
+    fit = (request.GET.get("fit") or defaults["fit"]).lower()
     if fit not in ("cover", "contain"):
         fit = "cover"
 
     # резкость
     try:
-        sharpen = int(request.GET.get("sharpen", "1"))
+        sharpen = int(request.GET.get("sharpen", defaults["sharpen"]))
         sharpen = max(0, min(sharpen, 2))
     except Exception:
         sharpen = 1
 
+    # ограничение набора ключей кэша (THUMB_URL_POLICY, news/utils/thumb_urls.py)
+    policy = get_policy()
+    if policy != "open" and not verify(request.GET.get("sig", ""), src, w, h, q, fmt, fit, sharpen):
+        overridden = any(k in request.GET for k in ("w", "h", "q", "fmt", "fit", "sharpen"))
+        if policy == "signed" or not preset or overridden:
+            return HttpResponseForbidden("signed thumbnail url or preset required")
+
     cache_key = _build_cache_key(src, w, h, q, fmt, fit, sharpen)
-    ext = ".webp" if fmt == "webp" else ".jpg" if fmt in ("jpg", "jpeg") else f".{fmt}"
-    cache_path = os.path.join(MEDIA_CACHE_DIR, cache_key + ext)
+    cache_path = _cached_file(cache_key, _thumb_ext(fmt))
+    remote = bool(re.match(r"^https?://", src))
 
     # 304 Not Modified по If-None-Match
     inm = (request.headers.get("If-None-Match") or "").strip()
     if os.path.isfile(cache_path):
+        THUMB_INDEX.touch(cache_key)
+        thumb_store.touch(cache_key)  # иначе общий слой вытеснит то, что узлы отдают со своих дисков
         if inm and inm == cache_key:
-            resp = HttpResponse(status=304)
-            resp["ETag"] = cache_key
-            resp["Cache-Control"] = "public, max-age=31536000, immutable"
             try:
                 mtime = os.path.getmtime(cache_path)
-                resp["Last-Modified"] = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(mtime))
-            except Exception:
-                pass
-            resp["X-Thumb-Cache"] = "HIT-304"
+            except OSError:
+                mtime = None
+            return _not_modified(cache_key, mtime)
+        try:
+            resp = _send_file_cached(cache_path, cache_key)
+            bump("thumb_hit")
             return resp
-        return _send_file_cached(cache_path, cache_key)
+        except FileNotFoundError:
+            pass  # файл только что вытеснил thumbcache_gc — сгенерируем заново
 
-    # Генерация нового
-    try:
-        im = _open_image_from_source(src)
-
-        # выбор цветового режима (сохраняем альфа где возможно)
-        has_alpha = (im.mode in ("RGBA", "LA")) or ("transparency" in im.info)
-        target_mode = "RGBA" if (fmt in ("png", "webp", "avif") and has_alpha) else "RGB"
-        if target_mode == "RGB" and has_alpha:
-            # композит по белому для JPEG
-            bg = Image.new("RGB", im.size, (255, 255, 255))
-            bg.paste(im.convert("RGBA"), mask=im.convert("RGBA").split()[-1])
-            im = bg
-        else:
-            im = im.convert(target_mode)
+    # промах на узле — возможно, миниатюру уже сделал другой узел (общее хранилище)
+    resp = _shared_hit(cache_key, cache_path, inm)
+    if resp is not None:
+        return resp
 
-        # ресайз
-        if fit == "cover":
-            im = ImageOps.fit(im, (w, h), method=Image.LANCZOS, bleed=0.0, centering=(0.5, 0.5))
-        else:
-            im.thumbnail((w, h), Image.LANCZOS)
-
-        # лёгкая резкость
-        if sharpen == 1:
-            im = im.filter(ImageFilter.UnsharpMask(radius=1.2, percent=130, threshold=2))
-        elif sharpen >= 2:
-            im = im.filter(ImageFilter.UnsharpMask(radius=1.6, percent=160, threshold=2))
-
-        # сериализация
-        os.makedirs(MEDIA_CACHE_DIR, exist_ok=True)
-        buf = io.BytesIO()
-        save_fmt = "WEBP" if fmt == "webp" else "JPEG" if fmt in ("jpg", "jpeg") else fmt.upper()
-        save_kwargs = {"quality": q}
-
-        if save_fmt == "WEBP":
-            save_kwargs.update({"method": 6})
-        if save_fmt == "AVIF":
-            try:
-                im.save(buf, save_fmt, **save_kwargs)
-            except Exception:
-                buf = io.BytesIO()
-                save_fmt = "WEBP"
-                save_kwargs = {"quality": q, "method": 6}
-                im.save(buf, save_fmt, **save_kwargs)
-        else:
-            im.save(buf, save_fmt, **save_kwargs)
+    # Известная битая картинка (или лежащий хост) — сразу плейсхолдер, без ожидания блокировки и похода в сеть
+    bad_reason = image_failures.get_bad(src) if remote else None
+    if bad_reason:
+        return _negative_response(w, h, q, fmt, bad_reason)
 
-        data = buf.getvalue()
-        with open(cache_path, "wb") as f:
-            f.write(data)
+    # Генерация нового: один запрос генерирует, остальные с тем же ключом ждут и берут готовый файл
+    try:
+        with single_flight(cache_key, LOCK_DIR, timeout=LOCK_TIMEOUT):
+            if os.path.isfile(cache_path):
+                resp = _send_file_cached(cache_path, cache_key)
+                resp["X-Thumb-Cache"] = "HIT-WAIT"
+                bump("thumb_wait")
+                return resp
+            resp = _shared_hit(cache_key, cache_path)
+            if resp is not None:
+                return resp
+            bump("thumb_miss")
+            path = _source_path(src)
+            # та же картинка под другим URL (image_dedup): вариант мог уже быть отрендерен для «соседа»
+            # (варианты делятся жёсткими ссылками — только на диске узла)
+            share = remote and thumb_store.local_layer()
+            canon_key = _canonical_cache_key(src, w, h, q, fmt, fit, sharpen) if share else None
+            canon_path = _cached_file(canon_key, _thumb_ext(fmt)) if canon_key else None
+            if canon_path and _share_variant(canon_path, cache_path):
+                THUMB_INDEX.add(cache_key, cache_path, os.path.getsize(cache_path))
+                resp = _send_file_cached(cache_path, cache_key)
+                resp["X-Thumb-Cache"] = "HIT-CANONICAL"
+                bump("thumb_hit")
+                return resp
+            try:
+                data = _render_thumbnail(path, w, h, q, fmt, fit, sharpen)
+            except PoolBusy:
+                return _overload_response(path, w, h, q, fmt)
+            _store(cache_key, cache_path, fmt, data)
+            if canon_path and _share_variant(cache_path, canon_path):
+                THUMB_INDEX.add(canon_key, canon_path, len(data))
 
         resp = HttpResponse(data, content_type=mimetypes.guess_type(cache_path)[0] or "image/webp")
         resp["Cache-Control"] = "public, max-age=31536000, immutable"
         resp["ETag"] = cache_key
-        try:
-            mtime = os.path.getmtime(cache_path)
-            resp["Last-Modified"] = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(mtime))
-        except Exception:
-            pass
+        resp["Last-Modified"] = _http_date(time.time())
         resp["X-Thumb-Cache"] = "MISS"
         return resp
 
+    except KnownBadImage as e:
+        return _negative_response(w, h, q, fmt, e.reason)
+    except (UnidentifiedImageError, Image.DecompressionBombError) as e:
+        if not remote:
+            return HttpResponseBadRequest(f"thumbnail error: {e}")
+        image_failures.mark_bad(src, "decode")  # скачалось, но это не картинка — больше не качаем
+        return _negative_response(w, h, q, fmt, "decode")
     except FileNotFoundError as e:
         return HttpResponseNotFound(str(e))
     except ValueError as e:
@@ -322,3 +570,21 @@ def thumbnail_proxy(request):
         return HttpResponseBadRequest(f"thumbnail error: {msg}")
     except Exception as e:
         return HttpResponseBadRequest(f"thumbnail error: {e}")
+
+
+@require_GET
+def thumbnail_cache_stats(request):
+    """GET /api/media/thumbnail/stats/ — заполненность кэша миниатюр и доля попаданий (только для staff)."""
+    if not (request.user.is_authenticated and request.user.is_staff):
+        return HttpResponseForbidden("staff only")
+    THUMB_INDEX.flush()
+    totals = THUMB_INDEX.totals()
+    budget = int(getattr(settings, "THUMB_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+    return JsonResponse({
+        **totals,
+        "budget_bytes": budget,
+        "occupancy": round(totals["bytes"] / budget, 4) if budget else None,
+        "render_pending": get_pool().pending,
+        **get_stats(),
+        **thumb_store.totals(),
+    })
@@ -0,0 +1,156 @@
+# Путь: backend/news/views_media_serve.py
+# Назначение: Отдача загруженных медиа (/media/...: video_file, image_file, картинки редактора) с поддержкой
+#             HTTP Range. Браузер при перемотке видео запрашивает нужный кусок (206), а не качает файл заново.
+# Использование: подключается в backend/urls.py вместо django.views.static.serve — всегда при DEBUG, в проде
+#                при MEDIA_SERVE_DJANGO=True (обычно /media/ отдаёт nginx, и Range он умеет сам).
+# Что умеет:
+#   ✅ Range: один диапазон → 206 + Content-Range; несколько → 206 multipart/byteranges; невыполнимый → 416
+#   ✅ If-Range (ETag / Last-Modified): файл изменился — отдаём целиком (200), а не кусок новой версии
+#   ✅ ETag / Last-Modified, 304 на If-None-Match / If-Modified-Since, 412 на If-Match (get_conditional_response)
+#   ✅ HEAD — те же заголовки без тела; Accept-Ranges: bytes в каждом ответе
+#   ✅ Байты читаются из хранилища (default_storage) кусками MEDIA_RANGE_CHUNK — в памяти не больше куска
+#   ✅ При MEDIA_SENDFILE (nginx/xsendfile) файл с диска отдаёт фронт-прокси вместе с Range (utils/sendfile.py)
+#   ✅ Скрытые файлы (.part-* незавершённых загрузок) и выход за пределы хранилища — 404
+
+import hashlib
+import mimetypes
+import os
+import posixpath
+import uuid
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_http_methods
+
+from news.utils.byte_ranges import if_range_matches, parse_range
+from news.utils.sendfile import get_mode, send_file
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _chunk_size() -> int:
+    return int(getattr(settings, "MEDIA_RANGE_CHUNK", CHUNK_SIZE))
+
+
+def _storage_name(path: str) -> str:
+    name = posixpath.normpath(unquote(path)).lstrip("/")
+    if name in ("", ".") or name.startswith("..") or any(p.startswith(".") for p in name.split("/")):
+        raise Http404("Файл не найден")
+    return name
+
+
+def _stat(name: str) -> tuple[int, int | None]:
+    """(размер, mtime в секундах или None, если хранилище его не знает)."""
+    try:
+        size = default_storage.size(name)
+    except (FileNotFoundError, OSError, SuspiciousFileOperation):
+        raise Http404("Файл не найден")
+    try:
+        mtime = int(default_storage.get_modified_time(name).timestamp())
+    except (NotImplementedError, OSError):
+        mtime = None
+    return size, mtime
+
+
+def _etag(name: str, size: int, mtime: int | None) -> str:
+    if mtime is None:  # хранилище без времени изменения — привязываем к имени (одинаково на всех узлах)
+        return f'"{size:x}-{hashlib.md5(name.encode(), usedforsecurity=False).hexdigest()[:12]}"'
+    return f'"{size:x}-{mtime:x}"'
+
+
+def _read(name: str, ranges, chunk: int):
+    """Байты диапазонов [(start, end), ...] из хранилища кусками не больше chunk; между частями — разделители."""
+    with default_storage.open(name, "rb") as f:
+        for head, start, end in ranges:
+            if head:
+                yield head
+            f.seek(start)
+            left = end - start + 1
+            while left > 0:
+                data = f.read(min(chunk, left))
+                if not data:
+                    return
+                left -= len(data)
+                yield data
+
+
+def _local_path(name: str) -> str | None:
+    try:
+        return default_storage.path(name)
+    except NotImplementedError:
+        return None
+    except SuspiciousFileOperation:
+        raise Http404("Файл не найден")
+
+
+@require_http_methods(["GET", "HEAD"])
+def serve_media(request, path):
+    name = _storage_name(path)
+    local = _local_path(name)
+    if not (os.path.isfile(local) if local else default_storage.exists(name)):
+        raise Http404("Файл не найден")
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+    if get_mode() and local:
+        return send_file(local, content_type)  # nginx/Apache сам разберёт Range и If-Range
+
+    size, mtime = _stat(name)
+    etag = _etag(name, size, mtime)
+    resp = get_conditional_response(request, etag=etag, last_modified=mtime)
+    if resp is not None:
+        return resp
+
+    ranges = None
+    if "HTTP_RANGE" in request.META and if_range_matches(request.META.get("HTTP_IF_RANGE", ""), etag, mtime):
+        ranges = parse_range(request.META["HTTP_RANGE"], size)
+
+    if ranges == []:
+        resp = HttpResponse(status=416)
+        resp["Content-Range"] = f"bytes */{size}"
+        resp["Accept-Ranges"] = "bytes"
+        return resp
+
+    if not ranges:
+        status, parts, length = 200, [(b"", 0, size - 1)], size
+        headers = {"Content-Type": content_type}
+    elif len(ranges) == 1:
+        start, end = ranges[0]
+        status, parts, length = 206, [(b"", start, end)], end - start + 1
+        headers = {"Content-Type": content_type, "Content-Range": f"bytes {start}-{end}/{size}"}
+    else:
+        boundary = uuid.uuid4().hex
+        parts = [
+            (f"\r\n--{boundary}\r\nContent-Type: {content_type}\r\n"
+             f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n".encode("ascii"), start, end)
+            for start, end in ranges
+        ]
+        closing = f"\r\n--{boundary}--\r\n".encode("ascii")
+        status = 206
+        length = sum(len(head) + end - start + 1 for head, start, end in parts) + len(closing)
+        headers = {"Content-Type": f"multipart/byteranges; boundary={boundary}"}
+
+    if request.method == "HEAD" or size == 0:
+        resp = HttpResponse(status=status)
+    else:
+        body = _read(name, parts, _chunk_size())
+        if status == 206 and len(parts) > 1:
+            body = _with_tail(body, closing)
+        resp = StreamingHttpResponse(body, status=status)
+    for key, value in headers.items():
+        resp[key] = value
+    resp["Content-Length"] = str(length)
+    resp["Accept-Ranges"] = "bytes"
+    resp["ETag"] = etag
+    if mtime is not None:
+        resp["Last-Modified"] = http_date(mtime)
+    return resp
+
+
+def _with_tail(body, tail: bytes):
+    yield from body
+    yield tail
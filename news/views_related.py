@@ -17,7 +17,8 @@
 # Важно:
 # - Никаких жёстких зависимостей на PostgreSQL. Если есть pg_trgm — можно ускорить позже (см. комментарии).
 # - Масштабируемый фолбэк: даже при SQLite всё работает (схожесть заголовка по difflib.SequenceMatcher).
-# - Для больших баз можно прикрутить TrigramSimilarity и GIN-индексы отдельной миграцией (ниже даю пример).
+# - pg_trgm: мягкий поиск по слагу (trigram.closest: % + TrigramSimilarity) и совпадение домена (link__icontains)
+#   идут по триграммным GIN-индексам (миграция 0035_trigram_indexes, news/utils/trigram.py).
 
 from __future__ import annotations
 
@@ -36,6 +37,8 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
+from news.utils import trigram
+
 # --- МЯГКИЕ ИМПОРТЫ МОДЕЛЕЙ (если чего-то нет — просто пропустим) ---
 Article = None
 ImportedNews = None
@@ -137,11 +140,12 @@ def resolve_base_by_slug(raw_slug: str) -> Tuple[Optional[object], Optional[Type
         obj = _first(model.objects.filter(q))
         if obj:
             return obj
-        # Мягкий поиск при расхождениях
-        q2 = Q()
+        # Мягкий поиск при расхождениях: похожий (pg_trgm, %) или содержащий slug — самый похожий первым
         for f in fields:
-            q2 |= Q(**{f + "__startswith": slug}) | Q(**{f + "__icontains": slug})
-        return _first(model.objects.filter(q2))
+            obj = _first(trigram.closest(model.objects.all(), f, slug))
+            if obj:
+                return obj
+        return None
 
     # Приоритет: сначала Article, затем ImportedNews
     obj = hunt(Article) or hunt(ImportedNews)
@@ -198,10 +202,7 @@ def build_candidates(base: object, limit_each: int = 200) -> List[Tuple[str, int
         # 3) тот же домен
         if base_domain:
             # пробуем искать по url/link/ original_url
-            qdom = Q()
-            for f in ("original_url", "url", "link"):
-                if hasattr(model, f):
-                    qdom |= Q(**{f + "__icontains": base_domain})
+            qdom = trigram.contains_any([f for f in ("original_url", "url", "link") if hasattr(model, f)], [base_domain])
             if qdom.children:
                 part += list(order_recent(qs.filter(qdom))[:limit_each])
         # 4) просто свежие
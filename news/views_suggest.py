@@ -9,6 +9,11 @@
 #   ✅ Уникальный link (user://suggestion/<uuid4>) для безопасной идентификации
 #   ✅ Сохранение только тех полей ImportedNews, которые реально существуют
 #   ✅ Возвращает { ok, id, slug, detail_url } или осмысленную 4xx-ошибку
+#   ✅ reCAPTCHA проверяется до сохранения файлов: без пройденной капчи в MEDIA ничего не попадает
+#   ✅ Сохранённая картинка оптимизируется в фоне (задача news.optimize_upload, news/utils/upload_optimize.py)
+#   ✅ Файлы принимаются потоково (news/utils/upload_stream.py): лимиты SUGGEST_IMAGE_MAX_BYTES /
+#      SUGGEST_VIDEO_MAX_BYTES проверяются по ходу чтения — превышение сразу даёт 413, без приёма остатка;
+#      повторно присланный тот же файл (по sha256) не сохраняется второй раз
 
 from django.conf import settings
 from django.utils import timezone
@@ -24,6 +29,8 @@ import re
 
 # Импортируй свои модели. Если у тебя другие пути — поправь импорт.
 from .models import ImportedNews, Category
+from .tasks import enqueue_optimize_upload
+from .utils import upload_stream
 
 RECAPTCHA_VERIFY_URL = getattr(settings, "RECAPTCHA_VERIFY_URL", "https://www.google.com/recaptcha/api/siteverify")
 RECAPTCHA_SECRET_KEY = getattr(settings, "RECAPTCHA_SECRET_KEY", "")
@@ -31,6 +38,8 @@ RECAPTCHA_SECRET_KEY = getattr(settings, "RECAPTCHA_SECRET_KEY", "")
 # Ключи, которые может прислать фронт
 IMG_KEYS = ("image", "image_file", "photo")
 VID_KEYS = ("video", "video_file")
+IMAGE_MAX_BYTES = getattr(settings, "SUGGEST_IMAGE_MAX_BYTES", 10 * 1024 * 1024)
+VIDEO_MAX_BYTES = getattr(settings, "SUGGEST_VIDEO_MAX_BYTES", 150 * 1024 * 1024)
 CAPTCHA_KEYS = ("recaptcha_token", "g-recaptcha-response", "recaptcha", "captcha")
 
 
@@ -114,6 +123,57 @@ def _verify_recaptcha(token: str, remote_ip: str | None = None):
     return True, None, {"score": score, "action": data.get("action")}
 
 
+def _store_upload(field_name: str, f) -> str | None:
+    """Сохраняет загруженный файл в хранилище по upload_to поля модели. Возвращает имя файла."""
+    if f is None or not hasattr(ImportedNews, field_name):
+        return None
+    return upload_stream.store(ImportedNews._meta.get_field(field_name), f)
+
+
+def _upload_handlers(request):
+    """Один потоковый обработчик с лимитами по полям; временные файлы — в каталогах upload_to полей модели."""
+    image_dir = upload_stream.upload_dir(ImportedNews._meta.get_field("image_file"))
+    video_dir = upload_stream.upload_dir(ImportedNews._meta.get_field("video_file"))
+    caps = {**{k: IMAGE_MAX_BYTES for k in IMG_KEYS}, **{k: VIDEO_MAX_BYTES for k in VID_KEYS}}
+    dirs = {**{k: image_dir for k in IMG_KEYS}, **{k: video_dir for k in VID_KEYS}}
+    groups = {**{k: "image" for k in IMG_KEYS}, **{k: "video" for k in VID_KEYS}}
+    # на диск попадают одна картинка и одно видео, но прежний фронт (Api.suggestNews) слал каждый файл
+    # под всеми синонимами — тело такого запроса должно пройти, повторы обработчик пропускает
+    max_body = len(IMG_KEYS) * IMAGE_MAX_BYTES + len(VID_KEYS) * VIDEO_MAX_BYTES + upload_stream.FORM_OVERHEAD
+    return [upload_stream.CappedUploadHandler(request, caps=caps, dirs=dirs, groups=groups, max_body=max_body)]
+
+
+def create_suggestion(title, summary, category_slug=None, link="", image_name=None, video_name=None):
+    """Создаёт ImportedNews из предложения (капча уже проверена, файлы сохранены)."""
+    category = _resolve_category(category_slug)
+
+    # --- Уникальный slug
+    base = _slugify_title(title)
+    new_slug = _unique_slug(base)
+
+    # --- Уникальный link (без коллизий с реальными ссылками)
+    if not link:
+        # безопасный "виртуальный" линк — не пересечётся с реальными URL источников
+        link = f"user://suggestion/{uuid.uuid4()}"
+
+    # --- Сохранение (только существующие поля модели)
+    fields = {
+        "title": title,
+        "summary": summary or "",
+        "slug": new_slug,
+        "link": link,
+        "published_at": timezone.now(),  # черновик — но дата пригодится для сортировки
+    }
+    if category is not None and hasattr(ImportedNews, "category"):
+        fields["category"] = category
+    if image_name:
+        fields["image_file"] = image_name
+    if video_name:
+        fields["video_file"] = video_name
+
+    return ImportedNews.objects.create(**fields)
+
+
 class SuggestNewsView(APIView):
     """
     API для пользовательских предложений новости.
@@ -131,6 +191,11 @@ class SuggestNewsView(APIView):
     authentication_classes = []  # анонимам разрешаем
     permission_classes = []
 
+    def initial(self, request, *args, **kwargs):
+        # до первого обращения к request.data: после разбора тела обработчики уже не поменять
+        request._request.upload_handlers = _upload_handlers(request._request)
+        super().initial(request, *args, **kwargs)
+
     def post(self, request, *args, **kwargs):
         data = request.data
 
@@ -139,7 +204,7 @@ class SuggestNewsView(APIView):
         if not title:
             return Response({"detail": "Поле 'title' обязательно"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # --- 2) reCAPTCHA
+        # --- 2) reCAPTCHA — до сохранения файлов: пока они лишь во временных .part-файлах
         token = _pick_value(data, CAPTCHA_KEYS)
         ok, err, meta = _verify_recaptcha(token, request.META.get("REMOTE_ADDR"))
         if not ok:
@@ -152,44 +217,23 @@ class SuggestNewsView(APIView):
 
         # --- 4) Категория
         category_slug = (data.get("category") or "").strip().lower() or None
-        category = _resolve_category(category_slug)
 
         # --- 5) Файлы
         image_file = _pick_file(request.FILES, IMG_KEYS)
         video_file = _pick_file(request.FILES, VID_KEYS)
 
-        # (мягкие лимиты — по желанию)
-        if hasattr(image_file, "size") and image_file.size > 10 * 1024 * 1024:  # 10 MB
-            return Response({"image": "Слишком большой файл изображения (>10MB)."}, status=status.HTTP_400_BAD_REQUEST)
-        if hasattr(video_file, "size") and video_file.size > 150 * 1024 * 1024:  # 150 MB
-            return Response({"video": "Слишком большой видеофайл (>150MB)."}, status=status.HTTP_400_BAD_REQUEST)
-
-        # --- 6) Уникальный slug
-        base = _slugify_title(title)
-        new_slug = _unique_slug(base)
-
-        # --- 7) Уникальный link (без коллизий с реальными ссылками)
-        link = (data.get("link") or "").strip()
-        if not link:
-            # безопасный "виртуальный" линк — не пересечётся с реальными URL источников
-            link = f"user://suggestion/{uuid.uuid4()}"
-
-        # --- 8) Сохранение (только существующие поля модели)
-        fields = {
-            "title": title,
-            "summary": summary or "",
-            "slug": new_slug,
-            "link": link,
-            "published_at": timezone.now(),  # черновик — но дата пригодится для сортировки
-        }
-        if category is not None and hasattr(ImportedNews, "category"):
-            fields["category"] = category
-        if image_file is not None and hasattr(ImportedNews, "image"):
-            fields["image"] = image_file
-        if video_file is not None and hasattr(ImportedNews, "video"):
-            fields["video"] = video_file
+        # лимиты размеров уже проверены при приёме (upload_stream.CappedUploadHandler, иначе — 413)
 
-        news = ImportedNews.objects.create(**fields)
+        image_name = _store_upload("image_file", image_file)
+        news = create_suggestion(
+            title=title,
+            summary=summary,
+            category_slug=category_slug,
+            link=(data.get("link") or "").strip(),
+            image_name=image_name,
+            video_name=_store_upload("video_file", video_file),
+        )
+        enqueue_optimize_upload(image_name, "news.ImportedNews.image_file")
 
         # --- 9) Соберём удобный detail_url для фронта
         # Если в модели есть свойство seo_path — используем его, иначе короткий роут /news/<slug>/
@@ -205,8 +249,4 @@ class SuggestNewsView(APIView):
             "slug": news.slug,
             "detail_url": detail_url,
         }
-        if meta and settings.DEBUG:
-            # В проде не светим score/action, а в DEBUG чуть поможем себе
-            payload["captcha"] = meta
-
         return Response(payload, status=status.HTTP_201_CREATED)
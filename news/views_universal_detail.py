@@ -1,13 +1,15 @@
 # Путь: backend/news/views_universal_detail.py
 # Назначение: Универсальные детальные эндпоинты для Article и ImportedNews,
 # с корректной выдачей изображений и SEO-friendly URL.
+# ✅ «Похожие» ищутся через news/utils/trigram.py: title__icontains по триграммному индексу (PostgreSQL),
+#    порядок — по похожести заголовка, затем по дате.
 
 from rest_framework.generics import RetrieveAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
 from .models import Article, ImportedNews
+from .utils import trigram
 from .serializers import ArticleSerializer, ImportedNewsSerializer
 
 class UniversalNewsDetailView(RetrieveAPIView):
@@ -54,24 +56,20 @@ class RelatedNewsViewUniversal(APIView):
 
         title = getattr(current, "title", "") or ""
         terms = [t for t in title.split() if len(t) > 3]
-        query = Q()
-        for t in terms:
-            query |= Q(title__icontains=t)
+        # OR из title__icontains — в PostgreSQL по триграммному индексу; самые похожие заголовки первыми
+        query = trigram.contains_any(["title"], terms)
 
         if isinstance(current, Article):
             qs = (
                 Article.objects.filter(status="PUBLISHED")
                 .exclude(pk=current.pk)
                 .filter(query)
-                .order_by("-published_at")[:20]
             )
+            qs = trigram.by_similarity(qs, "title", title, "-published_at")[:20]
             serializer = ArticleSerializer(qs, many=True, context={"request": request})
         else:
-            qs = (
-                ImportedNews.objects.exclude(pk=current.pk)
-                .filter(query)
-                .order_by("-published_at")[:20]
-            )
+            qs = ImportedNews.objects.exclude(pk=current.pk).filter(query)
+            qs = trigram.by_similarity(qs, "title", title, "-published_at")[:20]
             serializer = ImportedNewsSerializer(qs, many=True, context={"request": request})
 
         return Response({"results": serializer.data})
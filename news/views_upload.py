@@ -1,6 +1,8 @@
 # backend/news/views_upload.py
 # Назначение: Загрузка изображений для редактора Quill с уникальными именами.
 # Путь: backend/news/views_upload.py
+# ✅ После сохранения картинка оптимизируется в фоне (EXIF-поворот, без метаданных, ≤ UPLOAD_MAX_SIDE,
+#    варианты .r.webp/.r.jpg) — задача news.optimize_upload, URL файла не меняется.
 
 import os
 import uuid
@@ -10,6 +12,8 @@ from django.http import JsonResponse
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 
+from .tasks import enqueue_optimize_upload
+
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])  # доступ только авторизованным
@@ -29,6 +33,7 @@ def upload_image(request):
     # Сохраняем в папку media/articles/
     save_path = os.path.join("articles", fname)
     full_path = default_storage.save(save_path, file)
+    enqueue_optimize_upload(full_path)
 
     # Формируем URL (например: /media/articles/uuid.png)
     url = settings.MEDIA_URL + full_path
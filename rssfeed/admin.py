@@ -5,7 +5,10 @@
 #   - Если у новости нет картинки, подставляется logo источника (если есть).
 #   - Новый extract_content: пытается достать текст из content:encoded → summary → description.
 #   - Если текста нет, всё равно сохраняем карточку с пометкой "[Без текста]".
+#   - Импорт из админки выполняется в фоне (задача rssfeed.import_source, см. rssfeed/tasks.py).
+#   - Для новых новостей ставится предгенерация миниатюр (news.pregen_thumbnails).
 
+from django.conf import settings
 from django.contrib import admin, messages
 from django.shortcuts import redirect
 from django.urls import path
@@ -17,7 +20,9 @@ import requests, feedparser, time, re, logging
 from datetime import datetime, timezone as dt_timezone
 
 from .models import RssFeedSource
+from .tasks import enqueue_import
 from news.models import ImportedNews, Category, NewsSource
+from news.tasks import enqueue_pregen
 
 logger = logging.getLogger(__name__)
 
@@ -76,31 +81,103 @@ def get_unique_slug(model, name):
     return slug
 
 
+def import_feed_source(source):
+    """Синхронный импорт одного источника. Возвращает (добавлено, пропущено). Вызывается задачей rssfeed.import_source."""
+    resp = requests.get(
+        source.url, timeout=10, headers={"User-Agent": "Mozilla/5.0"}
+    )
+    if resp.status_code != 200:
+        raise ValueError(f"Сервер вернул {resp.status_code}")
+
+    feed = feedparser.parse(resp.content)
+    if feed.bozo:
+        raise ValueError(f"Ошибка парсинга RSS: {feed.bozo_exception}")
+    if not feed.entries:
+        raise ValueError("Лента пустая")
+
+    source_title = feed.feed.get("title", source.name)
+    source_obj, _ = NewsSource.objects.get_or_create(
+        name=source_title, defaults={"slug": slugify(source_title) or "source"}
+    )
+
+    added_count, skipped_count = 0, 0
+
+    for entry in feed.entries:
+        try:
+            title = entry.get("title", "Без заголовка").strip()
+            link = entry.get("link")
+            if not link:
+                continue
+
+            # публикация
+            published_at = None
+            if hasattr(entry, "published_parsed") and entry.published_parsed:
+                published_at = datetime.fromtimestamp(
+                    time.mktime(entry.published_parsed), tz=dt_timezone.utc
+                )
+
+            # категория
+            if hasattr(entry, "tags") and entry.tags:
+                category_name = (
+                    entry.tags[0].get("term", "Без категории").strip()
+                )
+            else:
+                category_name = "Без категории"
+
+            slug_value = get_unique_slug(Category, category_name)
+            category, _ = Category.objects.get_or_create(
+                name=category_name, defaults={"slug": slug_value}
+            )
+
+            # картинка
+            image_url = extract_image(entry)
+            if not image_url and source_obj.logo:
+                image_url = source_obj.logo.url
+
+            # текст с фолбэком
+            text = extract_content(entry)
+            if not text:
+                text = "[Без текста]"
+
+            news, created = ImportedNews.objects.get_or_create(
+                link=link,
+                defaults={
+                    "source_fk": source_obj,
+                    "title": title,
+                    "summary": text,
+                    "image": image_url,
+                    "published_at": published_at or timezone.now(),
+                    "category": category,
+                    "feed_url": source.url,
+                },
+            )
+
+            if created:
+                added_count += 1
+                if getattr(settings, "THUMB_PREGEN_ON_IMPORT", True):
+                    enqueue_pregen(news)
+            else:
+                skipped_count += 1
+
+        except Exception as e:
+            logger.warning(f"Ошибка при импорте {link}: {e}")
+            continue
+
+    return added_count, skipped_count
+
+
 @admin.register(RssFeedSource)
 class RssFeedSourceAdmin(admin.ModelAdmin):
     list_display = ("name", "url", "created_at", "import_link")
     actions = ["import_rss_action"]
 
     def import_rss_action(self, request, queryset):
-        added, skipped, errors = 0, 0, 0
-
-        for source in queryset:
-            try:
-                a, s = self._import_feed(source)
-                added += a
-                skipped += s
-            except Exception as e:
-                errors += 1
-                self.message_user(
-                    request,
-                    f"Ошибка при импорте {source.name}: {e}",
-                    level=messages.ERROR,
-                )
-
+        # Импорт ходит в сеть — не держим запрос админки, ставим задачи воркеру
+        jobs = [enqueue_import(source) for source in queryset]
         self.message_user(
             request,
-            f"Импорт завершён: добавлено {added}, пропущено {skipped}, ошибок {errors}.",
-            level=messages.SUCCESS if errors == 0 else messages.WARNING,
+            f"Импорт поставлен в очередь: {len(jobs)} источник(ов). Итог — в разделе «Фоновые задачи».",
+            level=messages.SUCCESS,
         )
 
     def get_urls(self):
@@ -120,17 +197,12 @@ class RssFeedSourceAdmin(admin.ModelAdmin):
             self.message_user(request, "Источник не найден", level=messages.ERROR)
             return redirect("..")
 
-        try:
-            added, skipped = self._import_feed(source)
-            self.message_user(
-                request,
-                f"Импорт завершён: {source.name} (добавлено {added}, пропущено {skipped}).",
-                level=messages.SUCCESS,
-            )
-        except Exception as e:
-            self.message_user(
-                request, f"Ошибка при импорте {source.name}: {e}", level=messages.ERROR
-            )
+        job = enqueue_import(source)
+        self.message_user(
+            request,
+            f"Импорт {source.name} поставлен в очередь (задача #{job.pk}).",
+            level=messages.SUCCESS,
+        )
 
         return redirect("..")
 
@@ -142,82 +214,4 @@ class RssFeedSourceAdmin(admin.ModelAdmin):
     import_link.short_description = "Действие"
 
     def _import_feed(self, source):
-        resp = requests.get(
-            source.url, timeout=10, headers={"User-Agent": "Mozilla/5.0"}
-        )
-        if resp.status_code != 200:
-            raise ValueError(f"Сервер вернул {resp.status_code}")
-
-        feed = feedparser.parse(resp.content)
-        if feed.bozo:
-            raise ValueError(f"Ошибка парсинга RSS: {feed.bozo_exception}")
-        if not feed.entries:
-            raise ValueError("Лента пустая")
-
-        source_title = feed.feed.get("title", source.name)
-        source_obj, _ = NewsSource.objects.get_or_create(
-            name=source_title, defaults={"slug": slugify(source_title) or "source"}
-        )
-
-        added_count, skipped_count = 0, 0
-
-        for entry in feed.entries:
-            try:
-                title = entry.get("title", "Без заголовка").strip()
-                link = entry.get("link")
-                if not link:
-                    continue
-
-                # публикация
-                published_at = None
-                if hasattr(entry, "published_parsed") and entry.published_parsed:
-                    published_at = datetime.fromtimestamp(
-                        time.mktime(entry.published_parsed), tz=dt_timezone.utc
-                    )
-
-                # категория
-                if hasattr(entry, "tags") and entry.tags:
-                    category_name = (
-                        entry.tags[0].get("term", "Без категории").strip()
-                    )
-                else:
-                    category_name = "Без категории"
-
-                slug_value = get_unique_slug(Category, category_name)
-                category, _ = Category.objects.get_or_create(
-                    name=category_name, defaults={"slug": slug_value}
-                )
-
-                # картинка
-                image_url = extract_image(entry)
-                if not image_url and source_obj.logo:
-                    image_url = source_obj.logo.url
-
-                # текст с фолбэком
-                text = extract_content(entry)
-                if not text:
-                    text = "[Без текста]"
-
-                news, created = ImportedNews.objects.get_or_create(
-                    link=link,
-                    defaults={
-                        "source_fk": source_obj,
-                        "title": title,
-                        "summary": text,
-                        "image": image_url,
-                        "published_at": published_at or timezone.now(),
-                        "category": category,
-                        "feed_url": source.url,
-                    },
-                )
-
-                if created:
-                    added_count += 1
-                else:
-                    skipped_count += 1
-
-            except Exception as e:
-                logger.warning(f"Ошибка при импорте {link}: {e}")
-                continue
-
-        return added_count, skipped_count
+        return import_feed_source(source)
@@ -0,0 +1,128 @@
+# Путь: backend/rssfeed/management/commands/bench_import.py
+# Назначение: Бенчмарк импорта RSS без сети. Прогоняет полный пайплайн import_rss по N записанным лентам
+#             (rssfeed/replay.py) на временной БД и печатает: записей/сек, SQL-запросов на запись, пик RSS.
+# Подготовка фикстур (один раз, с сетью; ленты — из RssFeedSource либо явно через --feeds):
+#   RSS_FIXTURES_MODE=record RSS_FIXTURES_DIR=rssfeed/fixtures/replay python manage.py import_rss --rss-sources
+#   RSS_FIXTURES_MODE=record RSS_FIXTURES_DIR=rssfeed/fixtures/replay python manage.py import_rss --feeds URL [URL ...]
+# Использование:
+#   python manage.py bench_import                          # все записанные ленты
+#   python manage.py bench_import --feeds 5 --json         # 5 лент, отчёт в JSON (для CI)
+#   python manage.py bench_import --min-rate 20 --max-queries-per-entry 15 --max-rss-mb 400
+#     → при нарушении порогов команда завершается с ошибкой (регрессия видна в CI)
+
+import json
+import sys
+import time
+from io import StringIO
+
+import feedparser
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from rssfeed import replay
+
+try:  # на Windows модуля нет — пик памяти просто не меряем
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт КБ, macOS — байты
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class Command(BaseCommand):
+    help = "Офлайн-бенчмарк import_rss по записанным лентам: записей/сек, запросов на запись, пик RSS."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fixtures", help="Папка с фикстурами (по умолчанию RSS_FIXTURES_DIR).")
+        parser.add_argument("--feeds", type=int, default=0, help="Сколько лент прогнать (0 — все).")
+        parser.add_argument("--allow-empty", action="store_true", help="Пробросить --allow-empty в import_rss.")
+        parser.add_argument(
+            "--current-db",
+            action="store_true",
+            help="Не создавать временную БД, гонять на текущей (осторожно: запишет новости).",
+        )
+        parser.add_argument("--keepdb", action="store_true", help="Не пересоздавать временную БД между прогонами.")
+        parser.add_argument("--json", action="store_true", help="Вывести отчёт одной строкой JSON.")
+        parser.add_argument("--min-rate", type=float, default=0, help="Порог: минимум записей/сек.")
+        parser.add_argument("--max-queries-per-entry", type=float, default=0, help="Порог: максимум запросов на запись.")
+        parser.add_argument("--max-rss-mb", type=float, default=0, help="Порог: максимум пикового RSS, МБ.")
+
+    def handle(self, *args, **options):
+        fixtures_dir = options.get("fixtures") or str(replay.get_dir())
+        feeds = [m["url"] for m in replay.iter_fixtures(replay.KIND_FEED, fixtures_dir)]
+        if options["feeds"]:
+            feeds = feeds[: options["feeds"]]
+        if not feeds:
+            raise CommandError(f"В {fixtures_dir} нет записанных лент. Запишите их: RSS_FIXTURES_MODE=record manage.py import_rss --rss-sources (или --feeds URL ...).")
+
+        prev_mode, prev_dir = replay.get_mode(), replay.get_dir()
+        replay.set_mode(replay.MODE_REPLAY, fixtures_dir)
+
+        entries = 0
+        for url in feeds:
+            _, data = replay.load(url)
+            entries += len(feedparser.parse(data).get("entries") or [])
+
+        scratch = not options["current_db"]
+        old_name = connection.settings_dict["NAME"]
+        if scratch:
+            connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False, keepdb=options["keepdb"]
+            )
+
+        queries = {"n": 0}
+
+        def _count_queries(execute, sql, params, many, context):
+            queries["n"] += 1
+            return execute(sql, params, many, context)
+
+        log = StringIO()
+        try:
+            with connection.execute_wrapper(_count_queries):
+                started = time.perf_counter()
+                call_command("import_rss", feeds=feeds, allow_empty=options["allow_empty"], stdout=log)
+                elapsed = time.perf_counter() - started
+        finally:
+            replay.set_mode(prev_mode, str(prev_dir))
+            if scratch:
+                connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+
+        report = {
+            "feeds": len(feeds),
+            "entries": entries,
+            "elapsed_s": round(elapsed, 3),
+            "entries_per_s": round(entries / elapsed, 2) if elapsed > 0 else 0.0,
+            "queries": queries["n"],
+            "queries_per_entry": round(queries["n"] / entries, 2) if entries else 0.0,
+            "peak_rss_mb": _peak_rss_mb(),
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, ensure_ascii=False))
+        else:
+            self.stdout.write(self.style.NOTICE(f"Лент: {report['feeds']}, записей: {report['entries']}"))
+            self.stdout.write(f"Время: {report['elapsed_s']} с")
+            self.stdout.write(f"Записей/сек: {report['entries_per_s']}")
+            self.stdout.write(f"SQL-запросов: {report['queries']} ({report['queries_per_entry']} на запись)")
+            self.stdout.write(f"Пик RSS: {report['peak_rss_mb'] if report['peak_rss_mb'] is not None else '—'} МБ")
+
+        failed = []
+        if options["min_rate"] and report["entries_per_s"] < options["min_rate"]:
+            failed.append(f"записей/сек {report['entries_per_s']} < {options['min_rate']}")
+        if options["max_queries_per_entry"] and report["queries_per_entry"] > options["max_queries_per_entry"]:
+            failed.append(f"запросов на запись {report['queries_per_entry']} > {options['max_queries_per_entry']}")
+        if options["max_rss_mb"] and (report["peak_rss_mb"] or 0) > options["max_rss_mb"]:
+            failed.append(f"пик RSS {report['peak_rss_mb']} МБ > {options['max_rss_mb']} МБ")
+        if failed:
+            raise CommandError("Регрессия производительности импорта: " + "; ".join(failed))
+
+        if not options["json"]:
+            self.stdout.write(self.style.SUCCESS("✓ Бенчмарк импорта завершён"))
@@ -5,7 +5,11 @@
 #   • ✅ feedparser.parse() получает bytes, а не URL → никаких таймаутов на 10s от сторонних вызовов.
 #   • ✅ fetch_page() сначала пытается rssfeed.net.fetch_url(), затем (фолбэк) requests.get(..., timeout=8).
 #   • ✅ Аргумент --allow-empty: если включён, сохраняем даже без текста с пометкой “[Без текста]”.
-#   • ✅ После импорта вызывается cleanup_broken_news().
+#   • ✅ После импорта вызывается cleanup_broken_news() — только по записям этого прогона (--full-cleanup — по всей базе).
+#   • ✅ --feeds URL [URL ...]: импорт напрямую из указанных лент (источник = хост ленты); так работает bench_import.
+#   • ✅ --rss-sources: ленты берутся из RssFeedSource.url (в режиме записи фикстур — по умолчанию, если не задан --feeds).
+#   • ✅ В режиме replay (rssfeed/replay.py) fetch_page() не уходит в сеть через requests-фолбэк.
+#   • ✅ После сохранения новости ставится фоновая предгенерация миниатюр (THUMB_PREGEN_ON_IMPORT, --no-pregen).
 #   • Вся остальная логика и функции сохранены. НИЧЕГО ЛИШНЕГО НЕ УДАЛЕНО.
 
 import re
@@ -18,16 +22,20 @@ import feedparser
 import requests
 from bs4 import BeautifulSoup
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.utils.text import slugify
 from django.db import transaction
 
 from news.models import ImportedNews, Category, NewsSource
+from news.tasks import enqueue_pregen
 from news.utils.cleanup import cleanup_broken_news
 
 # 🔌 Наш надёжный сетевой слой
 from rssfeed.net import get_rss_bytes, fetch_url
+from rssfeed import replay
+from rssfeed.models import RssFeedSource
 
 # --- ПАРАМЕТРЫ КАЧЕСТВА -------------------------------------------------------
 
@@ -178,6 +186,9 @@ def fetch_page(url: str) -> BeautifulSoup | None:
             return BeautifulSoup(res.data, "lxml")
     except Exception:
         pass
+    if replay.is_replaying():
+        # Офлайн-прогон: страницы нет в фикстурах — значит, её нет вообще
+        return None
     try:
         resp = requests.get(
             url,
@@ -263,13 +274,49 @@ class Command(BaseCommand):
             action="store_true",
             help="Сохранять даже новости без текста (подставляя '[Без текста]').",
         )
+        parser.add_argument(
+            "--feeds",
+            nargs="*",
+            help="Импортировать из указанных URL лент вместо NewsSource (источник создаётся по хосту ленты).",
+        )
+        parser.add_argument(
+            "--rss-sources",
+            action="store_true",
+            help="Импортировать из лент RssFeedSource (по умолчанию при RSS_FIXTURES_MODE=record без --feeds).",
+        )
+        parser.add_argument(
+            "--full-cleanup",
+            action="store_true",
+            help="После импорта чистить битые новости по всей базе, а не только среди записей этого прогона.",
+        )
+        parser.add_argument(
+            "--no-pregen",
+            action="store_true",
+            help="Не ставить фоновую предгенерацию миниатюр для сохранённых новостей.",
+        )
 
     @transaction.atomic
     def handle(self, *args, **options):
         only_slugs = set(options.get("only") or [])
         allow_empty = options.get("allow_empty", False)
-
-        sources = list(NewsSource.objects.filter(is_active=True).order_by("name"))
+        pregen = getattr(settings, "THUMB_PREGEN_ON_IMPORT", True) and not options.get("no_pregen")
+
+        feed_urls = options.get("feeds") or []
+        if not feed_urls and (options.get("rss_sources") or replay.is_recording()):
+            # у NewsSource нет адреса ленты — для записи фикстур (bench_import) ленты берём из RssFeedSource
+            feed_urls = list(RssFeedSource.objects.order_by("name").values_list("url", flat=True))
+            if not feed_urls:
+                self.stdout.write(self.style.WARNING("Нет лент RssFeedSource."))
+                return
+
+        if feed_urls:
+            sources = []
+            for url in feed_urls:
+                src, _ = NewsSource.objects.get_or_create(name=urlparse(url).hostname or url)
+                src.feed_url = url  # у NewsSource нет поля feed_url — адрес ленты только на время импорта
+                sources.append(src)
+        else:
+            sources = list(NewsSource.objects.filter(is_active=True).order_by("name"))
         if only_slugs:
             sources = [s for s in sources if s.slug in only_slugs]
 
@@ -278,9 +325,10 @@ class Command(BaseCommand):
             return
 
         total_new, total_skipped = 0, 0
+        touched_ids = []
 
         for src in sources:
-            if not src.feed_url:
+            if not getattr(src, "feed_url", ""):
                 self.stdout.write(self.style.WARNING(f"✖ Пропущен '{src.name}': нет feed_url"))
                 continue
 
@@ -354,6 +402,9 @@ class Command(BaseCommand):
                                 assign_if_exists(existing, cover_image=img_from_feed)
                         assign_if_exists(existing, category=category, source=src, published_at=published_dt)
                         existing.save(update_fields=[f.name for f in existing._meta.fields if f.name not in ("id",)])
+                        touched_ids.append(existing.pk)
+                        if img_from_feed and pregen:
+                            enqueue_pregen(existing)
                         continue
 
                     news = ImportedNews()
@@ -372,7 +423,10 @@ class Command(BaseCommand):
                             assign_if_exists(news, cover_image=img_from_feed)
 
                     news.save()
+                    touched_ids.append(news.pk)
                     added += 1
+                    if pregen:
+                        enqueue_pregen(news)  # миниатюры стандартных размеров — в фоне (THUMB_PRESETS)
 
                 except Exception as e:
                     skipped += 1
@@ -383,4 +437,7 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS(f"  ✓ Добавлено: {added}  |  Пропущено: {skipped}"))
 
         self.stdout.write(self.style.SUCCESS(f"ГОТОВО. Всего добавлено: {total_new}, пропущено: {total_skipped}"))
-        cleanup_broken_news(self.stdout)
+        if options.get("full_cleanup"):
+            cleanup_broken_news(self.stdout)
+        else:
+            cleanup_broken_news(self.stdout, imported_ids=touched_ids)
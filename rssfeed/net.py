@@ -6,6 +6,7 @@
 #   - get_timeouts_for(url): (connect/read/retries) с overrides из .env (JSON)
 #   - fetch_url(): GET/HEAD с ретраями → FetchResult
 #   - get_rss_bytes(): сахар для RSS (bytes, encoding, meta)
+#   - запись/воспроизведение ответов из папки фикстур (см. rssfeed/replay.py, RSS_FIXTURES_MODE)
 #
 # Переменные окружения (.env):
 #   RSS_CONNECT_TIMEOUT=5
@@ -30,6 +31,8 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from . import replay
+
 log = logging.getLogger(__name__)
 
 def _env(name: str, default: Optional[str] = None) -> Optional[str]:
@@ -116,11 +119,38 @@ def get_extra_headers_for(url: str) -> Dict[str, str]:
     return HEADERS_OVERRIDES.get(host, {})
 
 
-def fetch_url(url: str, method: str = "GET", stream: bool = False, timeout: Optional[Tuple[float, float]] = None) -> FetchResult:
+def _replayed(url: str, method: str) -> FetchResult:
+    meta, data = replay.load(url, method)
+    return FetchResult(
+        url=meta.get("final_url") or url,
+        status=int(meta.get("status") or 200),
+        headers=meta.get("headers") or {},
+        data=data,
+        elapsed_s=0.0,
+    )
+
+
+def _recorded(url: str, method: str, kind: str, result: FetchResult) -> FetchResult:
+    if replay.is_recording():
+        replay.save(url, method, kind, result.status, result.url, result.headers, result.data, result.elapsed_s)
+    return result
+
+
+def fetch_url(
+    url: str,
+    method: str = "GET",
+    stream: bool = False,
+    timeout: Optional[Tuple[float, float]] = None,
+    kind: str = replay.KIND_PAGE,
+) -> FetchResult:
     """
     Универсальный HTTP-фетч с ретраями и корректными таймаутами.
     Возвращает bytes (не текст) — безопаснее для feedparser/HTML-парсинга.
+    kind ("feed"/"page") нужен только для записи фикстур.
     """
+    if replay.is_replaying():
+        return _replayed(url, method)
+
     connect_t, read_t, retries = get_timeouts_for(url)
     if timeout:
         connect_t, read_t = timeout
@@ -149,26 +179,26 @@ def fetch_url(url: str, method: str = "GET", stream: bool = False, timeout: Opti
         resp = sess.request(method.upper(), url, timeout=(connect_t, read_t), stream=stream, headers=headers)
         content = resp.content if not stream else b"".join(resp.iter_content(chunk_size=65536))
         elapsed = time.time() - start
-        return FetchResult(
+        return _recorded(url, method, kind, FetchResult(
             url=str(resp.url),
             status=resp.status_code,
             headers={k.lower(): v for k, v in resp.headers.items()},
             data=content,
             elapsed_s=elapsed,
-        )
+        ))
     except requests.exceptions.ReadTimeout:
         # Для «тугодумов» (например, aif.ru) дадим один повтор с большим read-timeout
         log.warning("ReadTimeout для %s при read=%s — пробуем ещё раз с read=%s", url, read_t, read_t + 10)
         resp = _session.request(method.upper(), url, timeout=(connect_t, read_t + 10), stream=stream, headers=headers)
         content = resp.content if not stream else b"".join(resp.iter_content(chunk_size=65536))
         elapsed = time.time() - start
-        return FetchResult(
+        return _recorded(url, method, kind, FetchResult(
             url=str(resp.url),
             status=resp.status_code,
             headers={k.lower(): v for k, v in resp.headers.items()},
             data=content,
             elapsed_s=elapsed,
-        )
+        ))
     except (requests.exceptions.ConnectionError, socket.gaierror) as e:
         log.error("Connection error for %s: %s", url, e)
         raise
@@ -182,7 +212,7 @@ def get_rss_bytes(url: str) -> Tuple[bytes, Optional[str], FetchResult]:
     Упрощённый хелпер для RSS:
       Возвращает (data_bytes, apparent_encoding, fetch_result)
     """
-    res = fetch_url(url, method="GET", stream=False)
+    res = fetch_url(url, method="GET", stream=False, kind=replay.KIND_FEED)
     enc = None
     ctype = res.headers.get("content-type", "")
     if "charset=" in ctype:
@@ -0,0 +1,116 @@
+# Путь: backend/rssfeed/replay.py
+# Назначение: Запись и воспроизведение сетевых ответов rssfeed.net.fetch_url() из локальной папки фикстур.
+#             Нужно, чтобы мерить скорость импорта (bench_import) без обращения к сети.
+# Режимы (.env или set_mode() из кода):
+#   RSS_FIXTURES_MODE=record   — каждый ответ fetch_url() дополнительно сохраняется в RSS_FIXTURES_DIR
+#   RSS_FIXTURES_MODE=replay   — fetch_url() отдаёт ответы только из RSS_FIXTURES_DIR, сеть не трогаем
+#   RSS_FIXTURES_MODE=         — обычная работа (по умолчанию)
+#   RSS_FIXTURES_DIR=/path/to/fixtures   (по умолчанию: rssfeed/fixtures/replay рядом с этим файлом)
+# Формат фикстуры: <sha1(METHOD url)>.json (метаданные) + <sha1>.bin (сырые байты тела).
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import requests
+
+log = logging.getLogger(__name__)
+
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+KIND_FEED = "feed"
+KIND_PAGE = "page"
+
+DEFAULT_DIR = Path(__file__).resolve().parent / "fixtures" / "replay"
+
+_state = {
+    "mode": (os.getenv("RSS_FIXTURES_MODE") or "").strip().lower(),
+    "dir": Path(os.getenv("RSS_FIXTURES_DIR") or DEFAULT_DIR),
+}
+
+
+class ReplayMiss(requests.exceptions.ConnectionError):
+    """В режиме replay для URL нет записанного ответа (для вызывающего кода — как сетевая ошибка)."""
+
+
+def set_mode(mode: Optional[str], directory: Optional[str] = None) -> None:
+    """Переключает режим на лету (используется bench_import)."""
+    _state["mode"] = (mode or "").strip().lower()
+    if directory:
+        _state["dir"] = Path(directory)
+
+
+def get_mode() -> str:
+    return _state["mode"]
+
+
+def get_dir() -> Path:
+    return _state["dir"]
+
+
+def is_recording() -> bool:
+    return _state["mode"] == MODE_RECORD
+
+
+def is_replaying() -> bool:
+    return _state["mode"] == MODE_REPLAY
+
+
+def fixture_key(url: str, method: str = "GET") -> str:
+    return hashlib.sha1(f"{method.upper()} {url}".encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def save(url: str, method: str, kind: str, status: int, final_url: str,
+         headers: Dict[str, str], data: bytes, elapsed_s: float) -> None:
+    """Сохраняет ответ в папку фикстур. Ошибки записи не должны ломать импорт."""
+    folder = get_dir()
+    key = fixture_key(url, method)
+    try:
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"{key}.bin").write_bytes(data or b"")
+        meta = {
+            "url": url,
+            "final_url": final_url,
+            "method": method.upper(),
+            "kind": kind,
+            "status": status,
+            "headers": headers,
+            "elapsed_s": elapsed_s,
+            "size": len(data or b""),
+        }
+        (folder / f"{key}.json").write_text(json.dumps(meta, ensure_ascii=False, indent=1), encoding="utf-8")
+    except OSError as e:
+        log.warning("Не удалось записать фикстуру для %s: %s", url, e)
+
+
+def load(url: str, method: str = "GET") -> tuple[dict, bytes]:
+    """Возвращает (meta, data) или поднимает ReplayMiss."""
+    folder = get_dir()
+    key = fixture_key(url, method)
+    meta_path = folder / f"{key}.json"
+    if not meta_path.exists():
+        raise ReplayMiss(f"replay: нет записанного ответа для {method.upper()} {url}")
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    body_path = folder / f"{key}.bin"
+    data = body_path.read_bytes() if body_path.exists() else b""
+    return meta, data
+
+
+def iter_fixtures(kind: Optional[str] = None, directory: Optional[str] = None) -> Iterator[dict]:
+    """Перебирает метаданные записанных ответов (опционально — только ленты или только страницы)."""
+    folder = Path(directory) if directory else get_dir()
+    if not folder.is_dir():
+        return
+    for meta_path in sorted(folder.glob("*.json")):
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if kind and meta.get("kind") != kind:
+            continue
+        yield meta
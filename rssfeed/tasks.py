@@ -0,0 +1,22 @@
+# Путь: backend/rssfeed/tasks.py
+# Назначение: Фоновые задачи rssfeed (выполняются воркером manage.py run_workers).
+
+from jobs.api import enqueue, register
+
+from .models import RssFeedSource
+
+
+def enqueue_import(source):
+    """Ставит импорт источника в очередь; повторный клик, пока задача ждёт, новую не создаёт."""
+    return enqueue("rssfeed.import_source", {"source_id": source.pk}, unique_key=f"rssfeed.import_source:{source.pk}")
+
+
+@register("rssfeed.import_source")
+def import_source(source_id):
+    from .admin import import_feed_source
+
+    source = RssFeedSource.objects.filter(pk=source_id).first()
+    if source is None:
+        return {"skipped": "источник удалён"}
+    added, skipped = import_feed_source(source)
+    return {"source": source.name, "added": added, "skipped": skipped}